@@ -0,0 +1,242 @@
+# 파일명: batch.py
+"""
+여러 위치/수신자에게 날씨 요약을 한 번에 발송하는 배치 모드
+
+사용법:
+    python batch.py roster.csv --concurrency 16 --report batch_report.csv
+
+roster 형식 (CSV 헤더 또는 JSONL 키):
+    recipient     수신자 표시 이름 (리포트용, 선택)
+    city_name     표시용 지역 이름
+    lat, lon      위경도
+    access_token  수신자 카카오 Access Token (비우면 토큰 저장소의 기본 계정 사용)
+    refresh_token 수신자 카카오 Refresh Token (선택: 있으면 저장소가 만료 전 자동 갱신)
+    send_at       데몬 모드 발송 시각 HH:MM (선택, daemon.py에서 사용)
+    timezone      send_at 기준 시간대 (선택, 기본 Asia/Seoul)
+"""
+import os
+import csv
+import json
+import argparse
+from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from main import (
+    KST,
+    fetch_open_meteo_many,
+    build_weather_summary,
+    get_summary_cache,
+    kakao_send_text,
+    get_token_store,
+    record_observations,
+)
+from history import location_key
+from token_store import DEFAULT_ACCOUNT
+
+# Open-Meteo 한 번의 요청에 넣을 최대 위치 수 (URL 길이 제한 고려)
+OPEN_METEO_CHUNK = int(os.getenv("OPEN_METEO_CHUNK", "100"))
+
+
+@dataclass
+class RosterEntry:
+    recipient: str
+    city_name: str
+    lat: str
+    lon: str
+    access_token: str
+    refresh_token: str = ""
+    send_at: str = ""
+    timezone: str = ""
+
+    @property
+    def location_key(self) -> str:
+        return location_key(self.lat, self.lon)
+
+    @property
+    def account(self) -> Optional[str]:
+        """ 토큰 저장소 계정 (None이면 roster의 access_token을 그대로 사용) """
+        if self.refresh_token:
+            return f"recipient:{self.recipient}"
+        if not self.access_token:
+            return DEFAULT_ACCOUNT
+        return None
+
+
+@dataclass
+class SendResult:
+    recipient: str
+    city_name: str
+    ok: bool
+    stage: str          # weather / summary / send
+    detail: str = ""
+    at: str = ""
+
+
+# =========================================
+# 1) roster 로드
+# =========================================
+def load_roster(path: str) -> list[RosterEntry]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    entries = []
+    for i, row in enumerate(rows, start=1):
+        lat, lon = (row.get("lat") or "").strip(), (row.get("lon") or "").strip()
+        if not lat or not lon:
+            raise RuntimeError(f"roster {i}번째 줄: lat/lon 누락")
+        city = (row.get("city_name") or "").strip() or "서울"
+        entries.append(RosterEntry(
+            recipient=(row.get("recipient") or "").strip() or f"#{i}",
+            city_name=city,
+            lat=lat,
+            lon=lon,
+            access_token=(row.get("access_token") or "").strip(),
+            refresh_token=(row.get("refresh_token") or "").strip(),
+            send_at=(row.get("send_at") or "").strip(),
+            timezone=(row.get("timezone") or "").strip(),
+        ))
+    return entries
+
+
+# =========================================
+# 2) 날씨 일괄 조회 — 고유 좌표만, chunk 단위로 묶어서
+# =========================================
+def fetch_weather_bulk(entries: list[RosterEntry], chunk_size: int = OPEN_METEO_CHUNK) -> tuple[dict, dict]:
+    """
+    반환: (location_key → weather_json, location_key → 에러 메시지)
+    """
+    coords = {}
+    for e in entries:
+        coords.setdefault(e.location_key, (e.lat, e.lon))
+    keys = list(coords)
+
+    weather, errors = {}, {}
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+        try:
+            results = fetch_open_meteo_many([coords[k] for k in chunk])
+            if len(results) != len(chunk):
+                raise RuntimeError(f"응답 개수 불일치: {len(results)} != {len(chunk)}")
+            weather.update(zip(chunk, results))
+        except Exception as e:
+            for k in chunk:
+                errors[k] = f"Open-Meteo 조회 실패: {e}"
+    return weather, errors
+
+
+# =========================================
+# 3) 배치 실행 — 요약/발송을 동시성 제한 하에 병렬 처리
+# =========================================
+def run_batch(entries: list[RosterEntry], concurrency: int = 8) -> list[SendResult]:
+    weather, weather_errors = fetch_weather_bulk(entries)
+    # 이력 저장 + 어제 대비 변화량 (범위 쿼리 1회)
+    trends = record_observations(weather)
+
+    # 같은 (좌표, 지역명)은 요약을 한 번만 생성
+    summary_keys = {(e.location_key, e.city_name) for e in entries if e.location_key in weather}
+
+    def _summarize(key):
+        loc, city = key
+        return build_weather_summary(weather[loc], city, trend=trends.get(loc))
+
+    summaries, summary_errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {key: pool.submit(_summarize, key) for key in summary_keys}
+        for key, fut in futures.items():
+            try:
+                summaries[key] = fut.result()
+            except Exception as e:
+                summary_errors[key] = f"요약 생성 실패: {e}"
+
+    store = get_token_store()
+    for e in entries:
+        if e.refresh_token:
+            store.seed(e.access_token, e.refresh_token, account=e.account)
+
+    def _access_token(entry: RosterEntry) -> str:
+        if entry.account is None:
+            return entry.access_token
+        token = store.get_access_token(entry.account)
+        if not token:
+            raise RuntimeError("access_token 없음")
+        return token
+
+    def _send(entry: RosterEntry) -> SendResult:
+        result = SendResult(entry.recipient, entry.city_name, ok=False, stage="weather")
+        if entry.location_key in weather_errors:
+            result.detail = weather_errors[entry.location_key]
+            return _stamp(result)
+
+        key = (entry.location_key, entry.city_name)
+        result.stage = "summary"
+        if key in summary_errors:
+            result.detail = summary_errors[key]
+            return _stamp(result)
+
+        result.stage = "send"
+        try:
+            access_token = _access_token(entry)
+            resp = kakao_send_text(summaries[key], access_token)
+            if resp.status_code == 401 and entry.account:
+                # 저장소 계정이면 갱신 후 1회 재시도 (동시 작업자 간 갱신은 한 번만)
+                resp = kakao_send_text(summaries[key], store.force_refresh(access_token, entry.account))
+        except Exception as e:
+            result.detail = f"카카오 요청 실패: {e}"
+            return _stamp(result)
+        if resp.status_code == 401:
+            result.detail = "토큰 만료(401)"
+        elif not resp.ok:
+            result.detail = f"카카오 전송 실패: {resp.status_code} {resp.text[:200]}"
+        else:
+            result.ok = True
+        return _stamp(result)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(_send, entries))
+
+
+def _stamp(result: SendResult) -> SendResult:
+    result.at = datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
+    return result
+
+
+# =========================================
+# 4) 수신자별 결과 리포트
+# =========================================
+def write_report(results: list[SendResult], path: str):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["recipient", "city_name", "status", "stage", "detail", "at"])
+        for r in results:
+            writer.writerow([r.recipient, r.city_name, "ok" if r.ok else "fail", r.stage, r.detail, r.at])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카카오 날씨 알림이 — 배치 발송")
+    parser.add_argument("roster", help="수신자 목록 (CSV 또는 JSONL)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "8")),
+                        help="요약/발송 동시 실행 수 (기본 8)")
+    parser.add_argument("--report", default="batch_report.csv", help="결과 리포트 경로")
+    args = parser.parse_args()
+
+    entries = load_roster(args.roster)
+    results = run_batch(entries, concurrency=args.concurrency)
+    write_report(results, args.report)
+
+    ok = sum(r.ok for r in results)
+    now = datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{now}] 배치 발송 완료 ✔ 성공 {ok} / 실패 {len(results) - ok} (리포트: {args.report})")
+
+    cache = get_summary_cache()
+    if cache and (cache.hits or cache.misses):
+        st = cache.stats()
+        print(f"요약 캐시: hit {st['hits']} / miss {st['misses']} (Gemini 호출 {st['hits']}회 절약)")
+
+
+if __name__ == "__main__":
+    main()
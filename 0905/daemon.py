@@ -0,0 +1,158 @@
+# 파일명: daemon.py
+"""
+상주(데몬) 모드 — cron 대신 프로세스를 띄워 두고 정해진 시각마다 발송
+
+- Gemini 모델, Open-Meteo/Kakao API/Kakao 인증 HTTP 세션을 한 번만 만들고 계속 재사용
+- roster가 있으면 (send_at, timezone) 그룹별로 배치 발송, 없으면 .env 위치 1곳 발송
+
+사용법:
+    python daemon.py                      # .env 위치, DAEMON_SEND_AT(기본 07:30, Asia/Seoul)
+    python daemon.py --roster roster.csv  # roster의 send_at/timezone 컬럼 기준
+"""
+import os
+import signal
+import argparse
+import threading
+from datetime import datetime, timedelta, time as dtime, timezone
+from zoneinfo import ZoneInfo
+
+import main as notifier
+from batch import load_roster, run_batch, write_report
+
+DAEMON_SEND_AT  = os.getenv("DAEMON_SEND_AT", "07:30")
+DAEMON_TIMEZONE = os.getenv("DAEMON_TIMEZONE", "Asia/Seoul")
+
+HISTORY_KEEP_DAYS   = int(os.getenv("HISTORY_KEEP_DAYS", "7"))
+HISTORY_RETAIN_DAYS = int(os.getenv("HISTORY_RETAIN_DAYS", "365"))
+
+# 최대 대기 간격(초) — 시계 변경/절전 복귀에도 너무 늦지 않게 다시 확인
+MAX_SLEEP = 60
+
+
+def parse_send_at(value: str) -> dtime:
+    hour, minute = value.strip().split(":")
+    return dtime(int(hour), int(minute))
+
+
+def next_fire(send_at: str, tz_name: str, after: datetime) -> datetime:
+    """ after(UTC) 이후 처음 오는 해당 시간대의 send_at 시각 (UTC로 반환) """
+    tz = ZoneInfo(tz_name)
+    local = after.astimezone(tz)
+    candidate = datetime.combine(local.date(), parse_send_at(send_at), tzinfo=tz)
+    if candidate <= local:
+        candidate = datetime.combine(local.date() + timedelta(days=1), parse_send_at(send_at), tzinfo=tz)
+    return candidate.astimezone(timezone.utc)
+
+
+def _log(msg: str):
+    now = datetime.now(notifier.KST).strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{now}] {msg}", flush=True)
+
+
+def warm_up():
+    """ 첫 발송 전에 무거운 초기화를 미리 끝내 둠 """
+    for name in ("open_meteo", "kakao_api", "kakao_auth"):
+        notifier.http_session(name)
+    if notifier.SUMMARY_MODE != "rule":
+        notifier._gemini_model()
+    notifier.get_summary_cache()
+    notifier.get_token_store()
+    notifier.get_history_store()
+
+
+class Scheduler:
+    def __init__(self, roster: str = None, concurrency: int = 8, report: str = "batch_report.csv"):
+        self.roster = roster
+        self.concurrency = concurrency
+        self.report = report
+        self.stop_event = threading.Event()
+        self.next_runs: dict[tuple[str, str], datetime] = {}
+        self.groups: dict[tuple[str, str], list] = {}
+        self.last_compact = None
+
+    def _groups(self) -> dict[tuple[str, str], list]:
+        """ (send_at, timezone) → 발송 대상 (roster는 매번 다시 읽어 수정사항 반영) """
+        if not self.roster:
+            return {(DAEMON_SEND_AT, DAEMON_TIMEZONE): []}
+        groups = {}
+        for e in load_roster(self.roster):
+            key = (e.send_at or DAEMON_SEND_AT, e.timezone or DAEMON_TIMEZONE)
+            groups.setdefault(key, []).append(e)
+        return groups
+
+    def _run_group(self, key: tuple[str, str], entries: list):
+        send_at, tz_name = key
+        try:
+            if not self.roster:
+                notifier.main()
+                return
+            results = run_batch(entries, concurrency=self.concurrency)
+            write_report(results, self.report)
+            ok = sum(r.ok for r in results)
+            _log(f"{send_at} ({tz_name}) 배치 발송 ✔ 성공 {ok} / 실패 {len(results) - ok}")
+        except Exception as e:
+            # 한 번 실패해도 데몬은 계속 동작
+            _log(f"{send_at} ({tz_name}) 발송 실패: {e}")
+
+    def _reload(self, now: datetime):
+        """ roster 다시 읽기 — 새로 생긴 그룹은 다음 발송 시각 계산, 사라진 그룹은 제거 """
+        try:
+            groups = self._groups()
+            next_runs = {key: self.next_runs.get(key) or next_fire(*key, after=now) for key in groups}
+        except Exception as e:
+            # 잘못된 행(좌표 누락, 알 수 없는 시간대 등)이 있으면 마지막으로 정상이던 목록으로 계속
+            _log(f"roster 읽기 실패, 이전 목록으로 계속: {e}")
+            return
+        self.groups, self.next_runs = groups, next_runs
+
+    def tick(self, now: datetime):
+        self._reload(now)
+        for key, fire_at in sorted(self.next_runs.items(), key=lambda kv: kv[1]):
+            if fire_at <= now:
+                self._run_group(key, self.groups[key])
+                self.next_runs[key] = next_fire(*key, after=max(now, fire_at))
+        self._compact_history(now)
+
+    def _compact_history(self, now: datetime):
+        """ 관측 이력 압축은 하루 한 번 """
+        store = notifier.get_history_store()
+        if not store or self.last_compact == now.date():
+            return
+        self.last_compact = now.date()
+        try:
+            deleted = store.compact(HISTORY_KEEP_DAYS, HISTORY_RETAIN_DAYS)
+            if deleted:
+                _log(f"관측 이력 압축 ✔ {deleted}행 정리")
+        except Exception as e:
+            _log(f"관측 이력 압축 실패: {e}")
+
+    def run_forever(self):
+        warm_up()
+        self.tick(datetime.now(timezone.utc))
+        for key, fire_at in sorted(self.next_runs.items(), key=lambda kv: kv[1]):
+            _log(f"다음 발송: {key[0]} ({key[1]}) → {fire_at.astimezone(ZoneInfo(key[1])):%Y-%m-%d %H:%M}")
+
+        while not self.stop_event.is_set():
+            now = datetime.now(timezone.utc)
+            wait = min((t - now).total_seconds() for t in self.next_runs.values()) if self.next_runs else MAX_SLEEP
+            if self.stop_event.wait(timeout=min(max(wait, 0), MAX_SLEEP)):
+                break
+            self.tick(datetime.now(timezone.utc))
+        _log("데몬 종료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카카오 날씨 알림이 — 데몬 모드")
+    parser.add_argument("--roster", help="수신자 목록 (CSV 또는 JSONL, send_at/timezone 컬럼 사용)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "8")))
+    parser.add_argument("--report", default="batch_report.csv", help="배치 결과 리포트 경로")
+    args = parser.parse_args()
+
+    scheduler = Scheduler(args.roster, args.concurrency, args.report)
+    signal.signal(signal.SIGINT, lambda *_: scheduler.stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.stop_event.set())
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# 파일명: history.py
+"""
+관측값 이력 저장소 (SQLite, 추가 전용)
+
+- Open-Meteo 조회 결과를 (location_key, observed_at) 기준으로 쌓아 둠
+- 여러 위치를 한 번에 조회하는 범위 쿼리, 오래된 행 압축(하루 1건만 유지) 지원
+- 어제 같은 시각 관측값과 비교한 변화량(기온 등)을 요약에 전달 → 과거 데이터 API 호출 불필요
+
+사용법:
+    python history.py compact   # 압축/정리만 수동 실행
+"""
+import os
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+from weather_rules import observation
+
+# 어제 같은 시각 ± 이 범위 안의 관측값만 비교 대상으로 사용
+COMPARE_WINDOW = timedelta(hours=3)
+
+VALUE_COLUMNS = ("temperature", "apparent", "humidity", "precipitation", "weather_code", "wind")
+
+
+def location_key(lat, lon) -> str:
+    """ 같은 좌표를 같은 키로 묶도록 소수점 4자리로 정규화 """
+    return f"{float(lat):.4f},{float(lon):.4f}"
+
+
+def observed_at(weather_json: dict) -> datetime:
+    """ current.time(현지 시각) + utc_offset_seconds → UTC 시각 """
+    current = weather_json.get("current") or {}
+    offset = timezone(timedelta(seconds=int(weather_json.get("utc_offset_seconds") or 0)))
+    if current.get("time"):
+        return datetime.fromisoformat(current["time"]).replace(tzinfo=offset).astimezone(timezone.utc)
+    return datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+class ObservationStore:
+    def __init__(self, path: str = "weather_history.db"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS observations ("
+            " location_key TEXT NOT NULL,"
+            " observed_at INTEGER NOT NULL,"     # UTC epoch seconds
+            " local_date TEXT NOT NULL,"         # 압축 기준 (현지 날짜)
+            " temperature REAL, apparent REAL, humidity REAL,"
+            " precipitation REAL, weather_code INTEGER, wind REAL,"
+            " raw TEXT,"
+            " PRIMARY KEY (location_key, observed_at)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    # ---------- 기록 ----------
+    def append_many(self, observations: dict[str, dict]):
+        """ {location_key: weather_json} — 같은 (위치, 시각)은 한 번만 저장 """
+        rows = []
+        for key, weather_json in observations.items():
+            at = observed_at(weather_json)
+            local_date = (weather_json.get("current") or {}).get("time", at.isoformat())[:10]
+            obs = observation(weather_json)
+            rows.append((
+                key, int(at.timestamp()), local_date,
+                *(obs[c] for c in VALUE_COLUMNS),
+                json.dumps(weather_json, ensure_ascii=False),
+            ))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO observations"
+                " (location_key, observed_at, local_date, temperature, apparent, humidity,"
+                "  precipitation, weather_code, wind, raw)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    # ---------- 조회 ----------
+    def query_range(self, location_keys: list[str], start: datetime, end: datetime) -> list[dict]:
+        """ 여러 위치의 [start, end] 구간 관측값 (raw 제외) """
+        if not location_keys:
+            return []
+        marks = ",".join("?" * len(location_keys))
+        sql = (
+            f"SELECT location_key, observed_at, {', '.join(VALUE_COLUMNS)} FROM observations"
+            f" WHERE location_key IN ({marks}) AND observed_at BETWEEN ? AND ?"
+            " ORDER BY location_key, observed_at"
+        )
+        with self._lock:
+            cur = self._conn.execute(sql, (*location_keys, int(start.timestamp()), int(end.timestamp())))
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def day_over_day(self, observations: dict[str, dict]) -> dict[str, dict]:
+        """
+        {location_key: weather_json} → {location_key: {"temperature": 오늘-어제, ...}}
+        어제 같은 시각 근처 관측값이 없으면 결과에서 빠짐 (범위 쿼리 1회)
+        """
+        if not observations:
+            return {}
+        targets = {k: observed_at(w) - timedelta(days=1) for k, w in observations.items()}
+        rows = self.query_range(
+            list(targets),
+            min(targets.values()) - COMPARE_WINDOW,
+            max(targets.values()) + COMPARE_WINDOW,
+        )
+
+        nearest: dict[str, dict] = {}
+        for row in rows:
+            target = int(targets[row["location_key"]].timestamp())
+            gap = abs(row["observed_at"] - target)
+            if gap > COMPARE_WINDOW.total_seconds():
+                continue
+            best = nearest.get(row["location_key"])
+            if best is None or gap < abs(best["observed_at"] - target):
+                nearest[row["location_key"]] = row
+
+        deltas = {}
+        for key, prev in nearest.items():
+            obs = observation(observations[key])
+            deltas[key] = {
+                c: round(obs[c] - prev[c], 1)
+                for c in ("temperature", "apparent", "humidity")
+                if obs[c] is not None and prev[c] is not None
+            }
+        return deltas
+
+    # ---------- 정리 ----------
+    def compact(self, keep_days: int = 7, retain_days: int = 365) -> int:
+        """
+        keep_days보다 오래된 행은 위치/날짜별 첫 관측 1건만 남기고,
+        retain_days보다 오래된 행은 삭제. 삭제된 행 수 반환
+        """
+        now = datetime.now(timezone.utc)
+        keep_cutoff = int((now - timedelta(days=keep_days)).timestamp())
+        retain_cutoff = int((now - timedelta(days=retain_days)).timestamp())
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM observations WHERE observed_at < ?", (retain_cutoff,)
+            ).rowcount
+            deleted += self._conn.execute(
+                "DELETE FROM observations WHERE observed_at < ?"
+                " AND (location_key, observed_at) NOT IN ("
+                "  SELECT location_key, MIN(observed_at) FROM observations"
+                "  WHERE observed_at < ? GROUP BY location_key, local_date)",
+                (keep_cutoff, keep_cutoff),
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 관측 이력 관리")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("--db", default=os.getenv("HISTORY_DB_PATH", "weather_history.db"))
+    parser.add_argument("--keep-days", type=int, default=int(os.getenv("HISTORY_KEEP_DAYS", "7")))
+    parser.add_argument("--retain-days", type=int, default=int(os.getenv("HISTORY_RETAIN_DAYS", "365")))
+    args = parser.parse_args()
+
+    store = ObservationStore(args.db)
+    deleted = store.compact(args.keep_days, args.retain_days)
+    print(f"이력 압축 완료 ✔ {deleted}행 정리")
+
+
+if __name__ == "__main__":
+    main()
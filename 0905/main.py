@@ -1,11 +1,19 @@
 import os
 import json
 import requests
+import threading
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 import google.generativeai as genai
 from typing import Optional
 
+from weather_rules import render_summary
+from summary_cache import SummaryCache, weather_fingerprint
+from token_store import KakaoTokenStore
+from history import ObservationStore, location_key
+
 # =========================================
 # 0) 환경 로드
 # =========================================
@@ -49,17 +57,37 @@ def require_lat_lon() -> tuple[str, str]:
     return LAT, LON
 
 
+# =========================================
+# HTTP 세션 (keep-alive 연결 재사용)
+#  - 호스트별 Session을 프로세스 안에서 공유 → 배치/데몬에서 TLS 핸드셰이크 1회
+# =========================================
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", os.getenv("BATCH_CONCURRENCY", "8")))
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def http_session(name: str) -> requests.Session:
+    """ name: open_meteo / kakao_api / kakao_auth """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(HTTP_POOL_SIZE, 1))
+            session.mount("https://", adapter)
+            _sessions[name] = session
+        return session
+
+
 # =========================================
 # 1) Open-Meteo (키 불필요)
 # https://open-meteo.com/
 # =========================================
-def fetch_open_meteo_current(lat: str, lon: str) -> dict:
-    """
-    Open-Meteo 현재 기상 + 체감온도/습도/강수/풍속 등 수집
-    API 키 불필요
-    """
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def _open_meteo_params(lat: str, lon: str) -> dict:
+    return {
         "latitude": lat,
         "longitude": lon,
         "current": ",".join([
@@ -72,28 +100,171 @@ def fetch_open_meteo_current(lat: str, lon: str) -> dict:
         ]),
         "timezone": "Asia/Seoul",
     }
-    r = requests.get(url, params=params, timeout=12)
+
+
+def fetch_open_meteo_current(lat: str, lon: str) -> dict:
+    """
+    Open-Meteo 현재 기상 + 체감온도/습도/강수/풍속 등 수집
+    API 키 불필요
+    """
+    r = http_session("open_meteo").get(OPEN_METEO_URL, params=_open_meteo_params(lat, lon), timeout=12)
     r.raise_for_status()
     return r.json()
 
 
+def fetch_open_meteo_many(coords: list[tuple[str, str]]) -> list[dict]:
+    """
+    여러 위치를 한 번의 요청으로 조회 (위경도를 콤마로 이어 붙임)
+    응답 순서는 coords 순서와 같음
+    """
+    if not coords:
+        return []
+    lats = ",".join(str(lat) for lat, _ in coords)
+    lons = ",".join(str(lon) for _, lon in coords)
+    r = http_session("open_meteo").get(OPEN_METEO_URL, params=_open_meteo_params(lats, lons), timeout=20)
+    r.raise_for_status()
+    payload = r.json()
+    # 위치가 1개면 dict, 여러 개면 list로 응답함
+    return payload if isinstance(payload, list) else [payload]
+
+
 # =========================================
-# 2) Gemini 요약/코멘트 생성
-#    - 원본 JSON을 그대로 넣고, 모델이 필요한 수치/상태를 뽑아 요약하게 함
+# 1-1) 관측 이력 (어제 대비 변화 계산용, 경로를 비우면 끔)
 # =========================================
-def build_weather_summary(weather_json: dict, city_name: str) -> str:
-    require(GOOGLE_API_KEY, "GOOGLE_API_KEY")
-    genai.configure(api_key=GOOGLE_API_KEY)
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "weather_history.db")
 
-    # 빠르고 저렴: gemini-1.5-flash / 더 고품질: gemini-1.5-pro
-    model = genai.GenerativeModel("gemini-1.5-flash")
+_history_store: Optional[ObservationStore] = None
+
+
+def get_history_store() -> Optional[ObservationStore]:
+    global _history_store
+    if _history_store is None and HISTORY_DB_PATH:
+        _history_store = ObservationStore(HISTORY_DB_PATH)
+    return _history_store
+
+
+def record_observations(observations: dict[str, dict]) -> dict[str, dict]:
+    """
+    {location_key: weather_json}을 이력에 추가하고 어제 대비 변화량 반환
+    이력 저장 실패는 발송을 막지 않음
+    """
+    store = get_history_store()
+    if not store:
+        return {}
+    try:
+        trends = store.day_over_day(observations)
+        store.append_many(observations)
+        return trends
+    except Exception as e:
+        print(f"[경고] 관측 이력 처리 실패: {e}")
+        return {}
 
+
+# =========================================
+# 2) 날씨 요약 생성
+#    - rule   : 규칙 기반 렌더링만 (Gemini 호출 없음, 기본값)
+#    - comment: 규칙 기반 + "코멘트" 한 줄만 Gemini로 생성
+#    - llm    : 원본 JSON을 그대로 Gemini에 넣어 전체 요약 생성 (기존 방식)
+# =========================================
+SUMMARY_MODES = ("rule", "comment", "llm")
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "rule")
+
+# Gemini를 쓰는 방식(comment/llm)은 비슷한 조건이면 이전 결과를 재사용
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "summary_cache.db")
+SUMMARY_CACHE_TTL  = int(os.getenv("SUMMARY_CACHE_TTL", str(6 * 3600)))
+SUMMARY_CACHE_MAX  = int(os.getenv("SUMMARY_CACHE_MAX", "5000"))
+
+_summary_cache: Optional[SummaryCache] = None
+
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """ SUMMARY_CACHE_PATH를 비우면 캐시 사용 안 함 """
+    global _summary_cache
+    if _summary_cache is None and SUMMARY_CACHE_PATH:
+        _summary_cache = SummaryCache(SUMMARY_CACHE_PATH, SUMMARY_CACHE_TTL, SUMMARY_CACHE_MAX)
+    return _summary_cache
+
+
+def _today_label() -> str:
     # Windows 일부 로케일에서 %-m/%-d 미지원 → 안전 처리
     try:
-        today = datetime.now(KST).strftime("%-m/%-d(%a)")
+        return datetime.now(KST).strftime("%-m/%-d(%a)")
     except:
-        today = datetime.now(KST).strftime("%m/%d(%a)")
+        return datetime.now(KST).strftime("%m/%d(%a)")
+
+
+@lru_cache(maxsize=1)
+def _gemini_model():
+    """ configure/모델 생성은 프로세스당 1회 """
+    require(GOOGLE_API_KEY, "GOOGLE_API_KEY")
+    genai.configure(api_key=GOOGLE_API_KEY)
+    # 빠르고 저렴: gemini-1.5-flash / 더 고품질: gemini-1.5-pro
+    return genai.GenerativeModel("gemini-1.5-flash")
+
+
+def _normalize_text(text: str) -> str:
+    # 카카오 텍스트 템플릿은 1,000자 전후에서 잘릴 수 있음 → 안전하게 제한
+    # 개행 normalize (CRLF/CR → LF)
+    return text.replace("\r\n", "\n").replace("\r", "\n")[:950]
+
+
+def build_weather_summary(weather_json: dict, city_name: str, mode: Optional[str] = None,
+                          trend: Optional[dict] = None) -> str:
+    """ trend: 어제 같은 시각 대비 변화량 (history.ObservationStore.day_over_day) """
+    mode = mode or SUMMARY_MODE
+    if mode not in SUMMARY_MODES:
+        raise RuntimeError(f"SUMMARY_MODE는 {SUMMARY_MODES} 중 하나여야 합니다: {mode}")
+
+    today = _today_label()
+    if mode == "rule":
+        return _normalize_text(render_summary(weather_json, city_name, today, trend=trend))
+
+    cache = get_summary_cache()
+    # comment 모드는 추세 문구를 렌더링 때 붙이므로 키에서 제외
+    key = weather_fingerprint(weather_json, city_name, datetime.now(KST).strftime("%Y-%m-%d"), mode,
+                              trend=trend if mode == "llm" else None)
+    cached = cache.get(key) if cache else None
+
+    if mode == "llm":
+        if cached:
+            return cached
+        text = _build_weather_summary_llm(weather_json, city_name, today, trend)
+        if cache and text:
+            cache.put(key, text)
+        return text
+
+    # comment 모드는 코멘트 한 줄만 캐시 → 수치는 항상 실제 관측값으로 렌더링
+    comment = cached
+    if not comment:
+        # 코멘트 생성 실패 시 규칙 기반 코멘트로 대체 (발송은 막지 않음)
+        try:
+            comment = _gemini_comment(render_summary(weather_json, city_name, today))
+        except Exception as e:
+            print(f"[경고] Gemini 코멘트 생성 실패, 규칙 기반으로 대체: {e}")
+        if cache and comment:
+            cache.put(key, comment)
+    return _normalize_text(render_summary(weather_json, city_name, today, comment=comment, trend=trend))
+
+
+def _gemini_comment(summary: str) -> Optional[str]:
+    """ 규칙 기반 요약을 보고 '코멘트' 한 문장만 생성 """
+    prompt = f"""
+너는 일기예보 요약 도우미야. 아래 날씨 요약을 보고 하루 생활 팁을 **한 문장**으로만 써.
+과장 없이 사실 위주, 딱딱하지 않게 간결히. 다른 말은 붙이지 마.
 
+{summary}
+"""
+    resp = _gemini_model().generate_content(
+        prompt,
+        generation_config={"temperature": 0.2, "max_output_tokens": 80},
+    )
+    text = " ".join((resp.text or "").split())
+    return text.removeprefix("- 코멘트:").strip() or None
+
+
+def _build_weather_summary_llm(weather_json: dict, city_name: str, today: str,
+                               trend: Optional[dict] = None) -> str:
+    """ 원본 JSON을 그대로 넣고, 모델이 필요한 수치/상태를 뽑아 요약하게 함 """
     prompt = f"""
 너는 일기예보 요약 도우미야. 아래는 Open-Meteo의 현재 날씨 응답 JSON이야.
 다음 형식을 **그대로** 한국어로, 최대 6~8줄 내로 출력해.
@@ -109,20 +280,19 @@ def build_weather_summary(weather_json: dict, city_name: str) -> str:
 - 숫자는 반올림해 깔끔히.
 - 정보가 없으면 "정보 없음"으로 적어.
 - 과장 없이 사실 위주, 딱딱하지 않게 간결히.
+- 어제 대비 변화가 있으면 코멘트에 자연스럽게 한 마디 넣어.
+
+<어제 같은 시각 대비 변화 (오늘 - 어제)>
+{json.dumps(trend or "정보 없음", ensure_ascii=False)}
 
 <원본 JSON>
 {json.dumps(weather_json, ensure_ascii=False)}
 """
-    resp = model.generate_content(
+    resp = _gemini_model().generate_content(
         prompt,
         generation_config={"temperature": 0.2, "max_output_tokens": 512},
     )
-    text = (resp.text or "").strip()
-
-    # 카카오 텍스트 템플릿은 1,000자 전후에서 잘릴 수 있음 → 안전하게 제한
-    # 개행 normalize (CRLF/CR → LF)
-    text = text.replace("\r\n", "\n").replace("\r", "\n")[:950]
-    return text
+    return _normalize_text((resp.text or "").strip())
 
 
 # =========================================
@@ -141,14 +311,19 @@ def kakao_send_text(message: str, access_token: str) -> requests.Response:
         "button_title": "자세히 보기",
     }
     data = {"template_object": json.dumps(template_object, ensure_ascii=False)}
-    return requests.post(url, headers=headers, data=data, timeout=12)
+    return http_session("kakao_api").post(url, headers=headers, data=data, timeout=12)
 
 
 # =========================================
-# 4) Kakao Access Token 갱신 (+ .env에 반영)
+# 4) Kakao Access Token 갱신 (+ 토큰 저장소에 반영)
 # =========================================
-def kakao_refresh_access_token() -> str:
-    require(KAKAO_REFRESH_TOKEN, "KAKAO_REFRESH_TOKEN")
+KAKAO_TOKEN_STORE = os.getenv("KAKAO_TOKEN_STORE", "kakao_tokens.json")
+
+_token_store: Optional[KakaoTokenStore] = None
+
+
+def kakao_refresh_access_token(refresh_token: str) -> dict:
+    """ 갱신 응답 전체를 반환 (access_token, expires_in, 선택: refresh_token) """
     require(KAKAO_REST_KEY, "KAKAO_REST_KEY")
     require(KAKAO_REDIRECT_URI, "KAKAO_REDIRECT_URI")
 
@@ -156,51 +331,22 @@ def kakao_refresh_access_token() -> str:
     data = {
         "grant_type": "refresh_token",
         "client_id": KAKAO_REST_KEY,
-        "refresh_token": KAKAO_REFRESH_TOKEN,
+        "refresh_token": refresh_token,
         "redirect_uri": KAKAO_REDIRECT_URI,
     }
-    r = requests.post(url, data=data, timeout=12)
+    r = http_session("kakao_auth").post(url, data=data, timeout=12)
     r.raise_for_status()
-    payload = r.json()
-    new_access = payload.get("access_token")
-    if not new_access:
-        raise RuntimeError(f"카카오 토큰 갱신 실패: {payload}")
-
-    # .env의 KAKAO_ACCESS_TOKEN 값을 교체 저장(간단 구현)
-    _update_env_file("KAKAO_ACCESS_TOKEN", new_access)
-
-    # (선택) 새 refresh_token이 오면 교체
-    if "refresh_token" in payload and payload["refresh_token"]:
-        _update_env_file("KAKAO_REFRESH_TOKEN", payload["refresh_token"])
-
-    return new_access
+    return r.json()
 
 
-def _update_env_file(key: str, value: str, env_path: str = ".env"):
-    """ .env 파일에서 key=... 라인을 찾아 값 교체. 없으면 추가. """
-    try:
-        if not os.path.exists(env_path):
-            with open(env_path, "w", encoding="utf-8") as f:
-                f.write(f"{key}={value}\n")
-            return
-
-        with open(env_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        found = False
-        for i, line in enumerate(lines):
-            if line.strip().startswith(f"{key}="):
-                lines[i] = f"{key}={value}\n"
-                found = True
-                break
-        if not found:
-            lines.append(f"{key}={value}\n")
-
-        with open(env_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
-    except Exception as e:
-        # .env 저장 실패는 치명적이진 않으므로 경고만
-        print(f"[경고] .env 갱신 실패({key}): {e}")
+def get_token_store() -> KakaoTokenStore:
+    """ 최초 1회 .env의 토큰으로 저장소를 채우고, 이후에는 저장소 값을 사용 """
+    global _token_store
+    if _token_store is None:
+        store = KakaoTokenStore(KAKAO_TOKEN_STORE, kakao_refresh_access_token)
+        store.seed(KAKAO_ACCESS_TOKEN, KAKAO_REFRESH_TOKEN)
+        _token_store = store
+    return _token_store
 
 
 # =========================================
@@ -212,18 +358,20 @@ def main():
 
     # 2) 날씨 조회 (Open-Meteo)
     weather_json = fetch_open_meteo_current(lat, lon)
+    key = location_key(lat, lon)
+    trend = record_observations({key: weather_json}).get(key)
 
-    # 3) Gemini 요약/코멘트
-    message = build_weather_summary(weather_json, CITY_NAME)
+    # 3) 요약/코멘트 (SUMMARY_MODE)
+    message = build_weather_summary(weather_json, CITY_NAME, trend=trend)
 
-    # 4) 카카오 발송 (401이면 토큰 갱신 → 1회 재시도)
-    require(KAKAO_ACCESS_TOKEN, "KAKAO_ACCESS_TOKEN")
-    resp = kakao_send_text(message, KAKAO_ACCESS_TOKEN)
+    # 4) 카카오 발송 (만료 임박 토큰은 저장소가 미리 갱신)
+    store = get_token_store()
+    access_token = require(store.get_access_token(), "KAKAO_ACCESS_TOKEN")
+    resp = kakao_send_text(message, access_token)
 
     if resp.status_code == 401:
-        # 토큰 갱신 후 재시도
-        new_access = kakao_refresh_access_token()
-        resp = kakao_send_text(message, new_access)
+        # 만료 시각을 모르는 토큰(.env 초기값)이거나 폐기된 경우만 → 갱신 후 1회 재시도
+        resp = kakao_send_text(message, store.force_refresh(access_token))
 
     if not resp.ok:
         raise RuntimeError(f"카카오 전송 실패: {resp.status_code} {resp.text}")
@@ -0,0 +1,109 @@
+# 파일명: summary_cache.py
+"""
+비슷한 날씨 조건이면 이전에 생성한 요약을 재사용하는 영구 캐시 (SQLite)
+
+- 키: 관측값을 구간화(quantize)한 지문 + 지역명 + 날짜 + 요약 방식
+- TTL이 지난 항목과 최대 개수를 넘는 항목(오래 안 쓴 순)은 자동 삭제
+- hits/misses 카운터로 Gemini 호출 절약량 확인
+"""
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+from weather_rules import observation
+
+
+def _bucket(value: Optional[float], edges: tuple) -> Optional[int]:
+    """ edges 경계 기준 구간 번호 (None이면 None) """
+    if value is None:
+        return None
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return i
+    return len(edges)
+
+
+def _round(value: Optional[float]) -> Optional[int]:
+    return None if value is None else round(value)
+
+
+def weather_fingerprint(weather_json: dict, city_name: str, date: str, mode: str,
+                        trend: Optional[dict] = None) -> str:
+    obs = observation(weather_json)
+    parts = [
+        mode,
+        city_name,
+        date,
+        _round((trend or {}).get("temperature")),
+        _round(obs["temperature"]),
+        _round(obs["apparent"]),
+        _bucket(obs["humidity"], (20, 30, 40, 50, 60, 70, 80, 90)),
+        obs["weather_code"],
+        _bucket(obs["precipitation"], (0.01, 0.5, 2, 5, 10)),
+        _bucket(obs["wind"], (2, 4, 7, 10, 14)),
+    ]
+    raw = "|".join("-" if p is None else str(p) for p in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, path: str = "summary_cache.db", ttl_seconds: int = 6 * 3600, max_entries: int = 5000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_summaries_last_used ON summaries(last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, text: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries(key, text, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, text, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM summaries WHERE key IN ("
+            " SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
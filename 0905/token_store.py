@@ -0,0 +1,152 @@
+# 파일명: token_store.py
+"""
+카카오 토큰 저장소 — .env 재작성을 대체
+
+- 갱신 응답의 expires_in으로 만료 시각을 기록하고, 만료 전에 미리 갱신
+- 파일 잠금 + 임시 파일 교체(os.replace)로 여러 프로세스가 동시에 써도 안전
+- 한 계정의 갱신은 한 번만 수행(single-flight): 스레드 잠금 → 파일 잠금 → 재확인 후 갱신
+"""
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+DEFAULT_ACCOUNT = "default"
+
+
+@contextmanager
+def file_lock(lock_path: str):
+    """ 프로세스 간 배타 잠금 (Windows: msvcrt, 그 외: fcntl) """
+    with open(lock_path, "a+") as f:
+        if os.name == "nt":
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class KakaoTokenStore:
+    """
+    refresh_fn(refresh_token) → 카카오 토큰 갱신 응답(dict)
+        {"access_token", "expires_in", ("refresh_token", "refresh_token_expires_in")}
+    """
+
+    def __init__(self, path: str, refresh_fn: Callable[[str], dict], refresh_margin: int = 600):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.refresh_fn = refresh_fn
+        self.refresh_margin = refresh_margin
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------- 파일 입출력 ----------
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, data: dict):
+        """ 같은 폴더의 임시 파일에 쓰고 os.replace로 교체 (원자적) """
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".kakao_tokens.", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _account_lock(self, account: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(account, threading.Lock())
+
+    # ---------- 공개 API ----------
+    def seed(self, access_token: Optional[str], refresh_token: Optional[str], account: str = DEFAULT_ACCOUNT):
+        """ 저장소에 계정이 없을 때만 초기 토큰 등록 (.env/roster 값) """
+        if account in self._read():
+            return
+        with self._account_lock(account), file_lock(self.lock_path):
+            data = self._read()
+            if account in data:
+                return
+            data[account] = {
+                "access_token": access_token or "",
+                "refresh_token": refresh_token or "",
+                "expires_at": None,   # 모름 → 401을 받으면 그때 갱신
+            }
+            self._write(data)
+
+    def _is_fresh(self, entry: Optional[dict]) -> bool:
+        if not entry or not entry.get("access_token"):
+            return False
+        expires_at = entry.get("expires_at")
+        return expires_at is None or expires_at - time.time() > self.refresh_margin
+
+    def get_access_token(self, account: str = DEFAULT_ACCOUNT) -> str:
+        """ 만료 refresh_margin초 전이면 미리 갱신한 토큰을 돌려줌 """
+        entry = self._read().get(account)
+        if self._is_fresh(entry):
+            return entry["access_token"]
+        return self._refresh(account, lambda e: self._is_fresh(e))
+
+    def force_refresh(self, stale_token: str, account: str = DEFAULT_ACCOUNT) -> str:
+        """ 예상치 못한 401 대응: 다른 작업자가 이미 바꿨으면 그 토큰을 사용 """
+        return self._refresh(
+            account, lambda e: bool(e) and e.get("access_token") not in ("", stale_token)
+        )
+
+    def _refresh(self, account: str, still_valid: Callable[[Optional[dict]], bool]) -> str:
+        with self._account_lock(account), file_lock(self.lock_path):
+            # 잠금을 기다리는 동안 다른 스레드/프로세스가 갱신했을 수 있음
+            data = self._read()
+            entry = data.get(account)
+            if still_valid(entry):
+                return entry["access_token"]
+            if not entry or not entry.get("refresh_token"):
+                raise RuntimeError(f"카카오 refresh_token 없음 (계정: {account})")
+
+            payload = self.refresh_fn(entry["refresh_token"])
+            new_access = payload.get("access_token")
+            if not new_access:
+                raise RuntimeError(f"카카오 토큰 갱신 실패: {payload}")
+
+            now = time.time()
+            entry = dict(entry)
+            entry["access_token"] = new_access
+            entry["expires_at"] = now + int(payload.get("expires_in", 0)) if payload.get("expires_in") else None
+            # (선택) 새 refresh_token이 오면 교체
+            if payload.get("refresh_token"):
+                entry["refresh_token"] = payload["refresh_token"]
+                if payload.get("refresh_token_expires_in"):
+                    entry["refresh_token_expires_at"] = now + int(payload["refresh_token_expires_in"])
+            data[account] = entry
+            self._write(data)
+            return new_access
@@ -0,0 +1,177 @@
+# 파일명: weather_rules.py
+"""
+Open-Meteo `current` 값으로 [오늘의 날씨] 요약을 규칙 기반으로 만드는 모듈
+(Gemini 호출 없이 동일한 6줄 형식을 즉시 생성)
+"""
+from typing import Optional
+
+# WMO weather_code → 한국어 상태
+# https://open-meteo.com/en/docs (WMO Weather interpretation codes)
+WMO_STATE = {
+    0: "맑음",
+    1: "대체로 맑음",
+    2: "구름 조금",
+    3: "흐림",
+    45: "안개",
+    48: "짙은 안개",
+    51: "약한 이슬비",
+    53: "이슬비",
+    55: "강한 이슬비",
+    56: "약한 어는 이슬비",
+    57: "어는 이슬비",
+    61: "약한 비",
+    63: "비",
+    65: "강한 비",
+    66: "약한 어는 비",
+    67: "어는 비",
+    71: "약한 눈",
+    73: "눈",
+    75: "강한 눈",
+    77: "싸락눈",
+    80: "약한 소나기",
+    81: "소나기",
+    82: "강한 소나기",
+    85: "약한 눈 소나기",
+    86: "강한 눈 소나기",
+    95: "뇌우",
+    96: "뇌우(약한 우박)",
+    99: "뇌우(강한 우박)",
+}
+
+DRIZZLE_CODES = {51, 53, 55, 56, 57}
+RAIN_CODES = {61, 63, 65, 66, 67, 80, 81, 82, 95, 96, 99}
+SNOW_CODES = {71, 73, 75, 77, 85, 86}
+
+NO_INFO = "정보 없음"
+
+
+def _num(current: dict, key: str) -> Optional[float]:
+    value = current.get(key)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt(value: Optional[float], unit: str) -> str:
+    return NO_INFO if value is None else f"{round(value)}{unit}"
+
+
+def wind_ms(weather_json: dict) -> Optional[float]:
+    """ 풍속을 m/s로 (Open-Meteo 기본 단위는 km/h) """
+    current = weather_json.get("current") or {}
+    wind = _num(current, "wind_speed_10m")
+    if wind is None:
+        return None
+    unit = (weather_json.get("current_units") or {}).get("wind_speed_10m", "km/h")
+    if unit == "km/h":
+        return wind / 3.6
+    if unit == "mp/h":
+        return wind * 0.44704
+    if unit == "kn":
+        return wind * 0.514444
+    return wind
+
+
+def observation(weather_json: dict) -> dict:
+    """ 요약에 필요한 값만 추려서 정리 (없으면 None) """
+    current = weather_json.get("current") or {}
+    code = _num(current, "weather_code")
+    return {
+        "temperature": _num(current, "temperature_2m"),
+        "apparent": _num(current, "apparent_temperature"),
+        "humidity": _num(current, "relative_humidity_2m"),
+        "precipitation": _num(current, "precipitation"),
+        "weather_code": int(code) if code is not None else None,
+        "wind": wind_ms(weather_json),
+    }
+
+
+def weather_state(code: Optional[int]) -> str:
+    if code is None:
+        return NO_INFO
+    return WMO_STATE.get(code, NO_INFO)
+
+
+def precipitation_level(obs: dict) -> str:
+    code, precip = obs["weather_code"], obs["precipitation"]
+    if code is None and precip is None:
+        return NO_INFO
+    if code in RAIN_CODES or code in SNOW_CODES or (precip or 0) >= 1.0:
+        return "있음"
+    if code in DRIZZLE_CODES or (precip or 0) > 0:
+        return "약함"
+    if code == 3 or code in (45, 48):
+        return "낮음"
+    return "없음"
+
+
+def umbrella_advice(obs: dict) -> str:
+    level = precipitation_level(obs)
+    if level == NO_INFO:
+        return NO_INFO
+    if level == "있음":
+        return "필요"
+    if level == "약함":
+        return "선택"
+    return "불필요"
+
+
+def rule_comment(obs: dict) -> str:
+    """ 하루 생활 팁 한 문장 """
+    code = obs["weather_code"]
+    temp = obs["apparent"] if obs["apparent"] is not None else obs["temperature"]
+    wind = obs["wind"]
+
+    if code is None and temp is None:
+        return NO_INFO
+    if code in SNOW_CODES:
+        return "눈길이 미끄러우니 여유 있게 이동하세요."
+    if code in RAIN_CODES:
+        return "우산 챙기시고 빗길 운전 조심하세요."
+    if code in DRIZZLE_CODES:
+        return "가벼운 비 소식이 있으니 작은 우산을 챙기면 좋아요."
+    if code in (45, 48):
+        return "안개로 시야가 짧으니 이동 시 주의하세요."
+    if temp is not None and temp >= 30:
+        return "무더우니 물 자주 마시고 한낮 야외활동은 줄이세요."
+    if temp is not None and temp <= 0:
+        return "많이 추우니 목도리와 장갑으로 따뜻하게 입으세요."
+    if wind is not None and wind >= 9:
+        return "바람이 강하니 겉옷을 단단히 여미세요."
+    if temp is not None and temp <= 10:
+        return "쌀쌀하니 겉옷을 챙기세요."
+    return "무난한 날씨예요, 가볍게 외출하기 좋아요."
+
+
+def trend_phrase(trend: Optional[dict]) -> Optional[str]:
+    """ 어제 같은 시각 대비 기온 변화 한 마디 (history.day_over_day 결과) """
+    delta = (trend or {}).get("temperature")
+    if delta is None:
+        return None
+    if abs(delta) < 1:
+        return "어제와 기온이 비슷해요"
+    return f"어제보다 {round(abs(delta))}도 {'높아요' if delta > 0 else '낮아요'}"
+
+
+def render_summary(weather_json: dict, city_name: str, today: str,
+                   comment: Optional[str] = None, trend: Optional[dict] = None) -> str:
+    """
+    Gemini 프롬프트와 동일한 [오늘의 날씨] 형식으로 렌더링
+    comment가 없으면 규칙 기반 코멘트 사용, trend가 있으면 코멘트 앞에 어제 대비 변화 추가
+    """
+    obs = observation(weather_json)
+    comment = comment or rule_comment(obs)
+    phrase = trend_phrase(trend)
+    if phrase and comment != NO_INFO:
+        comment = f"{phrase}. {comment}"
+    lines = [
+        f"[오늘의 날씨] {city_name} | {today}",
+        f"- 현재: {weather_state(obs['weather_code'])}, "
+        f"기온 {_fmt(obs['temperature'], '°C')} (체감 {_fmt(obs['apparent'], '°C')})",
+        f"- 습도: {_fmt(obs['humidity'], '%')}, 바람: {_fmt(obs['wind'], ' m/s')}",
+        f"- 강수: {precipitation_level(obs)}",
+        f"- 우산: {umbrella_advice(obs)}",
+        f"- 코멘트: {comment}",
+    ]
+    return "\n".join(lines)
@@ -1,62 +1,53 @@
 # app.py
 import os
-import streamlit as st
-from dotenv import load_dotenv
-
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_community.utilities.arxiv import ArxivAPIWrapper
-
-# =========================
-# 0) 환경 로드
-# =========================
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
+import json
+import time
 
-# =========================
-# 1) Agent 없이 단순 검색 함수
-# =========================
-def tavily_search(query: str, max_results: int = 5):
-    if not TAVILY_API_KEY:
-        return "⚠️ TAVILY_API_KEY 없음"
-    tavily = TavilySearchResults(max_results=max_results)
-    return tavily.run(query)
+import streamlit as st
 
-def arxiv_search(query: str, top_k: int = 10):
-    arxiv = ArxivAPIWrapper(top_k_results=top_k, load_max_docs=10)
-    return arxiv.run(query)
+from writer import (
+    TAVILY_API_KEY,
+    CONTEXT_BUDGET,
+    tavily_search,
+    arxiv_search,
+    collect_sources,
+    stream_article,
+    get_research_cache,
+)
+from context_pack import pack_context
 
 # =========================
-# 2) LLM
+# 1) 생성 속도 기록
 # =========================
-def generate_article(topic, web_notes, paper_notes, model="gpt-4o-mini", temperature=0.2):
-    llm = ChatOpenAI(model=model, temperature=temperature, api_key=OPENAI_API_KEY)
-    system_msg = """당신은 한국어 블로거이자 SEO 전문가입니다.
-주제와 자료를 바탕으로 티스토리 블로그에 바로 게시할 수 있는 마크다운 글을 작성하세요.
-- 제목
-- 키워드
-- 개요
-- 본문 (소제목 포함)
-- FAQ
-- 출처 링크
-- 마무리"""
-    user_msg = f"""
-[주제]
-{topic}
-
-[웹 검색 요약]
-{web_notes}
-
-[논문 검색 요약]
-{paper_notes}
-"""
-    resp = llm.invoke([{"role": "system", "content": system_msg},
-                       {"role": "user", "content": user_msg}])
-    return resp.content
+# 모델별 생성 시간 기록 (rerun/재시작 후에도 비교할 수 있게 파일에 누적)
+METRICS_PATH = os.getenv("GEN_METRICS_PATH", "gen_metrics.jsonl")
+
+def record_metrics(model: str, ttft: float, total: float, chars: int, completed: bool):
+    row = {"model": model, "ttft": round(ttft, 3), "total": round(total, 3),
+           "chars": chars, "completed": completed, "at": time.time()}
+    with open(METRICS_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def load_metrics_summary():
+    """ 모델별 평균 첫 토큰 시간(TTFT)/전체 생성 시간 (완료된 생성만) """
+    if not os.path.exists(METRICS_PATH):
+        return []
+    stats = {}
+    with open(METRICS_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            if not row.get("completed"):
+                continue
+            s = stats.setdefault(row["model"], {"n": 0, "ttft": 0.0, "total": 0.0})
+            s["n"] += 1
+            s["ttft"] += row["ttft"]
+            s["total"] += row["total"]
+    return [{"모델": m, "횟수": s["n"],
+             "첫 토큰(초)": round(s["ttft"] / s["n"], 2),
+             "전체(초)": round(s["total"] / s["n"], 2)} for m, s in stats.items()]
 
 # =========================
-# 3) Streamlit UI
+# 2) Streamlit UI
 # =========================
 st.set_page_config(page_title="Tistory Writer (수동 발행)", page_icon="📝", layout="wide")
 st.title("📝 LangChain 블로그 초안 생성기")
@@ -67,6 +58,19 @@ with st.sidebar:
     temperature = st.slider("창의성(temperature)", 0.0, 1.0, 0.2, 0.1)
     max_web = st.slider("웹 검색 결과 수 (Tavily)", 3, 10, 5)
     max_papers = st.slider("논문 후보 수 (arXiv)", 1, 5, 3)
+    force_refresh = st.toggle("🔄 강제 새로고침 (검색 캐시 무시)", value=False)
+    context_budget = st.slider("참고 자료 토큰 예산", 500, 8000, CONTEXT_BUDGET, 250)
+    with st.expander("⏱ 모델별 생성 속도", expanded=False):
+        metrics_box = st.empty()
+
+def render_metrics():
+    rows = load_metrics_summary()
+    if rows:
+        metrics_box.dataframe(rows, hide_index=True, use_container_width=True)
+    else:
+        metrics_box.caption("아직 기록이 없습니다.")
+
+render_metrics()
 
 topic = st.text_area("주제/키워드 입력", height=140,
                      placeholder="예) 생성형 AI의 전자상거래 적용 사례와 한계")
@@ -76,22 +80,95 @@ if st.button("🔍 수집 & ✍️ 초안 생성", type="primary", use_container
         st.error("주제를 입력하세요.")
         st.stop()
 
-    with st.spinner("자료 수집 중..."):
-        web_notes = tavily_search(topic, max_web) if TAVILY_API_KEY else "(Tavily API 키 없음)"
-        paper_notes = arxiv_search(topic, max_papers)
-
     st.subheader("1) 자료 수집 결과")
+    # 두 소스를 동시에 수집하고, 먼저 끝난 소스부터 바로 표시
     with st.expander("웹 검색 요약", expanded=False):
-        st.json(web_notes)   # dict나 JSON 문자열이면 예쁘게 출력
+        web_box = st.empty()
+        web_box.caption("⏳ 수집 중...")
     with st.expander("논문 검색 요약", expanded=False):
-        st.text(paper_notes)
+        paper_box = st.empty()
+        paper_box.caption("⏳ 수집 중...")
 
-    with st.spinner("초안 생성 중..."):
-        markdown_article = generate_article(topic, web_notes, paper_notes,
-                                        model=openai_model, temperature=temperature)
+    jobs = {"web": lambda: tavily_search(topic, max_web), "paper": lambda: arxiv_search(topic, max_papers)}
+    params = {"web": {"max_results": max_web}, "paper": {"top_k": max_papers}}
+    if not TAVILY_API_KEY:
+        jobs.pop("web")
+        web_notes = "(Tavily API 키 없음)"
+        web_box.json(web_notes)
+
+    def show_source(name, result, error, cached=False):
+        global web_notes, paper_notes
+        label = "웹" if name == "web" else "논문"
+        if name == "web":
+            web_notes = result if error is None else f"(웹 검색 {error})"
+            web_box.json(web_notes)   # dict나 JSON 문자열이면 예쁘게 출력
+        else:
+            paper_notes = result if error is None else f"(논문 검색 {error})"
+            paper_box.text(paper_notes)
+        if cached:
+            st.caption(f"💾 {label} 검색: 캐시 결과 사용")
+        if error:
+            st.warning(f"{label} 검색: {error} — 해당 자료 없이 진행합니다.")
+
+    # 같은 검색어/파라미터는 캐시에서 바로 (강제 새로고침이면 건너뜀)
+    cache = get_research_cache()
+    if not force_refresh:
+        for name in list(jobs):
+            hit = cache.get(name, topic, **params[name])
+            if hit is not None:
+                jobs.pop(name)
+                show_source(name, hit, None, cached=True)
+
+    with st.spinner("자료 수집 중..."):
+        for name, result, error in collect_sources(jobs):
+            if error is None:
+                cache.put(name, topic, result, **params[name])
+            show_source(name, result, error)
+
+    packed = pack_context(topic, web_notes, paper_notes, context_budget)
+    st.caption(
+        f"📦 참고 자료 {packed.stats['passages']}단락 → {packed.stats['selected']}단락 사용 "
+        f"(중복 {packed.stats['duplicates']}개 제거, 약 {packed.stats['tokens']:,}토큰, 출처 {len(packed.sources)}개)"
+    )
 
     st.subheader("2) 마크다운 초안 (티스토리에 복사해 넣으세요)")
-    st.text_area("마크다운 결과", value=markdown_article, height=500)
+    # 중지 버튼을 누르면 Streamlit이 현재 실행을 멈추고 다시 실행 → 스트림도 함께 종료됨
+    st.button("⏹ 생성 중지")
+    status_box = st.empty()
+    draft_box = st.empty()
+
+    # 중단되더라도 지금까지 받은 내용은 다음 실행에서 보여줄 수 있게 세션에 보관
+    draft = {"topic": topic, "model": openai_model, "text": "", "done": False}
+    st.session_state["draft"] = draft
+    started = time.perf_counter()
+    ttft = None
+    status_box.caption(f"⏳ {openai_model} 응답 대기 중...")
+    try:
+        for piece in stream_article(topic, web_notes, paper_notes,
+                                    model=openai_model, temperature=temperature, packed=packed):
+            if ttft is None:
+                ttft = time.perf_counter() - started
+                status_box.caption(f"✍️ 생성 중... (첫 토큰 {ttft:.2f}초)")
+            draft["text"] += piece
+            draft_box.markdown(draft["text"] + "▌")
+        draft["done"] = True
+    finally:
+        # 중지(rerun)로 빠져나와도 기록은 남김 — 평균에는 완료된 생성만 반영
+        total = time.perf_counter() - started
+        record_metrics(openai_model, ttft if ttft is not None else total, total,
+                       len(draft["text"]), draft["done"])
+    render_metrics()
+    status_box.caption(f"✅ 완료 — 첫 토큰 {ttft or total:.2f}초 / 전체 {total:.2f}초 ({openai_model})")
+    draft_box.empty()
+    st.text_area("마크다운 결과", value=draft["text"], height=500)
 
     st.info("👉 위 마크다운을 복사해서 티스토리 글쓰기 창(마크다운 모드)에 붙여넣으세요.")
 
+elif st.session_state.get("draft"):
+    # 직전 초안 (중지 버튼으로 멈췄다면 받은 부분까지)
+    draft = st.session_state["draft"]
+    st.subheader("마크다운 초안 (직전 결과)")
+    if not draft["done"]:
+        st.warning(f"⏹ 생성이 중단되었습니다. ({draft['model']}, 받은 부분까지 표시)")
+    st.text_area("마크다운 결과", value=draft["text"], height=500)
+
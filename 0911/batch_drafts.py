@@ -0,0 +1,230 @@
+# batch_drafts.py
+"""
+헤드리스 배치 초안 생성 (Streamlit 없이 검색 → 초안 생성 파이프라인 실행)
+
+사용법:
+    python batch_drafts.py topics.csv --out-dir drafts --concurrency 4
+
+입력 (CSV 헤더 또는 JSONL 키):
+    topic   주제/키워드 (필수)
+    id      파일 이름/체크포인트용 식별자 (선택, 없으면 주제로 생성)
+
+- 주제별로 끝나는 즉시 <out-dir>/<id>.md 저장
+- 완료 목록은 <out-dir>/checkpoint.jsonl에 기록 → 중단 후 다시 실행하면 이어서 진행
+- 제공자(OpenAI/Tavily/arXiv)별 분당 요청 수 제한을 지키며 동시 실행
+"""
+import os
+import re
+import csv
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from writer import (
+    TAVILY_API_KEY,
+    CONTEXT_BUDGET,
+    SOURCE_TIMEOUT,
+    tavily_search,
+    arxiv_search,
+    collect_sources,
+    generate_article,
+    get_research_cache,
+)
+
+
+class RateLimiter:
+    """ 분당 요청 수(rpm) 제한 — 토큰 버킷, 여러 스레드가 공유 """
+
+    def __init__(self, rpm: float, burst: int = 1):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+
+# =========================
+# 1) 입력/체크포인트
+# =========================
+def load_topics(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    topics, seen = [], set()
+    for row in rows:
+        topic = (row.get("topic") or "").strip()
+        if not topic:
+            continue
+        given_id = (row.get("id") or "").strip()
+        topic_id = slugify(given_id, with_hash=False) if given_id else slugify(topic)
+        if topic_id in seen:
+            continue
+        seen.add(topic_id)
+        topics.append({"id": topic_id, "topic": topic})
+    return topics
+
+
+def slugify(text: str, with_hash: bool = True) -> str:
+    """ 파일 이름으로 쓸 수 있게 정리 (주제에서 만들 때는 충돌 방지용 짧은 해시 추가) """
+    slug = re.sub(r"[^\w\-]+", "-", text, flags=re.UNICODE).strip("-")[:60]
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+    if not with_hash and slug:
+        return slug
+    return f"{slug}-{digest}" if slug else digest
+
+
+def load_done(checkpoint_path: str) -> set:
+    if not os.path.exists(checkpoint_path):
+        return set()
+    done = set()
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue   # 중단 중 잘린 마지막 줄
+            if row.get("status") == "ok":
+                done.add(row["id"])
+    return done
+
+
+def write_atomic(path: str, text: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# =========================
+# 2) 주제 1건 처리
+# =========================
+class DraftRunner:
+    def __init__(self, args):
+        self.args = args
+        self.limits = {
+            "openai": RateLimiter(args.openai_rpm, burst=args.concurrency),
+            "web": RateLimiter(args.tavily_rpm, burst=args.concurrency),
+            # arXiv API는 3초에 1회 권장
+            "paper": RateLimiter(args.arxiv_rpm),
+        }
+        self.cache = get_research_cache()
+        self._checkpoint_lock = threading.Lock()
+
+    def research(self, topic: str):
+        args = self.args
+        params = {"web": {"max_results": args.max_web}, "paper": {"top_k": args.max_papers}}
+        notes = {"web": "(Tavily API 키 없음)", "paper": "(논문 검색 결과 없음)"}
+        jobs = {"paper": lambda: arxiv_search(topic, args.max_papers)}
+        if TAVILY_API_KEY:
+            jobs["web"] = lambda: tavily_search(topic, args.max_web)
+
+        for name in list(jobs):
+            hit = self.cache.get(name, topic, **params[name])
+            if hit is not None:
+                jobs.pop(name)
+                notes[name] = hit
+
+        # 요청 제한 대기는 이 주제의 스레드에서 미리 → 공유 수집 스레드(8개)를 대기로 잡아 두지 않고,
+        # source_timeout은 실제 검색 시간에만 적용
+        for name in jobs:
+            self.limits[name].acquire()
+        for name, result, error in collect_sources(jobs, timeout=args.source_timeout):
+            if error is None:
+                self.cache.put(name, topic, result, **params[name])
+                notes[name] = result
+            else:
+                notes[name] = f"({'웹' if name == 'web' else '논문'} 검색 {error})"
+        return notes["web"], notes["paper"]
+
+    def run(self, item: dict) -> dict:
+        args = self.args
+        started = time.perf_counter()
+        web_notes, paper_notes = self.research(item["topic"])
+
+        self.limits["openai"].acquire()
+        article = generate_article(item["topic"], web_notes, paper_notes,
+                                   model=args.model, temperature=args.temperature,
+                                   context_budget=args.context_budget)
+
+        path = os.path.join(args.out_dir, f"{item['id']}.md")
+        write_atomic(path, article)
+        return {"id": item["id"], "status": "ok", "path": path,
+                "seconds": round(time.perf_counter() - started, 2)}
+
+    def checkpoint(self, row: dict):
+        row["at"] = datetime.now().isoformat(timespec="seconds")
+        with self._checkpoint_lock, open(self.args.checkpoint, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+
+
+# =========================
+# 3) 메인
+# =========================
+def main():
+    parser = argparse.ArgumentParser(description="블로그 초안 배치 생성")
+    parser.add_argument("topics", help="주제 목록 (CSV 또는 JSONL, topic/id 컬럼)")
+    parser.add_argument("--out-dir", default="drafts")
+    parser.add_argument("--checkpoint", help="체크포인트 경로 (기본: <out-dir>/checkpoint.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--temperature", type=float, default=0.2)
+    parser.add_argument("--max-web", type=int, default=5)
+    parser.add_argument("--max-papers", type=int, default=3)
+    parser.add_argument("--context-budget", type=int, default=CONTEXT_BUDGET)
+    parser.add_argument("--source-timeout", type=float, default=SOURCE_TIMEOUT, help="소스별 검색 시간 제한(초)")
+    parser.add_argument("--openai-rpm", type=float, default=float(os.getenv("OPENAI_RPM", "60")))
+    parser.add_argument("--tavily-rpm", type=float, default=float(os.getenv("TAVILY_RPM", "60")))
+    parser.add_argument("--arxiv-rpm", type=float, default=float(os.getenv("ARXIV_RPM", "20")))
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    args.checkpoint = args.checkpoint or os.path.join(args.out_dir, "checkpoint.jsonl")
+
+    topics = load_topics(args.topics)
+    done = load_done(args.checkpoint)
+    todo = [t for t in topics if t["id"] not in done]
+    print(f"주제 {len(topics)}개 중 완료 {len(topics) - len(todo)}개 → {len(todo)}개 생성 시작")
+
+    runner = DraftRunner(args)
+    ok = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = {pool.submit(runner.run, item): item for item in todo}
+        for fut in as_completed(futures):
+            item = futures[fut]
+            try:
+                row = fut.result()
+                ok += 1
+                print(f"✔ [{ok + failed}/{len(todo)}] {item['id']} ({row['seconds']}초)")
+            except Exception as e:
+                row = {"id": item["id"], "status": "fail", "error": str(e)[:500]}
+                failed += 1
+                print(f"✘ [{ok + failed}/{len(todo)}] {item['id']}: {e}")
+            runner.checkpoint(row)
+
+    print(f"완료 ✔ 성공 {ok} / 실패 {failed} (다시 실행하면 실패한 주제만 재시도)")
+
+
+if __name__ == "__main__":
+    main()
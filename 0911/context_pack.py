@@ -0,0 +1,194 @@
+# context_pack.py
+"""
+LLM 호출 전 참고 자료 압축(context packing)
+
+1) Tavily/arXiv 결과를 출처가 붙은 짧은 단락(passage)으로 분리
+2) 거의 같은 단락 제거 (문자 3-gram Jaccard 유사도)
+3) 주제와의 관련도를 BM25로 점수화 (로컬 계산, 추가 API 없음)
+4) 점수 순으로 토큰 예산을 채우고, 출처 번호([1], [2]...)와 URL 목록을 유지
+"""
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+
+PASSAGE_CHARS = 600          # 단락 최대 길이(문자)
+DUP_THRESHOLD = 0.8          # 이 이상 겹치면 중복으로 간주
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_HANGUL = re.compile(r"[가-힣]")
+_SENT_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+@dataclass
+class Passage:
+    text: str
+    source: str          # 표시용 제목
+    url: str
+    score: float = 0.0
+
+
+@dataclass
+class PackedContext:
+    text: str
+    sources: list = field(default_factory=list)    # [(번호, 제목, URL)]
+    stats: dict = field(default_factory=dict)
+
+
+def estimate_tokens(text: str) -> int:
+    """ 대략적인 토큰 수: 영문 약 4자/토큰, 한글 등 비ASCII 약 1.5자/토큰 """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def tokenize(text: str) -> list[str]:
+    """ 단어 + 한글 단어는 글자 2-gram도 추가 (조사 붙은 형태도 매칭되도록) """
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        tokens.append(word)
+        if _HANGUL.search(word) and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+# =========================
+# 1) 단락 분리
+# =========================
+def _chunk(text: str, limit: int = PASSAGE_CHARS) -> list[str]:
+    """ 문장 단위로 이어 붙여 limit 이하 단락으로 """
+    chunks, buf = [], ""
+    for sent in _SENT_SPLIT.split(text):
+        sent = sent.strip()
+        if not sent:
+            continue
+        if buf and len(buf) + len(sent) + 1 > limit:
+            chunks.append(buf)
+            buf = ""
+        buf = f"{buf} {sent}".strip()
+        while len(buf) > limit:
+            chunks.append(buf[:limit])
+            buf = buf[limit:]
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+def web_passages(web_notes) -> list[Passage]:
+    """ Tavily 결과: [{"url", "content", ("title")}, ...] (문자열이면 안내 문구 → 사용 안 함) """
+    if not isinstance(web_notes, list):
+        return []
+    passages = []
+    for item in web_notes:
+        if not isinstance(item, dict) or not item.get("content"):
+            continue
+        url = item.get("url", "")
+        title = item.get("title") or url
+        passages.extend(Passage(t, title, url) for t in _chunk(item["content"]))
+    return passages
+
+
+def paper_passages(paper_notes) -> list[Passage]:
+    """ arxiv_search 결과: 논문별로 빈 줄 구분, Published/Title/Authors/URL/Summary 줄 (URL 없는 이전 캐시는 URL 생략) """
+    if not isinstance(paper_notes, str) or not paper_notes.strip() or paper_notes.startswith("("):
+        return []
+    passages = []
+    for block in re.split(r"\n\s*\n(?=Published:)", paper_notes.strip()):
+        fields = dict(re.findall(r"^(Published|Title|Authors|URL|Summary):\s*(.*)$", block, re.MULTILINE))
+        title = fields.get("Title", "").strip()
+        summary = block.split("Summary:", 1)[1].strip() if "Summary:" in block else block
+        if not title and not summary:
+            continue
+        url = fields.get("URL", "").strip()
+        label = f"{title} (arXiv{', ' + fields['Published'][:4] if fields.get('Published') else ''})"
+        passages.extend(Passage(t, label, url) for t in _chunk(" ".join(summary.split())))
+    return passages
+
+
+# =========================
+# 2) 중복 제거
+# =========================
+def _shingles(text: str, n: int = 3) -> set:
+    text = " ".join(text.lower().split())
+    return {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+
+
+def dedupe(passages: list[Passage], threshold: float = DUP_THRESHOLD) -> list[Passage]:
+    """ 앞선(점수 높은) 단락과 threshold 이상 겹치면 제거 """
+    kept, kept_shingles = [], []
+    for p in passages:
+        sh = _shingles(p.text)
+        if any(len(sh & other) / len(sh | other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(p)
+        kept_shingles.append(sh)
+    return kept
+
+
+# =========================
+# 3) BM25 점수
+# =========================
+def bm25_scores(query: str, docs: list[str], k1: float = 1.5, b: float = 0.75) -> list[float]:
+    doc_tokens = [tokenize(d) for d in docs]
+    if not doc_tokens:
+        return []
+    avgdl = sum(len(t) for t in doc_tokens) / len(doc_tokens) or 1.0
+    df = Counter(tok for toks in doc_tokens for tok in set(toks))
+    n = len(doc_tokens)
+    q_terms = set(tokenize(query))
+
+    scores = []
+    for toks in doc_tokens:
+        tf = Counter(toks)
+        dl = len(toks)
+        score = 0.0
+        for term in q_terms:
+            if term not in tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * dl / avgdl))
+        scores.append(score)
+    return scores
+
+
+# =========================
+# 4) 예산 채우기
+# =========================
+def pack_context(topic: str, web_notes, paper_notes, token_budget: int = 2500) -> PackedContext:
+    passages = web_passages(web_notes) + paper_passages(paper_notes)
+    total = len(passages)
+
+    for p, score in zip(passages, bm25_scores(topic, [f"{p.source} {p.text}" for p in passages])):
+        p.score = score
+    passages.sort(key=lambda p: p.score, reverse=True)
+    # 주제와 겹치는 단락이 하나라도 있으면 전혀 관련 없는 단락은 제외
+    if passages and passages[0].score > 0:
+        passages = [p for p in passages if p.score > 0]
+    unique = dedupe(passages)
+
+    chosen, used = [], 0
+    for p in unique:
+        cost = estimate_tokens(p.text) + 4
+        if used + cost > token_budget:
+            continue
+        chosen.append(p)
+        used += cost
+
+    # 출처마다 처음 등장한 순서로 번호를 붙이고, 단락은 점수 순서대로 출력
+    numbers, sources, lines = {}, [], []
+    for p in chosen:
+        key = (p.source, p.url)
+        if key not in numbers:
+            numbers[key] = len(numbers) + 1
+            sources.append((numbers[key], p.source, p.url))
+        lines.append(f"[{numbers[key]}] {p.text}")
+
+    return PackedContext(
+        text="\n".join(lines),
+        sources=sources,
+        stats={
+            "passages": total,
+            "duplicates": len(passages) - len(unique),
+            "selected": len(chosen),
+            "tokens": used,
+        },
+    )
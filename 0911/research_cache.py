@@ -0,0 +1,79 @@
+# research_cache.py
+"""
+Tavily/arXiv 검색 결과 디스크 캐시 (SQLite)
+
+- 키: 소스 + 정규화한 검색어 + 파라미터(max_results, top_k 등)
+- TTL이 지난 항목은 무시/삭제, 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 삭제(LRU)
+- Streamlit 재시작 후에도 유지됨
+"""
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    """ 대소문자/전각·반각/문장부호/공백 차이는 같은 검색어로 취급 """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _PUNCT.sub(" ", text)
+    return " ".join(text.split())
+
+
+def cache_key(source: str, query: str, **params) -> str:
+    raw = json.dumps([source, normalize_query(query), params], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ResearchCache:
+    def __init__(self, path: str = "research_cache.db", ttl_seconds: int = 24 * 3600, max_entries: int = 2000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS research ("
+            " key TEXT PRIMARY KEY, source TEXT, query TEXT, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_research_last_access ON research(last_access)")
+        self._conn.commit()
+
+    def get(self, source: str, query: str, **params):
+        """ 없거나 만료면 None """
+        key = cache_key(source, query, **params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM research WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM research WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE research SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, source: str, query: str, value, **params):
+        key = cache_key(source, query, **params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research(key, source, query, value, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, normalize_query(query), json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._conn.execute("DELETE FROM research WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM research WHERE key IN ("
+                " SELECT key FROM research ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
@@ -0,0 +1,157 @@
+# writer.py
+"""
+블로그 초안 파이프라인 (검색 → 자료 압축 → 초안 생성)
+Streamlit UI(app.py)와 배치 CLI(batch_drafts.py)가 함께 사용
+"""
+import os
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+
+from langchain_openai import ChatOpenAI
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_community.utilities.arxiv import ArxivAPIWrapper
+
+from research_cache import ResearchCache
+from context_pack import pack_context
+
+# =========================
+# 0) 환경 로드
+# =========================
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
+
+# 소스별 최대 대기 시간(초) — 넘기면 해당 소스 없이 진행
+SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", "20"))
+
+# 검색 결과 캐시 (재시작 후에도 유지)
+RESEARCH_CACHE_PATH = os.getenv("RESEARCH_CACHE_PATH", "research_cache.db")
+RESEARCH_CACHE_TTL  = int(os.getenv("RESEARCH_CACHE_TTL", str(24 * 3600)))
+RESEARCH_CACHE_MAX  = int(os.getenv("RESEARCH_CACHE_MAX", "2000"))
+
+# =========================
+# 1) Agent 없이 단순 검색 함수
+#    - 클라이언트 객체는 설정값별로 한 번만 만들고 재사용 (Streamlit rerun 포함)
+# =========================
+@lru_cache(maxsize=None)
+def get_tavily(max_results: int):
+    return TavilySearchResults(max_results=max_results)
+
+@lru_cache(maxsize=None)
+def get_arxiv(top_k: int):
+    return ArxivAPIWrapper(top_k_results=top_k, load_max_docs=10)
+
+@lru_cache(maxsize=1)
+def get_research_cache():
+    return ResearchCache(RESEARCH_CACHE_PATH, RESEARCH_CACHE_TTL, RESEARCH_CACHE_MAX)
+
+@lru_cache(maxsize=1)
+def get_executor():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="collect")
+
+# 두 도구 모두 실패해도 예외 대신 에러 문자열/문서를 돌려줌 → 여기서 예외로 바꿔야
+# collect_sources가 실패로 보고하고, 캐시에 결과처럼 저장되지 않음
+ARXIV_ERROR_PREFIX = "Arxiv exception"
+
+def tavily_search(query: str, max_results: int = 5):
+    if not TAVILY_API_KEY:
+        return "⚠️ TAVILY_API_KEY 없음"
+    result = get_tavily(max_results).run(query)
+    if not isinstance(result, list):
+        raise RuntimeError(f"Tavily 오류 응답: {str(result)[:200]}")
+    return result
+
+def arxiv_search(query: str, top_k: int = 10):
+    """ 논문별 Published/Title/Authors/URL/Summary 블록 (URL은 논문 실제 주소 = entry_id) """
+    wrapper = get_arxiv(top_k)
+    docs = wrapper.get_summaries_as_docs(query)
+    if not docs:
+        raise RuntimeError("arXiv 검색 결과 없음")
+    if not docs[0].metadata and docs[0].page_content.startswith(ARXIV_ERROR_PREFIX):
+        raise RuntimeError(f"arXiv 오류 응답: {docs[0].page_content[:200]}")
+    blocks = [
+        f"Published: {d.metadata['Published']}\n"
+        f"Title: {d.metadata['Title']}\n"
+        f"Authors: {d.metadata['Authors']}\n"
+        f"URL: {d.metadata['Entry ID']}\n"
+        f"Summary: {d.page_content}"
+        for d in docs
+    ]
+    return "\n\n".join(blocks)[: wrapper.doc_content_chars_max]
+
+def collect_sources(jobs: dict, timeout: float = SOURCE_TIMEOUT):
+    """
+    jobs: {소스 이름: 인자 없는 호출 함수} 를 동시에 실행
+    끝나는 순서대로 (이름, 결과, 에러 메시지) 를 yield — 시간 초과/실패 소스는 결과 None
+    """
+    executor = get_executor()
+    deadline = time.monotonic() + timeout
+    pending = {executor.submit(fn): name for name, fn in jobs.items()}
+    while pending:
+        remaining = deadline - time.monotonic()
+        done, _ = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+        if not done:
+            # 남은 소스는 시간 초과 → 기다리지 않고 진행 (작업은 백그라운드에서 마무리됨)
+            for fut, name in pending.items():
+                fut.cancel()
+                yield name, None, f"{timeout:.0f}초 시간 초과"
+            return
+        for fut in done:
+            name = pending.pop(fut)
+            try:
+                yield name, fut.result(), None
+            except Exception as e:
+                yield name, None, f"수집 실패: {e}"
+
+# =========================
+# 2) LLM
+# =========================
+SYSTEM_MSG = """당신은 한국어 블로거이자 SEO 전문가입니다.
+주제와 자료를 바탕으로 티스토리 블로그에 바로 게시할 수 있는 마크다운 글을 작성하세요.
+- 제목
+- 키워드
+- 개요
+- 본문 (소제목 포함)
+- FAQ
+- 출처 링크 ([출처 목록]의 URL만 사용)
+- 마무리"""
+
+# 프롬프트에 넣을 참고 자료의 최대 토큰 수 (관련도 순으로 채움)
+CONTEXT_BUDGET = int(os.getenv("CONTEXT_BUDGET", "2500"))
+
+@lru_cache(maxsize=None)
+def get_llm(model: str, temperature: float):
+    return ChatOpenAI(model=model, temperature=temperature, api_key=OPENAI_API_KEY)
+
+def _article_messages(topic, web_notes, paper_notes, packed=None, context_budget=CONTEXT_BUDGET):
+    """ 수집 자료를 단락 단위로 중복 제거/관련도 정렬해 예산 안에서만 프롬프트에 넣음 """
+    packed = packed or pack_context(topic, web_notes, paper_notes, context_budget)
+    source_list = "\n".join(f"[{n}] {title} - {url}" if url else f"[{n}] {title}" for n, title, url in packed.sources)
+    user_msg = f"""
+[주제]
+{topic}
+
+[참고 자료] (관련도 순 발췌, [번호]는 출처 번호)
+{packed.text or "(수집된 자료 없음)"}
+
+[출처 목록]
+{source_list or "(없음)"}
+"""
+    return [{"role": "system", "content": SYSTEM_MSG},
+            {"role": "user", "content": user_msg}]
+
+def generate_article(topic, web_notes, paper_notes, model="gpt-4o-mini", temperature=0.2,
+                     packed=None, context_budget=CONTEXT_BUDGET):
+    messages = _article_messages(topic, web_notes, paper_notes, packed, context_budget)
+    return get_llm(model, temperature).invoke(messages).content
+
+def stream_article(topic, web_notes, paper_notes, model="gpt-4o-mini", temperature=0.2,
+                   packed=None, context_budget=CONTEXT_BUDGET):
+    """ 토큰이 도착하는 대로 텍스트 조각을 yield """
+    messages = _article_messages(topic, web_notes, paper_notes, packed, context_budget)
+    for chunk in get_llm(model, temperature).stream(messages):
+        if chunk.content:
+            yield chunk.content
@@ -0,0 +1,176 @@
+"""
+/generate/campaign 부하 측정
+
+- 동시 실행 수(--concurrency 1,4,16)마다 --requests개 요청 → 처리량(req/s), 지연 p50/p95/p99, 오류 수
+- 대상: --url로 실행 중인 서버, 없으면 이 프로세스 안에서 app + 스텁 서버(ASGI)로 (네트워크/API 키 불필요)
+- --out 결과 JSON 저장, --baseline 이전 결과와 비교해 p95 또는 처리량이 --tolerance 이상 나빠지면 종료 코드 1
+
+예) python -m app.bench --concurrency 1,8,32 --requests 64 --stub-latency-ms 300 --out bench.json
+    python -m app.bench --baseline bench.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Dict, Any, List, Optional
+import httpx
+
+PATH = "/generate/campaign"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """ 선형 보간 백분위수 (q: 0~100) """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def make_payload(i: int) -> Dict[str, Any]:
+    # 업장 이름을 바꾸고 fresh로 캐시를 우회 → 매 요청이 실제 LLM 호출 경로를 탐
+    return {
+        "name": f"벤치 카페 {i}",
+        "category": "카페",
+        "address": "서울시 마포구",
+        "strengths": ["원두 직배전", "조용한 분위기"],
+        "channels": ["instagram", "naver_blog", "naver_place"],
+        "reviews": ["커피가 맛있어요", "사장님이 친절해요", "자리가 좀 좁아요"],
+        "fresh": True,
+    }
+
+
+async def run_level(http: httpx.AsyncClient, concurrency: int, total: int, offset: int = 0) -> Dict[str, Any]:
+    """ 동시 요청 concurrency개를 유지하며 total개 전송 """
+    latencies: List[float] = []
+    errors = 0
+    next_i = 0
+
+    async def worker():
+        nonlocal next_i, errors
+        while next_i < total:
+            i = next_i
+            next_i += 1
+            started = time.perf_counter()
+            try:
+                res = await http.post(PATH, json=make_payload(offset + i))
+                ok = res.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def run_benchmark(http: httpx.AsyncClient, levels: List[int], total: int, warmup: int = 2) -> List[Dict[str, Any]]:
+    if warmup:
+        await run_level(http, 1, warmup, offset=-warmup)
+    results = []
+    for n, concurrency in enumerate(levels):
+        results.append(await run_level(http, concurrency, total, offset=n * total))
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """ 같은 동시 실행 수끼리 비교해 나빠진 항목 설명 목록 반환 """
+    base = {r["concurrency"]: r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get(r["concurrency"])
+        if b is None:
+            continue
+        if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            regressions.append(f"c={r['concurrency']} p95 {b['p95_ms']}ms → {r['p95_ms']}ms")
+        if b["throughput"] and r["throughput"] < b["throughput"] * (1 - tolerance):
+            regressions.append(f"c={r['concurrency']} 처리량 {b['throughput']} → {r['throughput']} req/s")
+        if r["errors"] > b["errors"]:
+            regressions.append(f"c={r['concurrency']} 오류 {b['errors']} → {r['errors']}")
+    return regressions
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    cols = ("concurrency", "requests", "errors", "throughput", "p50_ms", "p95_ms", "p99_ms")
+    lines = ["  ".join(f"{c:>11}" for c in cols)]
+    lines += ["  ".join(f"{r[c]:>11}" for c in cols) for r in results]
+    return "\n".join(lines)
+
+
+def _prepare_inprocess_env():
+    # 앱 모듈 import 전에: 작업 폴더 DB/캐시를 건드리지 않도록 임시 경로, 스텁에는 실제 한도가 없으므로 제한기 한도를 크게
+    tmp = tempfile.mkdtemp(prefix="bench_")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("LLM_CACHE_PATH", os.path.join(tmp, "llm_cache.db"))
+    os.environ.setdefault("JOB_DB_PATH", os.path.join(tmp, "jobs.db"))
+    os.environ.setdefault("REVIEW_INDEX_DIR", os.path.join(tmp, "review_index"))
+    os.environ.setdefault("LLM_RPM", "1000000")
+    os.environ.setdefault("LLM_TPM", "1000000000")
+
+
+async def _main(args) -> List[Dict[str, Any]]:
+    levels = [int(x) for x in args.concurrency.split(",")]
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as http:
+            return await run_benchmark(http, levels, args.requests, args.warmup)
+
+    _prepare_inprocess_env()
+    from app.main import app
+    from app.stub_openai import StubConfig, create_app, use_stub
+    stub = create_app(StubConfig(latency_ms=args.stub_latency_ms, error_rate=args.stub_error_rate,
+                                 rate_limit_rate=args.stub_rate_limit_rate, seed=0))
+    async with use_stub(stub):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as http:
+            return await run_benchmark(http, levels, args.requests, args.warmup)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="/generate/campaign 부하 측정")
+    parser.add_argument("--url", help="대상 서버 (없으면 프로세스 안에서 스텁으로)")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=32, help="동시 실행 수마다 보낼 요청 수")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--stub-latency-ms", type=float, default=200)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--stub-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 악화 비율 (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(_main(args))
+    print(format_table(results))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("성능 저하:", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
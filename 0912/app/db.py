@@ -1,17 +1,48 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DB_URL = os.getenv("DATABASE_URL", "sqlite:///./marketing.db")
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False} if "sqlite" in DB_URL else {})
+IS_SQLITE = DB_URL.startswith("sqlite")
+
+# 커넥션 풀: 동시 요청 수에 맞춰 조정 (SQLite 파일 DB도 QueuePool 사용)
+POOL_OPTIONS = dict(
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+)
+if not IS_SQLITE:
+    POOL_OPTIONS.update(pool_pre_ping=True, pool_recycle=1800)
+
+engine = create_engine(
+    DB_URL,
+    connect_args={"check_same_thread": False, "timeout": 30} if IS_SQLITE else {},
+    **(POOL_OPTIONS if not DB_URL.endswith(":memory:") else {}),
+)
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _):
+        # WAL: 읽기와 쓰기가 서로 막지 않음 / NORMAL: WAL에서 안전한 수준으로 fsync 줄이기
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.execute("PRAGMA cache_size=-32000")   # 약 32MB
+        cur.close()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def upsert_insert(db, model):
+    """ ON CONFLICT DO NOTHING / DO UPDATE를 쓸 수 있는 insert (SQLite / PostgreSQL) """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
-
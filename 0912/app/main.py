@@ -2,12 +2,40 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import generate
+from fastapi.responses import PlainTextResponse
+from app.db import Base, engine
+from app.models import entities  # noqa: F401  (테이블 등록)
+from app.routers import generate, competitors, businesses, jobs
+from app.worker import start_workers, stop_workers
+from app.services.metrics import REGISTRY, MetricsMiddleware
+from app.services.review_index import get_index_store
 
-app = FastAPI(title="SMB Marketing Agent")
+Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 작업 큐 워커 (JOB_WORKERS=0이면 이 프로세스는 제출만, 워커는 python -m app.worker 로 따로)
+    await start_workers()
+    try:
+        yield
+    finally:
+        await stop_workers()
+        get_index_store().flush()   # 스냅샷에 아직 없는 리뷰 벡터 저장
+
+app = FastAPI(title="SMB Marketing Agent", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 app.include_router(generate.router, prefix="/generate", tags=["generate"])
+app.include_router(businesses.router, prefix="/businesses", tags=["businesses"])
+app.include_router(competitors.router, prefix="/competitors", tags=["competitors"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """ Prometheus 텍스트 형식 """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
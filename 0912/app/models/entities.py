@@ -1,25 +1,99 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from app.db import Base
+from app.services.geo import geohash_encode
 import datetime
 
 class Business(Base):
     __tablename__ = "businesses"
+    # 캠페인 저장 시 (상호명, 주소)로 기존 업장 찾기
+    __table_args__ = (Index("ix_businesses_name_address", "name", "address"),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     category = Column(String)
     address = Column(String)
     strengths = Column(JSON)
     tone = Column(String, default="정중하고 친근한 톤")
+    # 위치 (경쟁점 반경 검색용) — geohash는 lat/lon을 넣으면 자동 계산
+    lat = Column(Float)
+    lon = Column(Float)
+    geohash = Column(String(12), index=True)
 
     posts = relationship("Post", back_populates="business")
+    review_stats = relationship("ReviewStats", uselist=False, back_populates="business")
+
+    @validates("lat", "lon")
+    def _update_geohash(self, key, value):
+        lat = value if key == "lat" else self.lat
+        lon = value if key == "lon" else self.lon
+        self.geohash = geohash_encode(lat, lon) if lat is not None and lon is not None else None
+        return value
 
 class Post(Base):
     __tablename__ = "posts"
+    # 업장별 최신순 조회(키셋 페이지네이션)용
+    __table_args__ = (Index("ix_posts_business_created", "business_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"))
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
     channel = Column(String)
     body = Column(String)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     business = relationship("Business", back_populates="posts")
+
+class Review(Base):
+    __tablename__ = "reviews"
+    # 같은 업장에 같은 내용(공백 정규화 후 해시)은 한 번만
+    __table_args__ = (UniqueConstraint("business_id", "content_hash", name="uq_reviews_business_hash"),)
+    id = Column(Integer, primary_key=True, index=True)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    body = Column(String, nullable=False)
+    rating = Column(Float)
+    source = Column(String)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ReviewStats(Base):
+    __tablename__ = "review_stats"
+    # 업장별 리뷰 집계 (업로드할 때마다 새 리뷰분만 더함) → 캠페인 생성 시 원문을 다시 분석하지 않음
+    business_id = Column(Integer, ForeignKey("businesses.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+    neutral = Column(Integer, nullable=False, default=0)
+    keyword_counts = Column(JSON, nullable=False, default=dict)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    business = relationship("Business", back_populates="review_stats")
+
+    def counts(self) -> dict:
+        return {"total": self.total, "positive": self.positive, "negative": self.negative,
+                "neutral": self.neutral, "keyword_counts": dict(self.keyword_counts or {})}
+
+class Engagement(Base):
+    __tablename__ = "engagements"
+    # 게시물 성과 로그 (게시 요일/시간별 도달·저장) → 슬롯 추천 데이터
+    __table_args__ = (Index("ix_engagements_business_posted", "business_id", "posted_at"),)
+    id = Column(Integer, primary_key=True, index=True)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id"))
+    category = Column(String)
+    channel = Column(String, nullable=False)
+    weekday = Column(Integer, nullable=False)   # 0=월 ... 6=일
+    hour = Column(Integer, nullable=False)
+    reach = Column(Integer, nullable=False, default=0)
+    saves = Column(Integer, nullable=False, default=0)
+    posted_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class SlotStats(Base):
+    __tablename__ = "slot_stats"
+    # (업종 또는 업장, 채널, 요일, 시간)별 성과 합계 — 성과를 기록할 때마다 증분 갱신
+    scope = Column(String, primary_key=True)   # "category" / "business"
+    scope_key = Column(String, primary_key=True)   # 업종 이름 / 업장 id
+    channel = Column(String, primary_key=True)
+    weekday = Column(Integer, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    posts = Column(Integer, nullable=False, default=0)
+    reach = Column(Integer, nullable=False, default=0)
+    saves = Column(Integer, nullable=False, default=0)
@@ -5,25 +5,51 @@ POST_PROMPT = """
 - 매장 주소: {address}
 - 강점: {strengths}
 - 고객이 자주 언급한 키워드: {keywords}
+- 실제 고객 후기(인용 가능):
+{quotes}
 
 [요건]
 - 채널:{channel} 가이드 준수
 - 훅 1문장 → 본문 2~3문단 → 마지막에 명확한 CTA
 - 과장 금지, 사실 근거(강점/후기 키워드) 반영
+- 후기를 인용할 땐 위 문장 그대로, 없는 후기를 지어내지 말 것
 - 해시태그 5~8개(지역/업종/메뉴 조합), 띄어쓰기 정확히
 
 이제 완성된 문안만 출력해줘.
 """
 
-CALENDAR_PROMPT = """
-{category} 업장 {name}의 다음 주 업로드 캘린더를 제안.
-[슬롯 후보]
+# 여러 채널을 한 번에 (공통 컨텍스트는 한 번만) → JSON으로 받아서 채널별로 검증
+MULTI_POST_PROMPT = """
+[목표] {name} ({category}) 업장의 채널별 마케팅 문안을 한 번에 작성.
+[채널] {channels}
+[톤] {tone}
+[컨텍스트]
+- 매장 주소: {address}
+- 강점: {strengths}
+- 고객이 자주 언급한 키워드: {keywords}
+- 채널별 실제 고객 후기(인용 가능):
+{channel_quotes}
+
+[요건]
+- 채널마다 해당 채널 가이드 준수 (채널끼리 문장을 복사하지 말 것)
+- 각 문안: 훅 1문장 → 본문 2~3문단 → 마지막에 명확한 CTA
+- 과장 금지, 사실 근거(강점/후기 키워드) 반영
+- 후기를 인용할 땐 위 문장 그대로, 없는 후기를 지어내지 말 것
+- 해시태그 5~8개(지역/업종/메뉴 조합), 띄어쓰기 정확히
+
+[출력] 아래 형식의 JSON 객체 하나만 출력 (키는 채널 이름 그대로, 값은 완성된 문안 문자열)
+{{"posts": {{"채널1": "문안", "채널2": "문안"}}}}
+"""
+
+CALENDAR_TOPIC_PROMPT = """
+{category} 업장 {name}의 다음 주 게시물별 주제 문구를 작성.
+[고객이 자주 언급한 키워드] {keywords}
+[강점] {strengths}
+[게시 슬롯] (번호. 요일 시간 / 채널 / 주제 / 목표)
 {slots}
 
-[규칙]
-- 요일별 1개(총 3~4개)만 추천
-- 각 슬롯별: 주제(신메뉴/후기/비하인드/할인), 목표(도달/저장/예약), 간단한 설명
-- 성과 추적용 CTA 제안(“예약 링크 클릭”, “저장하고 방문 시 혜택” 등)
+[요건]
+- 슬롯마다 한 줄(30자 이내), 주제/목표에 맞게, 과장 금지
 
-표 형태로 간결하게 작성.
+[출력] 슬롯 순서대로 {{"topics": ["1번 문구", "2번 문구"]}} 형식의 JSON 객체 하나만 출력
 """
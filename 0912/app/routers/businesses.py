@@ -0,0 +1,122 @@
+import io
+import csv
+import anyio
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.models.entities import Business
+from app import schemas
+from app.services.campaigns import list_businesses, list_posts, upsert_business
+from app.services.review_ingest import FORMATS, ingest_reviews
+from app.services.reviews import summarize
+from app.services.calendar import CALENDAR_SLOTS, record_engagements, suggest_slots
+
+router = APIRouter()
+
+class _BodyReader(io.RawIOBase):
+    """ 요청 본문을 스레드에서 파일처럼 읽음 (청크가 도착하는 대로 이벤트 루프에서 받아 옴) """
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    async def _next(self) -> bytes:
+        return await self._chunks.__anext__()
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            try:
+                self._buf = anyio.from_thread.run(self._next)
+            except StopAsyncIteration:
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n], self._buf = self._buf[:n], self._buf[n:]
+        return n
+
+def _get_business(db: Session, business_id: int) -> Business:
+    business = db.get(Business, business_id)
+    if business is None:
+        raise HTTPException(status_code=404, detail="업장을 찾을 수 없습니다.")
+    return business
+
+def _upload_format(content_type: str) -> Optional[str]:
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json-lines" in content_type:
+        return "jsonl"
+    return None
+
+@router.get("", response_model=Union[schemas.BusinessPage, schemas.BusinessSummaryPage])
+def list_businesses_api(limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0),
+                        include_posts: bool = False, db: Session = Depends(get_db)):
+    """ include_posts=true면 업장별 게시물까지 (selectinload로 쿼리 2번) """
+    items, total = list_businesses(db, limit, offset, include_posts)
+    page = schemas.BusinessPage if include_posts else schemas.BusinessSummaryPage
+    return page(items=items, total=total, limit=limit, offset=offset)
+
+@router.post("", response_model=schemas.BusinessSummary)
+def upsert_business_api(req: schemas.BusinessCreate, db: Session = Depends(get_db)):
+    """ (상호명, 주소)가 같으면 기존 업장 갱신 → 리뷰 업로드 전에 업장 id 받기 """
+    business = upsert_business(db, req)
+    db.commit()
+    return business
+
+@router.get("/{business_id}", response_model=schemas.BusinessSummary)
+def get_business_api(business_id: int, db: Session = Depends(get_db)):
+    return _get_business(db, business_id)
+
+@router.post("/{business_id}/reviews", response_model=schemas.ReviewIngestResult)
+async def upload_reviews_api(business_id: int, request: Request, format: Optional[str] = None,
+                             source: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    요청 본문이 곧 파일 (Content-Type: text/csv / application/x-ndjson, 또는 ?format=csv|jsonl)
+    받는 대로 줄 단위로 읽어 배치 단위로 저장 (파일 전체를 모아 두지 않음) → 파일 크기와 무관하게 메모리 일정
+    같은 내용의 리뷰는 다시 올려도 한 번만 저장/집계
+    """
+    fmt = format or _upload_format(request.headers.get("content-type", ""))
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="format은 csv 또는 jsonl이어야 합니다.")
+    business = await run_in_threadpool(_get_business, db, business_id)
+    body = io.BufferedReader(_BodyReader(request))
+    try:
+        return await run_in_threadpool(ingest_reviews, db, business, body, fmt, source=source)
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"파일을 읽을 수 없습니다: {e}")
+
+@router.get("/{business_id}/reviews/stats", response_model=schemas.ReviewSummary)
+def review_stats_api(business_id: int, top_n: int = Query(5, ge=1, le=20), db: Session = Depends(get_db)):
+    """ 업로드된 리뷰의 누적 집계 (원문을 다시 분석하지 않음) """
+    stats = _get_business(db, business_id).review_stats
+    counts = stats.counts() if stats else {"total": 0, "positive": 0, "negative": 0, "neutral": 0,
+                                           "keyword_counts": {}}
+    return summarize(counts, top_n)
+
+@router.get("/{business_id}/posts", response_model=schemas.PostPage)
+def list_posts_api(business_id: int, limit: int = Query(20, ge=1, le=100),
+                   cursor: Optional[str] = None, channel: Optional[str] = None,
+                   db: Session = Depends(get_db)):
+    """ 최신순, 다음 페이지는 응답의 next_cursor를 cursor로 전달 """
+    _get_business(db, business_id)
+    try:
+        items, next_cursor = list_posts(db, business_id, limit, cursor, channel)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor입니다.")
+    return schemas.PostPage(items=items, next_cursor=next_cursor)
+
+@router.post("/{business_id}/engagements")
+def record_engagements_api(business_id: int, events: List[schemas.EngagementIn], db: Session = Depends(get_db)):
+    """ 게시물 성과(채널, 게시 요일/시간, 도달, 저장) 일괄 기록 → 슬롯 집계 증분 갱신 """
+    business = _get_business(db, business_id)
+    return {"recorded": record_engagements(db, business, [e.model_dump() for e in events])}
+
+@router.get("/{business_id}/slots", response_model=schemas.SlotPlan)
+def suggest_slots_api(business_id: int, channels: List[str] = Query(["instagram", "naver_blog"]),
+                      n: int = Query(CALENDAR_SLOTS, ge=1, le=7), db: Session = Depends(get_db)):
+    """ 업장/업종 성과 기반 추천 슬롯 (요일당 1개) """
+    business = _get_business(db, business_id)
+    return suggest_slots(db, business.category, channels, business.id, n)
@@ -0,0 +1,46 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.models.entities import Business
+from app.services.competitors import (
+    COMPETITOR_RADIUS_M, get_competitor_index, load_businesses, find_competitors, competitor_report,
+)
+
+router = APIRouter()
+
+def get_located_business(business_id: int, db: Session) -> Business:
+    business = db.get(Business, business_id)
+    if business is None:
+        raise HTTPException(status_code=404, detail="업장을 찾을 수 없습니다.")
+    if business.lat is None or business.lon is None:
+        raise HTTPException(status_code=400, detail="좌표(lat/lon)가 없는 업장입니다.")
+    return business
+
+@router.get("/nearby")
+def nearby_api(lat: float = Query(..., ge=-90, le=90), lon: float = Query(..., ge=-180, le=180),
+               radius_m: Optional[float] = Query(None, gt=0), k: int = Query(10, ge=1, le=500),
+               category: Optional[str] = None, db: Session = Depends(get_db)):
+    """ 임의 좌표 기준: radius_m가 있으면 반경 내(최대 k개), 없으면 가까운 k개 """
+    index = get_competitor_index()
+    if radius_m:
+        found = index.within(db, lat, lon, radius_m, category)[:k]
+    else:
+        found = index.nearest(db, lat, lon, k, category)
+    return {"businesses": load_businesses(db, found)}
+
+@router.get("/{business_id}")
+def competitors_api(business_id: int, radius_m: float = Query(COMPETITOR_RADIUS_M, gt=0),
+                    k: Optional[int] = Query(None, ge=1, le=500), same_category: bool = True,
+                    db: Session = Depends(get_db)):
+    business = get_located_business(business_id, db)
+    competitors = find_competitors(db, business, radius_m, k, same_category)
+    return {"business_id": business.id, "radius_m": radius_m, "competitors": competitors}
+
+@router.get("/{business_id}/report")
+def competitor_report_api(business_id: int, radius_m: float = Query(COMPETITOR_RADIUS_M, gt=0),
+                          same_category: bool = True, db: Session = Depends(get_db)):
+    business = get_located_business(business_id, db)
+    report = competitor_report(business, find_competitors(db, business, radius_m, None, same_category))
+    report["radius_m"] = radius_m
+    return report
@@ -1,6 +1,14 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from app.services.llm import generate_campaign
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, model_validator
+from sqlalchemy.orm import Session
+from app.db import SessionLocal, get_db
+from app.services.llm import generate_campaign, iter_campaign_events
+from app.services.campaigns import save_campaign
+from app.services.metrics import STAGE_LATENCY
 
 router = APIRouter()
 
@@ -12,8 +20,44 @@ class GenerateRequest(BaseModel):
     tone: str = "정중하고 친근한 1인칭, 이모지 1~2개"
     channels: list[str] = ["instagram","naver_blog"]
     reviews: list[str] = []  # 초기엔 수동 입력/CSV 업로드
+    lat: Optional[float] = None  # 있으면 경쟁점 조회에 사용
+    lon: Optional[float] = None
+    fresh: bool = False  # True면 LLM 응답 캐시를 건너뛰고 새로 생성
+    multi_channel: Optional[bool] = None  # 채널 문안을 한 번에 생성 (None이면 LLM_MULTI_CHANNEL 설정)
+    calendar_topics: Optional[bool] = None  # 캘린더 주제 문구를 LLM으로 (None이면 LLM_CALENDAR_TOPICS 설정)
+
+    @model_validator(mode="after")
+    def _both_coords(self):
+        if (self.lat is None) != (self.lon is None):
+            raise ValueError("lat과 lon은 함께 보내야 합니다.")
+        return self
+
+def _save_with_new_session(req, posts) -> int:
+    # 스트리밍 응답은 의존성 세션 수명과 무관하게 끝나므로 별도 세션 사용
+    with SessionLocal() as db, STAGE_LATENCY.time(stage="persist"):
+        return save_campaign(db, req, posts)
 
 @router.post("/campaign")
-def generate_campaign_api(req: GenerateRequest):
-    plan = generate_campaign(req)
+async def generate_campaign_api(req: GenerateRequest, db: Session = Depends(get_db)):
+    plan = await generate_campaign(req)
+    with STAGE_LATENCY.time(stage="persist"):
+        plan["business_id"] = await run_in_threadpool(save_campaign, db, req, plan["posts"])
     return plan
+
+@router.post("/campaign/stream")
+async def generate_campaign_stream_api(req: GenerateRequest, tokens: bool = False):
+    """ Server-Sent Events: highlights → post(_delta) → calendar → done """
+    async def event_source():
+        posts = []
+        async for event, data in iter_campaign_events(req, stream_tokens=tokens):
+            if event == "post":
+                posts.append(data)
+            elif event == "done":
+                data = {"business_id": await run_in_threadpool(_save_with_new_session, req, posts)}
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,62 @@
+import json
+import asyncio
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.routers.generate import GenerateRequest
+from app.services.jobs import TERMINAL, get_job_queue
+from app.worker import get_worker_pool
+
+router = APIRouter()
+
+def _public(job: dict) -> dict:
+    return {k: job[k] for k in ("id", "tenant", "kind", "status", "attempts", "max_attempts",
+                                "created_at", "started_at", "finished_at", "error", "result")}
+
+@router.post("/campaign", status_code=202)
+async def submit_campaign_job_api(req: GenerateRequest, x_tenant_id: str = Header("default")):
+    """ 바로 job_id 반환 → GET /jobs/{id} 로 조회하거나 /jobs/{id}/events 구독 """
+    job_id = await run_in_threadpool(get_job_queue().submit, "campaign", req.model_dump(), x_tenant_id)
+    pool = get_worker_pool()
+    if pool is not None:
+        pool.notify()
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/stats")
+async def job_stats_api():
+    """ 큐 깊이(상태별/테넌트별), 가장 오래 기다린 작업 시간, 처리/재시도/실패 수 """
+    return await run_in_threadpool(get_job_queue().stats)
+
+@router.get("/{job_id}")
+async def get_job_api(job_id: str):
+    job = await run_in_threadpool(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return _public(job)
+
+@router.get("/{job_id}/events")
+async def job_events_api(job_id: str, poll_seconds: float = 0.5):
+    """ Server-Sent Events: 상태가 바뀔 때마다 status, 끝나면 result 또는 error """
+    if await run_in_threadpool(get_job_queue().get, job_id) is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    async def event_source():
+        last = None
+        while True:
+            job = await run_in_threadpool(get_job_queue().get, job_id)
+            state = (job["status"], job["attempts"])
+            if state != last:
+                last = state
+                yield f"event: status\ndata: {json.dumps({'status': job['status'], 'attempts': job['attempts']})}\n\n"
+            if job["status"] in TERMINAL:
+                event = "result" if job["status"] == "done" else "error"
+                data = job["result"] if job["status"] == "done" else {"message": job["error"]}
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                return
+            await asyncio.sleep(max(poll_seconds, 0.1))
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
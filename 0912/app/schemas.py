@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Dict, List, Optional
 import datetime
 
 class PostBase(BaseModel):
@@ -14,8 +14,7 @@ class Post(PostBase):
     business_id: int
     created_at: datetime.datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class BusinessBase(BaseModel):
     name: str
@@ -23,6 +22,15 @@ class BusinessBase(BaseModel):
     address: str
     strengths: List[str] = []
     tone: str = "정중하고 친근한 톤"
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+    @model_validator(mode="after")
+    def _both_coords(self):
+        # 한쪽만 오면 기존 위치를 지우게 되므로 거부 (422)
+        if (self.lat is None) != (self.lon is None):
+            raise ValueError("lat과 lon은 함께 보내야 합니다.")
+        return self
 
 class BusinessCreate(BusinessBase):
     pass
@@ -31,5 +39,64 @@ class Business(BusinessBase):
     id: int
     posts: List[Post] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class BusinessSummary(BusinessBase):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BusinessPage(BaseModel):
+    items: List[Business]
+    total: int
+    limit: int
+    offset: int
+
+class BusinessSummaryPage(BaseModel):
+    items: List[BusinessSummary]
+    total: int
+    limit: int
+    offset: int
+
+class PostPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[str] = None
+
+class ReviewIngestResult(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    skipped: int
+
+class ReviewSummary(BaseModel):
+    review_count: int
+    keywords: List[str]
+    keyword_counts: Dict[str, int]
+    sentiment: Dict[str, float]
+
+class EngagementIn(BaseModel):
+    channel: str
+    reach: int = Field(0, ge=0)
+    saves: int = Field(0, ge=0)
+    posted_at: Optional[datetime.datetime] = None  # 있으면 요일/시간은 여기서
+    weekday: Optional[int] = Field(None, ge=0, le=6)  # 0=월 ... 6=일
+    hour: Optional[int] = Field(None, ge=0, le=23)
+    post_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _need_slot(self):
+        if self.posted_at is None and (self.weekday is None or self.hour is None):
+            raise ValueError("posted_at 또는 weekday/hour가 필요합니다.")
+        return self
+
+class Slot(BaseModel):
+    weekday: int
+    day: str
+    hour: int
+    channel: str
+    score: float
+
+class SlotPlan(BaseModel):
+    slots: List[Slot]
+    business_posts: int
+    category_posts: int
@@ -1,7 +1,185 @@
-def suggest_slots(category: str):
-    # 업종별 성과가 좋은 요일/시간 룰베이스(초기값)
-    return [
-        "화 11:30 ~ 점심 유입(신메뉴 소개)",
-        "목 19:00 ~ 퇴근 후(후기 리그램/UGC)",
-        "토 10:30 ~ 주말 방문 유도(할인/이벤트)",
-    ]
+import os
+from collections import defaultdict
+from zoneinfo import ZoneInfo
+from typing import Dict, Any, Iterable, List, Optional
+import numpy as np
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from app.db import upsert_insert
+from app.models.entities import Business, Engagement, SlotStats
+
+# 게시 슬롯(채널 × 요일 × 시간) 추천
+#   성과 로그(도달/저장)를 기록할 때마다 업종별/업장별 합계(slot_stats)를 증분 갱신
+#   점수 = 칸 평균 성과 / 채널 전체 평균 (규모와 무관한 상대값), 표본이 적은 칸은
+#          업장 → 업종 → 기본 시간대(룰베이스) 순으로 당겨서 보정 (numpy로 168칸 × 채널 한 번에)
+#   캘린더 표는 상위 슬롯으로 바로 렌더링 (LLM은 켜져 있을 때 주제 문구만)
+DAYS = "월화수목금토일"
+CALENDAR_SLOTS = int(os.getenv("CALENDAR_SLOTS", "4"))
+SLOT_SAVE_WEIGHT = float(os.getenv("SLOT_SAVE_WEIGHT", "10"))   # 저장 1회 = 도달 몇 회로 볼지
+SLOT_PRIOR_WEIGHT = float(os.getenv("SLOT_PRIOR_WEIGHT", "3"))   # 기본값을 게시물 몇 개분으로 볼지
+SLOT_CHANNEL_PENALTY = 0.1   # 같은 채널이 이미 뽑혔으면 감점 → 채널 고르게
+# 요일/시간 칸의 기준 시간대 (시간대가 붙은 posted_at은 이 시간대로 바꿔서, 없는 값은 이미 이 시간대로 봄)
+SLOT_TIMEZONE = ZoneInfo(os.getenv("SLOT_TIMEZONE", "Asia/Seoul"))
+
+# 업종별 성과가 좋은 요일/시간 룰베이스 (데이터가 없을 때의 기본값), (요일, 시)
+DEFAULT_SLOTS = {
+    "카페": [(1, 11), (3, 15), (5, 10), (6, 13)],
+    "음식점": [(1, 11), (3, 17), (4, 18), (5, 11)],
+    "주점": [(2, 19), (3, 20), (4, 19), (5, 20)],
+    "_default": [(1, 11), (3, 19), (5, 10)],
+}
+
+# 캘린더 행: (주제, 목표, 내용, CTA)
+TOPIC_PLAN = [
+    ("신메뉴", "도달", "대표/신메뉴 소개 — '{keyword}' 강조", "프로필 링크에서 메뉴 보기"),
+    ("후기", "저장", "'{keyword}' 언급 고객 후기 리그램(UGC)", "저장하고 방문 시 혜택 받기"),
+    ("비하인드", "도달", "준비 과정·사장님 이야기", "팔로우하고 새 소식 받기"),
+    ("할인", "예약", "방문 유도 이벤트/할인 안내", "예약 링크 클릭"),
+]
+
+
+def default_slots(category: str) -> List[tuple]:
+    for key, slots in DEFAULT_SLOTS.items():
+        if key != "_default" and key in (category or ""):
+            return slots
+    return DEFAULT_SLOTS["_default"]
+
+
+def prior_grid(category: str) -> np.ndarray:
+    # 활동 시간(7~22시) 1.0, 그 외 0.2, 업종 기본 슬롯 1.5 (앞뒤 1시간 1.2)
+    grid = np.full((7, 24), 0.2)
+    grid[:, 7:23] = 1.0
+    for day, hour in default_slots(category):
+        grid[day, max(0, hour - 1):hour + 2] = np.maximum(grid[day, max(0, hour - 1):hour + 2], 1.2)
+        grid[day, hour] = 1.5
+    return grid
+
+
+# ---------- 성과 기록 ----------
+def record_engagements(db: Session, business: Business, events: Iterable[Dict[str, Any]]) -> int:
+    """ 성과 로그 일괄 저장 + 업장/업종 슬롯 합계 증분 갱신 (posted_at이 있으면 요일/시간은 그것으로) """
+    rows = []
+    grouped = defaultdict(lambda: [0, 0, 0])
+    for e in events:
+        posted_at = e.get("posted_at")
+        if posted_at is not None and posted_at.tzinfo is not None:
+            posted_at = posted_at.astimezone(SLOT_TIMEZONE).replace(tzinfo=None)   # 예: ...Z → 한국 시간
+        weekday = posted_at.weekday() if posted_at else e["weekday"]
+        hour = posted_at.hour if posted_at else e["hour"]
+        rows.append({"business_id": business.id, "post_id": e.get("post_id"), "category": business.category,
+                     "channel": e["channel"], "weekday": weekday, "hour": hour,
+                     "reach": e.get("reach", 0), "saves": e.get("saves", 0), "posted_at": posted_at})
+        totals = grouped[(e["channel"], weekday, hour)]
+        totals[0] += 1
+        totals[1] += e.get("reach", 0)
+        totals[2] += e.get("saves", 0)
+    if not rows:
+        return 0
+    db.execute(insert(Engagement), rows)
+    for scope, key in (("business", str(business.id)), ("category", business.category or "")):
+        _increment(db, scope, key, grouped)
+    db.commit()
+    return len(rows)
+
+
+def _increment(db: Session, scope: str, key: str, grouped: Dict[tuple, List[int]]):
+    # INSERT ... ON CONFLICT DO UPDATE SET posts = posts + n → 없던 칸을 동시에 처음 기록해도 합계가 유실되지 않음
+    stmt = upsert_insert(db, SlotStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scope", "scope_key", "channel", "weekday", "hour"],
+        set_={"posts": SlotStats.posts + stmt.excluded.posts, "reach": SlotStats.reach + stmt.excluded.reach,
+              "saves": SlotStats.saves + stmt.excluded.saves},
+    )
+    db.execute(stmt, [
+        {"scope": scope, "scope_key": key, "channel": channel, "weekday": weekday, "hour": hour,
+         "posts": posts, "reach": reach, "saves": saves}
+        for (channel, weekday, hour), (posts, reach, saves) in grouped.items()
+    ])
+
+
+# ---------- 점수 ----------
+def load_grid(db: Session, scope: str, key: Optional[str], channels: List[str]) -> np.ndarray:
+    """ [게시물 수, 도달 합, 저장 합] × 채널 × 요일 × 시간 """
+    grid = np.zeros((3, len(channels), 7, 24))
+    if key is None or not channels:
+        return grid
+    rows = db.execute(
+        select(SlotStats.channel, SlotStats.weekday, SlotStats.hour, SlotStats.posts, SlotStats.reach, SlotStats.saves)
+        .where(SlotStats.scope == scope, SlotStats.scope_key == key, SlotStats.channel.in_(channels))
+    ).all()
+    if rows:
+        col = {ch: i for i, ch in enumerate(channels)}
+        arr = np.array([(col[r[0]], *r[1:]) for r in rows], dtype="float64")
+        c, d, h = (arr[:, i].astype(int) for i in range(3))
+        grid[:, c, d, h] = arr[:, 3:].T
+    return grid
+
+
+def _shrunk_lift(grid: np.ndarray, prior: np.ndarray, save_weight: float, k: float) -> np.ndarray:
+    posts, value = grid[0], grid[1] + save_weight * grid[2]
+    total_posts = posts.sum(axis=(1, 2), keepdims=True)
+    overall = np.divide(value.sum(axis=(1, 2), keepdims=True), total_posts,
+                        out=np.zeros_like(total_posts), where=total_posts > 0)
+    mean = np.divide(value, posts, out=np.zeros_like(value), where=posts > 0)
+    lift = np.divide(mean, overall, out=np.zeros_like(mean), where=overall > 0)
+    return (posts * lift + k * prior) / (posts + k)
+
+
+def score_slots(business_grid: np.ndarray, category_grid: np.ndarray, prior: np.ndarray,
+                save_weight: float = SLOT_SAVE_WEIGHT, k: float = SLOT_PRIOR_WEIGHT) -> np.ndarray:
+    """ 채널 × 요일 × 시간 점수 (1.0 = 평균) """
+    category = _shrunk_lift(category_grid, np.broadcast_to(prior, category_grid.shape[1:]), save_weight, k)
+    return _shrunk_lift(business_grid, category, save_weight, k)
+
+
+def top_slots(scores: np.ndarray, channels: List[str], n: int = CALENDAR_SLOTS) -> List[Dict[str, Any]]:
+    # 요일당 1개, 이미 뽑힌 채널은 감점 → 상위 n개 (동점이면 앞 채널/이른 요일·시간, 항상 같은 결과)
+    work = scores.astype("float64").copy()
+    uses = np.zeros(len(channels))
+    picked = []
+    for _ in range(min(n, 7)):
+        adjusted = work - SLOT_CHANNEL_PENALTY * uses[:, None, None]
+        c, d, h = np.unravel_index(int(np.argmax(adjusted)), adjusted.shape)
+        if not np.isfinite(adjusted[c, d, h]):
+            break
+        picked.append({"weekday": int(d), "day": DAYS[d], "hour": int(h), "channel": channels[c],
+                       "score": round(float(scores[c, d, h]), 3)})
+        work[:, d, :] = -np.inf
+        uses[c] += 1
+    return sorted(picked, key=lambda s: (s["weekday"], s["hour"]))
+
+
+def suggest_slots(db: Session, category: str, channels: List[str], business_id: Optional[int] = None,
+                  n: int = CALENDAR_SLOTS) -> Dict[str, Any]:
+    """ 상위 슬롯 + 근거(업장/업종 기록 수) """
+    channels = list(channels) or ["instagram"]
+    business = load_grid(db, "business", str(business_id) if business_id else None, channels)
+    category_grid = load_grid(db, "category", category or "", channels)
+    scores = score_slots(business, category_grid, prior_grid(category))
+    return {
+        "slots": top_slots(scores, channels, n),
+        "business_posts": int(business[0].sum()),
+        "category_posts": int(category_grid[0].sum()),
+    }
+
+
+# ---------- 캘린더 ----------
+def calendar_rows(slots: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, str]]:
+    rows = []
+    for i, slot in enumerate(slots):
+        topic, goal, content, cta = TOPIC_PLAN[i % len(TOPIC_PLAN)]
+        keyword = keywords[i % len(keywords)] if keywords else "대표 메뉴"
+        rows.append({"day": slot["day"], "time": f"{slot['hour']:02d}:00", "channel": slot["channel"],
+                     "topic": topic, "goal": goal, "content": content.format(keyword=keyword), "cta": cta})
+    return rows
+
+
+def render_calendar(rows: List[Dict[str, str]], business_posts: int = 0, category_posts: int = 0) -> str:
+    lines = ["| 요일 | 시간 | 채널 | 주제 | 목표 | 내용 | CTA |", "|---|---|---|---|---|---|---|"]
+    for r in rows:
+        cells = [r[k].replace("|", "/") for k in ("day", "time", "channel", "topic", "goal", "content", "cta")]
+        lines.append("| " + " | ".join(cells) + " |")
+    lines.append("")
+    lines.append(f"* 추천 근거: 이 업장 성과 기록 {business_posts}건, 같은 업종 {category_posts}건"
+                 " (기록이 적을수록 업종 기본 시간대 비중이 큼)")
+    return "\n".join(lines)
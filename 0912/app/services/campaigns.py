@@ -0,0 +1,80 @@
+import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import select, insert, func, tuple_
+from sqlalchemy.orm import Session, selectinload
+from app.models.entities import Business, Post
+from app.services.competitors import get_competitor_index
+
+# 캠페인 결과 저장 + 조회 (업장 목록은 offset, 게시물 이력은 키셋 페이지네이션)
+
+
+def find_business(db: Session, name: str, address: str) -> Optional[Business]:
+    # (상호명, 주소)가 같으면 같은 업장
+    return db.scalars(
+        select(Business).where(Business.name == name, Business.address == address).limit(1)
+    ).first()
+
+
+def upsert_business(db: Session, req) -> Business:
+    # 기존 업장이면 강점/톤/좌표만 갱신 (좌표는 lat/lon이 둘 다 있을 때만 → geohash/경쟁점 인덱스도 그때만 갱신)
+    business = find_business(db, req.name, req.address)
+    if business is None:
+        business = Business(name=req.name, address=req.address)
+        db.add(business)
+    moved = (req.lat is not None and req.lon is not None
+             and (business.lat, business.lon) != (req.lat, req.lon))
+    business.category = req.category
+    business.strengths = list(req.strengths)
+    business.tone = req.tone
+    if moved:
+        business.lat, business.lon = req.lat, req.lon
+    db.flush()
+    if moved:
+        get_competitor_index().invalidate()
+    return business
+
+
+def save_campaign(db: Session, req, posts: List[Dict[str, Any]]) -> int:
+    """ 업장 upsert + 채널별 문안을 한 번의 executemany로 저장, 업장 id 반환 """
+    business = upsert_business(db, req)
+    now = datetime.datetime.utcnow()
+    rows = [{"business_id": business.id, "channel": p["channel"], "body": p["body"], "created_at": now}
+            for p in posts]
+    if rows:
+        db.execute(insert(Post), rows)
+    db.commit()
+    return business.id
+
+
+def list_businesses(db: Session, limit: int, offset: int, include_posts: bool = False) -> Tuple[List[Business], int]:
+    query = select(Business).order_by(Business.id).limit(limit).offset(offset)
+    if include_posts:
+        # 업장마다 lazy load(N+1) 대신 IN 쿼리 1번으로 게시물 일괄 로드
+        query = query.options(selectinload(Business.posts))
+    total = db.scalar(select(func.count()).select_from(Business))
+    return list(db.scalars(query)), total
+
+
+def encode_cursor(post: Post) -> str:
+    return f"{post.created_at.isoformat()}_{post.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    created_at, post_id = cursor.rsplit("_", 1)
+    return datetime.datetime.fromisoformat(created_at), int(post_id)
+
+
+def list_posts(db: Session, business_id: int, limit: int, cursor: Optional[str] = None,
+               channel: Optional[str] = None) -> Tuple[List[Post], Optional[str]]:
+    """
+    최신순 게시물 + 다음 페이지 커서
+    (business_id, created_at, id) 인덱스를 그대로 타므로 페이지가 깊어져도 OFFSET처럼 느려지지 않음
+    """
+    query = select(Post).where(Post.business_id == business_id)
+    if channel:
+        query = query.where(Post.channel == channel)
+    if cursor:
+        query = query.where(tuple_(Post.created_at, Post.id) < decode_cursor(cursor))
+    posts = list(db.scalars(query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)))
+    next_cursor = encode_cursor(posts[limit - 1]) if len(posts) > limit else None
+    return posts[:limit], next_cursor
@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.entities import Business
+from app.services.geo import GridIndex
+
+# 좌표가 있는 업장 전체를 메모리 공간 인덱스로 캐시 (TTL 지나거나 invalidate() 하면 다시 로드)
+COMPETITOR_RADIUS_M = float(os.getenv("COMPETITOR_RADIUS_M", "1000"))
+COMPETITOR_INDEX_TTL = float(os.getenv("COMPETITOR_INDEX_TTL", "300"))
+
+
+class CompetitorIndex:
+    def __init__(self, ttl_seconds: float = COMPETITOR_INDEX_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._grid: Optional[GridIndex] = None
+        self._categories: Dict[int, str] = {}
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._grid = None
+
+    def _load(self, db: Session):
+        rows = db.execute(
+            select(Business.id, Business.lat, Business.lon, Business.geohash, Business.category)
+            .where(Business.lat.is_not(None), Business.lon.is_not(None))
+        ).all()
+        self._grid = GridIndex(
+            [r.id for r in rows],
+            np.array([r.lat for r in rows], dtype="float64"),
+            np.array([r.lon for r in rows], dtype="float64"),
+            [r.geohash for r in rows],
+        )
+        self._categories = {r.id: r.category for r in rows}
+        self._built_at = time.monotonic()
+
+    def grid(self, db: Session) -> GridIndex:
+        with self._lock:
+            if self._grid is None or time.monotonic() - self._built_at > self.ttl_seconds:
+                self._load(db)
+            return self._grid
+
+    def _filter(self, found, category: Optional[str], exclude_id: Optional[int]):
+        return [(bid, dist) for bid, dist in found
+                if bid != exclude_id and (category is None or self._categories.get(bid) == category)]
+
+    def within(self, db: Session, lat: float, lon: float, radius_m: float,
+               category: str = None, exclude_id: int = None):
+        return self._filter(self.grid(db).within(lat, lon, radius_m), category, exclude_id)
+
+    def nearest(self, db: Session, lat: float, lon: float, k: int,
+                category: str = None, exclude_id: int = None):
+        grid = self.grid(db)
+        # 업종/본인 제외로 빠지는 만큼 넉넉히 찾고, 모자라면 더 늘려서 다시
+        want = k + 1
+        while True:
+            found = self._filter(grid.nearest(lat, lon, want), category, exclude_id)
+            if len(found) >= k or want >= len(grid):
+                return found[:k]
+            want *= 4
+
+
+@lru_cache(maxsize=1)
+def get_competitor_index() -> CompetitorIndex:
+    return CompetitorIndex()
+
+
+def _as_dict(b: Business, distance_m: float) -> Dict[str, Any]:
+    return {"id": b.id, "name": b.name, "category": b.category, "address": b.address,
+            "strengths": b.strengths or [], "distance_m": round(distance_m, 1)}
+
+
+def load_businesses(db: Session, found) -> List[Dict[str, Any]]:
+    # (id, 거리) 목록 → 업장 정보 (거리순 유지, 한 번의 IN 쿼리)
+    if not found:
+        return []
+    rows = {b.id: b for b in db.scalars(select(Business).where(Business.id.in_([bid for bid, _ in found])))}
+    return [_as_dict(rows[bid], dist) for bid, dist in found if bid in rows]
+
+
+def find_competitors(db: Session, business: Business, radius_m: float = COMPETITOR_RADIUS_M,
+                     k: int = None, same_category: bool = True) -> List[Dict[str, Any]]:
+    """ 반경 내 경쟁점 (k가 있으면 가까운 k개까지) """
+    category = business.category if same_category else None
+    index = get_competitor_index()
+    found = index.within(db, business.lat, business.lon, radius_m, category, exclude_id=business.id)
+    return load_businesses(db, found[:k] if k else found)
+
+
+def _norm(s: str) -> str:
+    return " ".join(s.split()).lower()
+
+
+def competitor_report(business: Business, competitors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    README의 경쟁 비교 리포트
+      공통 강점 / 우리만의 차별화 강점 / 경쟁점만 강조하는 요소
+    """
+    ours = {_norm(s): s for s in business.strengths or []}
+    theirs = Counter(_norm(s) for c in competitors for s in set(c["strengths"]))
+    labels = {_norm(s): s for c in competitors for s in c["strengths"]}
+    return {
+        "business_id": business.id,
+        "competitor_count": len(competitors),
+        "common_strengths": [label for key, label in ours.items() if theirs[key]],
+        "our_differentiators": [label for key, label in ours.items() if not theirs[key]],
+        "competitor_only": [labels[key] for key, _ in theirs.most_common() if key not in ours][:5],
+        "competitors": competitors,
+    }
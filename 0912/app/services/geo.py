@@ -0,0 +1,118 @@
+import math
+from typing import Iterable, List, Tuple
+import numpy as np
+
+# 좌표 유틸 + 격자(geohash 셀) 공간 인덱스
+#   DB에는 업장별 geohash(정밀도 9)를 저장하고, 메모리 인덱스는 앞 CELL_PRECISION 글자(셀)로 묶음
+#   반경 검색: 반경을 덮는 셀만 모아서 → 후보에 대해서만 numpy로 거리 계산
+EARTH_RADIUS_M = 6_371_000.0
+GEOHASH_PRECISION = 9          # 약 5m
+CELL_PRECISION = 6             # 약 1.2km x 0.6km
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_m(lat: float, lon: float, lats, lons) -> np.ndarray:
+    # (lat, lon) 에서 여러 지점까지의 거리(m), 벡터 연산
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def geohash_encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            ch = ch * 2 + (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            ch = ch * 2 + (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def cell_size_deg(precision: int) -> Tuple[float, float]:
+    # geohash 셀 1칸의 (위도, 경도) 크기
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(lat: float, lon: float, radius_m: float, precision: int = CELL_PRECISION) -> set:
+    # 반경 원을 감싸는 사각형을 셀 크기 간격으로 훑어 닿는 셀 전부
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    cell_lat, cell_lon = cell_size_deg(precision)
+    lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    lon_lo, lon_hi = max(lon - dlon, -180.0), min(lon + dlon, 180.0)
+    lats = np.append(np.arange(lat_lo, lat_hi, cell_lat), lat_hi)
+    lons = np.append(np.arange(lon_lo, lon_hi, cell_lon), lon_hi)
+    return {geohash_encode(a, b, precision) for a in lats for b in lons}
+
+
+class GridIndex:
+    """
+    읽기 전용 공간 인덱스 (geohash 셀별로 정렬한 numpy 배열)
+      within(): 반경 내 전부 (거리순) / nearest(): 가까운 k개
+    """
+
+    # 셀을 너무 많이 훑게 되면(넓은 반경) 전체 벡터 계산이 더 빠름
+    MAX_CELLS = 400
+
+    def __init__(self, ids: Iterable[int], lats, lons, geohashes: Iterable[str] = None,
+                 precision: int = CELL_PRECISION):
+        self.precision = precision
+        lats = np.asarray(lats, dtype="float64")
+        lons = np.asarray(lons, dtype="float64")
+        if geohashes is None:
+            geohashes = [geohash_encode(a, b, precision) for a, b in zip(lats, lons)]
+        cells = np.array([g[:precision] for g in geohashes], dtype=f"U{precision}")
+
+        order = np.argsort(cells, kind="stable")
+        self.ids = np.asarray(list(ids), dtype="int64")[order]
+        self.lats, self.lons, cells = lats[order], lons[order], cells[order]
+        keys, starts = np.unique(cells, return_index=True)
+        ends = np.append(starts[1:], len(cells))
+        self.cells = {k: (s, e) for k, s, e in zip(keys.tolist(), starts.tolist(), ends.tolist())}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _candidates(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        cell_lat, cell_lon = cell_size_deg(self.precision)
+        approx_cells = (2 * dlat / cell_lat + 1) * (2 * dlat / max(math.cos(math.radians(lat)), 1e-6) / cell_lon + 1)
+        if approx_cells > self.MAX_CELLS:
+            return np.arange(len(self.ids))
+        spans = [self.cells[c] for c in covering_cells(lat, lon, radius_m, self.precision) if c in self.cells]
+        if not spans:
+            return np.empty(0, dtype="int64")
+        return np.concatenate([np.arange(s, e) for s, e in spans])
+
+    def within(self, lat: float, lon: float, radius_m: float) -> List[Tuple[int, float]]:
+        idx = self._candidates(lat, lon, radius_m)
+        dist = haversine_m(lat, lon, self.lats[idx], self.lons[idx])
+        keep = dist <= radius_m
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return list(zip(self.ids[idx[order]].tolist(), dist[order].tolist()))
+
+    def nearest(self, lat: float, lon: float, k: int, start_radius_m: float = 500.0) -> List[Tuple[int, float]]:
+        # 반경을 두 배씩 넓히며 k개 이상 찾으면 종료 (반경 안은 빠짐없이 찾으므로 정확한 k-최근접)
+        if k <= 0 or not len(self.ids):
+            return []
+        radius = start_radius_m
+        while radius < math.pi * EARTH_RADIUS_M:
+            found = self.within(lat, lon, radius)
+            if len(found) >= k:
+                return found[:k]
+            radius *= 2
+        return self.within(lat, lon, math.pi * EARTH_RADIUS_M)[:k]
@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional, Callable, Awaitable
+from app.services.metrics import REGISTRY, render_samples
+
+# SQLite 기반 작업 큐
+#   - submit → queued, 워커가 claim → running → done / (재시도) queued / failed
+#   - 테넌트 공정성: 가장 오래 전에 처리받은 테넌트의 작업부터 (라운드로빈), 테넌트별 동시 실행 상한
+#   - 실패 시 지수 백오프 + 지터로 재시도, max_attempts 넘으면 failed
+#   - 워커가 죽어 lease가 끝난 running 작업은 다시 queued로
+#     (실행 중에는 워커가 lease를 주기적으로 연장, 완료/실패 기록은 claim 때 받은 lease_owner가 맞을 때만)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.db")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_TENANT_MAX_RUNNING = int(os.getenv("JOB_TENANT_MAX_RUNNING", "2"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+
+TERMINAL = ("done", "failed")
+
+
+def backoff_seconds(attempts: int, base: float = JOB_BACKOFF_BASE, cap: float = JOB_BACKOFF_MAX) -> float:
+    # 1회 실패: base, 2회: 2*base ... (상한 cap), 절반~전체 사이 지터로 동시 재시도 분산
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random.random() * delay / 2
+
+
+class JobQueue:
+    def __init__(self, path: str = JOB_DB_PATH, lease_seconds: float = JOB_LEASE_SECONDS,
+                 tenant_max_running: int = JOB_TENANT_MAX_RUNNING):
+        self.lease_seconds = lease_seconds
+        self.tenant_max_running = tenant_max_running
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, tenant TEXT NOT NULL, kind TEXT NOT NULL, payload TEXT NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL,"
+            " available_at REAL NOT NULL, lease_until REAL, created_at REAL NOT NULL,"
+            " started_at REAL, finished_at REAL, result TEXT, error TEXT, lease_owner TEXT)"
+        )
+        columns = {r["name"] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lease_owner" not in columns:   # 이전 버전에서 만든 DB
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_available ON jobs(status, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_tenant_status ON jobs(tenant, status)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_tenants (tenant TEXT PRIMARY KEY, last_served REAL NOT NULL)"
+        )
+
+    # ---------- 제출/조회 ----------
+    def submit(self, kind: str, payload: dict, tenant: str = "default",
+               max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs(id, tenant, kind, payload, status, max_attempts, available_at, created_at)"
+                " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, tenant, kind, json.dumps(payload, ensure_ascii=False), max_attempts, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # ---------- 워커 ----------
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """ 실행할 작업 1개를 running으로 바꿔서 반환 (없으면 None), job["lease_owner"]로 완료/실패/연장 """
+        now = time.time()
+        owner = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT j.id, j.tenant FROM jobs j"
+                    " LEFT JOIN job_tenants t ON t.tenant = j.tenant"
+                    " WHERE j.status = 'queued' AND j.available_at <= ?"
+                    "  AND (SELECT COUNT(*) FROM jobs r WHERE r.tenant = j.tenant AND r.status = 'running') < ?"
+                    " ORDER BY COALESCE(t.last_served, 0), j.available_at LIMIT 1",
+                    (now, self.tenant_max_running),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, lease_until = ?,"
+                    " lease_owner = ? WHERE id = ?",
+                    (now, now + self.lease_seconds, owner, row["id"]),
+                )
+                self._conn.execute(
+                    "INSERT INTO job_tenants(tenant, last_served) VALUES (?, ?)"
+                    " ON CONFLICT(tenant) DO UPDATE SET last_served = excluded.last_served",
+                    (row["tenant"], now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def renew(self, job_id: str, owner: str) -> bool:
+        """ 실행 중인 작업의 lease 연장 (이미 다른 워커에게 넘어갔으면 False) """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (time.time() + self.lease_seconds, job_id, owner),
+            )
+        return cur.rowcount > 0
+
+    def complete(self, job_id: str, owner: str, result) -> bool:
+        """ 결과 저장 (lease를 잃었으면 기록하지 않고 False) """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ?, lease_until = NULL,"
+                " lease_owner = NULL WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (json.dumps(result, ensure_ascii=False), time.time(), job_id, owner),
+            )
+            if cur.rowcount:
+                self.processed += 1
+        return cur.rowcount > 0
+
+    def fail(self, job_id: str, owner: str, error: str) -> Optional[str]:
+        """ 재시도 가능하면 백오프 후 queued, 아니면 failed. 바뀐 상태 반환 (작업이 없거나 lease를 잃었으면 None) """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (job_id, owner),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] < row["max_attempts"]:
+                status, available_at, finished_at = "queued", now + backoff_seconds(row["attempts"]), None
+                self.retried += 1
+            else:
+                status, available_at, finished_at = "failed", now, now
+                self.failed += 1
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, finished_at = ?, lease_until = NULL,"
+                " lease_owner = NULL WHERE id = ?",
+                (status, error[:2000], available_at, finished_at, job_id),
+            )
+        return status
+
+    def release(self, job_id: str, owner: str) -> None:
+        """ 처리 못 하고 내려놓음 (워커 종료 등) → 시도 횟수 되돌리고 queued """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_until = NULL,"
+                " lease_owner = NULL, available_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (time.time(), job_id, owner),
+            )
+
+    def recover(self) -> int:
+        """
+        lease가 끝났는데 running인 작업(워커 중단) → 백오프 후 queued, 시도 횟수를 다 썼으면 failed
+        (처리할 때마다 워커를 죽이는 작업이 끝없이 재시도되지 않도록)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, attempts, max_attempts FROM jobs WHERE status = 'running' AND lease_until < ?",
+                    (now,),
+                ).fetchall()
+                for row in rows:
+                    if row["attempts"] >= row["max_attempts"]:
+                        status, available_at, finished_at = "failed", now, now
+                        self.failed += 1
+                    else:
+                        status, available_at, finished_at = "queued", now + backoff_seconds(row["attempts"]), None
+                        self.retried += 1
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, available_at = ?, finished_at = ?,"
+                        " lease_until = NULL, lease_owner = NULL WHERE id = ?",
+                        (status, "lease 만료 (워커 중단)", available_at, finished_at, row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    # ---------- 지표 ----------
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            by_tenant = dict(self._conn.execute(
+                "SELECT tenant, COUNT(*) FROM jobs WHERE status = 'queued' GROUP BY tenant"
+            ).fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE status = 'queued' AND available_at <= ?", (now,)
+            ).fetchone()[0]
+        return {
+            "queued": by_status.get("queued", 0),
+            "running": by_status.get("running", 0),
+            "done": by_status.get("done", 0),
+            "failed": by_status.get("failed", 0),
+            "queued_by_tenant": by_tenant,
+            "oldest_queued_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failures": self.failed,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+
+@REGISTRY.collector
+def _job_metrics():
+    stats = get_job_queue().stats()
+    return (
+        render_samples("jobs", "gauge", "상태별 작업 수",
+                       [({"status": k}, stats[k]) for k in ("queued", "running", "done", "failed")])
+        + render_samples("jobs_queued_by_tenant", "gauge", "테넌트별 대기 작업 수",
+                         [({"tenant": t}, n) for t, n in stats["queued_by_tenant"].items()])
+        + render_samples("jobs_oldest_queued_seconds", "gauge", "가장 오래 기다린 작업의 대기 시간",
+                         [({}, stats["oldest_queued_seconds"])])
+    )
+
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class WorkerPool:
+    """ asyncio 워커 N개가 큐에서 작업을 가져와 kind별 handler(payload)로 처리 """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Handler], concurrency: int = 2,
+                 poll_seconds: float = 0.5):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list = []
+        self._stopping = False
+
+    def notify(self):
+        # 새 작업 제출 시 대기 중인 워커를 바로 깨움 (다른 스레드/루프에서도 안전하게)
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        await asyncio.to_thread(self.queue.recover)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        self._stopping = True
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self) -> bool:
+        """ 작업 1개 처리 (없으면 False) """
+        job = await asyncio.to_thread(self.queue.claim)
+        if job is None:
+            return False
+        job_id, owner = job["id"], job["lease_owner"]
+        handler = self.handlers.get(job["kind"])
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, owner))
+        try:
+            if handler is None:
+                raise ValueError(f"알 수 없는 작업 종류: {job['kind']}")
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            # 종료 중 → 다음 실행 때 다시 처리되도록 되돌림
+            await asyncio.shield(asyncio.to_thread(self.queue.release, job_id, owner))
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.queue.fail, job_id, owner, f"{type(e).__name__}: {e}")
+        else:
+            await asyncio.to_thread(self.queue.complete, job_id, owner, result)
+        finally:
+            heartbeat.cancel()
+        return True
+
+    async def _heartbeat(self, job_id: str, owner: str):
+        # 처리가 lease보다 오래 걸려도 recover가 가져가지 않도록 lease의 1/3마다 연장
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.renew, job_id, owner):
+                return   # 이미 다른 워커에게 넘어감 → 결과는 complete/fail에서 버려짐
+
+    async def _run(self):
+        last_recover = time.monotonic()
+        while not self._stopping:
+            if await self.run_once():
+                continue
+            # 한가할 때 다른 프로세스에서 멈춘 작업도 주기적으로 회수
+            if time.monotonic() - last_recover > 30:
+                await asyncio.to_thread(self.queue.recover)
+                last_recover = time.monotonic()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
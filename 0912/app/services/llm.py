@@ -1,49 +1,433 @@
 import os
-from typing import Dict, Any
-from app.prompts import POST_PROMPT, CALENDAR_PROMPT
-from app.services.calendar import suggest_slots
-from openai import OpenAI
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-def llm_complete(prompt: str) -> str:
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role":"system","content":"You are a Korean marketing copywriter."},
-                  {"role":"user","content":prompt}],
-        temperature=0.7,
-    )
+import re
+import json
+import time
+import asyncio
+import weakref
+from contextvars import ContextVar
+from typing import Dict, Any, AsyncIterator, Tuple
+from app.prompts import POST_PROMPT, MULTI_POST_PROMPT, CALENDAR_TOPIC_PROMPT
+from app.services.calendar import suggest_slots, calendar_rows, render_calendar
+from app.services.campaigns import find_business
+from app.db import SessionLocal
+from app.services.reviews import analyze_reviews, summarize
+from app.services.review_ingest import stored_review_counts
+from app.services.review_index import get_index_store, business_key
+from app.services.llm_cache import get_llm_cache, llm_cache_key
+from app.services.rate_limit import get_rate_limiter
+from app.services.text import estimate_tokens
+from app.services.metrics import STAGE_LATENCY, LLM_LATENCY, LLM_TOKENS, LLM_IN_FLIGHT
+from openai import AsyncOpenAI
+
+# OpenAI 호환 서버 주소 (로컬 스텁/프록시를 쓸 때만, 기본은 api.openai.com)
+LLM_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+def configure_client(base_url: str = None, api_key: str = None, http_client=None):
+    """ 클라이언트 교체 (스텁 서버, ASGI transport 등) """
+    global aclient
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    # 재시도는 rate_limit.ModelLimiter가 담당 (429/Retry-After 인지 + 동시 실행 수 조절)
+    aclient = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=http_client)
+
+aclient: AsyncOpenAI
+configure_client(LLM_BASE_URL)
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.7
+
+# 한 캠페인 안에서 동시에 보낼 LLM 요청 수 상한
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+# 채널이 2개 이상이면 문안을 한 번의 호출(JSON)로 생성 → 공통 컨텍스트를 채널 수만큼 보내지 않음
+LLM_MULTI_CHANNEL = os.getenv("LLM_MULTI_CHANNEL", "1") == "1"
+
+# 캘린더 표는 성과 데이터로 바로 만들고, 켜져 있을 때만 슬롯별 주제 문구를 LLM으로 다듬음
+LLM_CALENDAR_TOPICS = os.getenv("LLM_CALENDAR_TOPICS", "0") == "1"
+
+SYSTEM_MSG = "You are a Korean marketing copywriter."
+
+# TPM 예약용 출력 토큰 추정치 (응답 후 실제 사용량으로 보정)
+OUTPUT_TOKENS_EST = int(os.getenv("LLM_OUTPUT_TOKENS_EST", "800"))
+
+# 요청 단위 캐시 우회 (같은 입력으로 새 변형이 필요할 때)
+#   generate_campaign / iter_campaign_events에서 설정 → 안에서 만든 태스크에도 전달됨
+fresh_completions: ContextVar[bool] = ContextVar("fresh_completions", default=False)
+
+# 지표 라벨용: 지금 호출이 어느 채널(또는 calendar/multi) 것인지 (태스크마다 따로)
+llm_channel: ContextVar[str] = ContextVar("llm_channel", default="-")
+
+# 진행 중인 같은 요청(캐시 키)은 업스트림 호출 1번을 함께 기다림 (single-flight)
+#   태스크는 만든 이벤트 루프에서만 기다릴 수 있으므로 루프별로 따로 (워커/테스트 등 여러 루프)
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+def _messages(prompt: str):
+    return [{"role":"system","content":SYSTEM_MSG},
+            {"role":"user","content":prompt}]
+
+def _cache_key(messages, **extra) -> str:
+    return llm_cache_key(MODEL, messages, TEMPERATURE, **extra)
+
+def _estimate(messages) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages) + OUTPUT_TOKENS_EST
+
+def _record_usage(usage):
+    if usage is None:
+        return
+    channel = llm_channel.get()
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, model=MODEL, channel=channel, kind="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens or 0, model=MODEL, channel=channel, kind="completion")
+
+async def _acreate(messages, **extra) -> str:
+    outcome = "error"
+    started = time.perf_counter()
+    LLM_IN_FLIGHT.inc(model=MODEL)
+    try:
+        resp = await get_rate_limiter().for_model(MODEL).call(
+            lambda: aclient.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=TEMPERATURE,
+                **extra,
+            ),
+            _estimate(messages),
+        )
+        outcome = "ok"
+    finally:
+        LLM_IN_FLIGHT.dec(model=MODEL)
+        LLM_LATENCY.observe(time.perf_counter() - started, model=MODEL, channel=llm_channel.get(), outcome=outcome)
+    _record_usage(getattr(resp, "usage", None))
     return resp.choices[0].message.content.strip()
 
-def generate_campaign(req) -> Dict[str, Any]:
-    # 1) 리뷰 요약(간단 버전: 키워드 나열)
-    top_keywords = []
-    for r in req.reviews[:50]:
-        # 아주 단순 요약(실제는 감성/키워드 추출 파이프라인 추천)
-        if "맛" in r: top_keywords.append("맛")
-        if "친절" in r: top_keywords.append("친절")
-    top_keywords = list(set(top_keywords)) or ["신선함","청결"]
-
-    # 2) 채널별 문안 생성
-    posts = []
+async def allm_complete(prompt: str) -> str:
+    return await _complete(_messages(prompt))
+
+async def allm_complete_json(prompt: str) -> str:
+    """ JSON 객체 하나만 출력하도록 강제 (파싱/검증은 호출하는 쪽에서) """
+    return await _complete(_messages(prompt), response_format={"type": "json_object"})
+
+async def _fetch(cache, key: str, messages, extra) -> str:
+    text = await _acreate(messages, **extra)
+    await asyncio.to_thread(cache.put, key, text, MODEL)
+    return text
+
+async def _complete(messages, **extra) -> str:
+    # 캐시 → 진행 중인 같은 요청 합류 → 업스트림 호출 (SQLite 캐시 읽기/쓰기는 이벤트 루프 밖에서)
+    cache, key = get_llm_cache(), _cache_key(messages, **extra)
+    if fresh_completions.get():
+        return await _fetch(cache, key, messages, extra)   # 다음 일반 요청은 최신 변형을 재사용
+
+    hit = await asyncio.to_thread(cache.get, key)
+    if hit is not None:
+        return hit
+
+    inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        # 업스트림 호출은 별도 태스크 → 처음 요청한 쪽이 취소돼도(연결 끊김 등) 함께 기다리던 요청은 결과를 받음
+        task = asyncio.create_task(_fetch(cache, key, messages, extra))
+        inflight[key] = task
+
+        def _done(t: asyncio.Task):
+            if inflight.get(key) is t:
+                del inflight[key]
+            # 기다리는 쪽이 모두 취소됐을 때 "exception was never retrieved" 경고 방지
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(_done)
+    else:
+        cache.coalesced += 1
+    return await asyncio.shield(task)
+
+async def astream_complete(prompt: str) -> AsyncIterator[str]:
+    """ 토큰(조각)이 도착하는 대로 yield (캐시에 있으면 한 번에) """
+    messages = _messages(prompt)
+    cache, key = get_llm_cache(), _cache_key(messages)
+    if not fresh_completions.get():
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            yield hit
+            return
+
+    # 스트림 생성(재시도 포함)부터 토큰을 다 받을 때까지 같은 동시 실행 슬롯 유지
+    limiter = get_rate_limiter().for_model(MODEL)
+    outcome = "error"
+    started = time.perf_counter()
+    LLM_IN_FLIGHT.inc(model=MODEL)
+    try:
+        parts = []
+        async with limiter.stream(
+            lambda: aclient.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=TEMPERATURE,
+                stream=True,
+                stream_options={"include_usage": True},   # 마지막 청크에 토큰 사용량
+            ),
+            _estimate(messages),
+        ) as stream:
+            async for chunk in stream:
+                _record_usage(getattr(chunk, "usage", None))
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        outcome = "ok"
+    finally:
+        LLM_IN_FLIGHT.dec(model=MODEL)
+        LLM_LATENCY.observe(time.perf_counter() - started, model=MODEL, channel=llm_channel.get(), outcome=outcome)
+    await asyncio.to_thread(cache.put, key, "".join(parts).strip(), MODEL)
+
+# 리뷰가 없거나 사전에 걸리는 표현이 없을 때 쓰는 기본 키워드
+DEFAULT_KEYWORDS = ["신선함","청결"]
+
+def _review_analysis(req) -> Dict[str, Any]:
+    # 업로드된 리뷰가 있으면 미리 계산된 집계(+ 요청 리뷰 중 새 것), 없으면 요청 리뷰 전체 분석
+    with SessionLocal() as db:
+        counts = stored_review_counts(db, req.name, req.address, req.reviews)
+    return summarize(counts) if counts is not None else analyze_reviews(req.reviews)
+
+async def summarize_reviews(req) -> Dict[str, Any]:
+    # DB 조회/분석은 이벤트 루프 밖에서
+    with STAGE_LATENCY.time(stage="review_analysis"):
+        analysis = await asyncio.to_thread(_review_analysis, req)
+    analysis["keywords"] = analysis["keywords"] or DEFAULT_KEYWORDS
+    return analysis
+
+def build_highlights(req, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "keywords": analysis["keywords"],
+        "strengths": req.strengths,
+        "sentiment": analysis["sentiment"],
+        "review_count": analysis["review_count"],
+    }
+
+# 채널별로 끌어올 후기 성격 (리뷰 인덱스 검색 질의)
+CHANNEL_QUERIES = {
+    "instagram": "분위기 감성 예쁘 사진 메뉴 맛있",
+    "naver_blog": "맛 메뉴 가격 양 재방문 추천",
+    "naver_place": "친절 청결 위치 주차 대기",
+}
+# 채널당 인용 후기 수/길이 상한 → 리뷰가 아무리 많아도 프롬프트 크기는 일정
+REVIEW_QUOTES_K = int(os.getenv("REVIEW_QUOTES_K", "3"))
+QUOTE_CHARS = 120
+
+def retrieve_quotes(req, keywords: list[str]) -> Dict[str, list[str]]:
+    # 업장 리뷰 인덱스에 새 리뷰를 추가하고, 채널별 상위 k개 후기 검색
+    index = get_index_store().get(business_key(req.name, req.address))
+    index.add(req.reviews)
+    quotes = {}
     for ch in req.channels:
-        prompt = POST_PROMPT.format(
-            name=req.name, category=req.category, address=req.address,
-            strengths=", ".join(req.strengths), tone=req.tone, channel=ch,
-            keywords=", ".join(top_keywords)
-        )
-        body = llm_complete(prompt)
-        posts.append({"channel": ch, "body": body})
+        query = " ".join([CHANNEL_QUERIES.get(ch, ch), *keywords, *req.strengths])
+        quotes[ch] = [text[:QUOTE_CHARS] for text, _ in index.search(query, REVIEW_QUOTES_K)]
+    return quotes
+
+def build_post_prompt(req, channel: str, keywords: list[str], quotes: list[str] = None) -> str:
+    return POST_PROMPT.format(
+        name=req.name, category=req.category, address=req.address,
+        strengths=", ".join(req.strengths), tone=req.tone, channel=channel,
+        keywords=", ".join(keywords),
+        quotes="\n".join(f'  "{q}"' for q in quotes) if quotes else "  (없음)",
+    )
 
-    # 3) 주간 캘린더 추천(요일/시간)
-    slots = suggest_slots(req.category)
-    cal_prompt = CALENDAR_PROMPT.format(
-        name=req.name, category=req.category, slots="\n".join(slots),
+def build_multi_post_prompt(req, keywords: list[str], quotes: Dict[str, list[str]]) -> str:
+    channel_quotes = []
+    for ch in req.channels:
+        channel_quotes.append(f"- {ch}:")
+        channel_quotes.extend([f'  "{q}"' for q in quotes.get(ch) or []] or ["  (없음)"])
+    return MULTI_POST_PROMPT.format(
+        name=req.name, category=req.category, address=req.address,
+        strengths=", ".join(req.strengths), tone=req.tone,
+        keywords=", ".join(keywords), channel_quotes="\n".join(channel_quotes),
+        channels=", ".join(req.channels),
     )
-    calendar_text = llm_complete(cal_prompt)
+
+def parse_multi_posts(text: str, channels: list[str]) -> Dict[str, str]:
+    """ {"posts": {채널: 문안}} 검증 → 통과한 채널만 반환 (형식이 틀리면 빈 dict) """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    posts = data.get("posts", data) if isinstance(data, dict) else None
+    if not isinstance(posts, dict):
+        return {}
+    return {ch: posts[ch].strip() for ch in channels
+            if isinstance(posts.get(ch), str) and posts[ch].strip()}
+
+def use_multi_channel(req) -> bool:
+    multi = getattr(req, "multi_channel", None)
+    return len(req.channels) > 1 and (LLM_MULTI_CHANNEL if multi is None else multi)
+
+async def generate_posts(req, keywords: list[str], quotes: Dict[str, list[str]], sem) -> Dict[str, str]:
+    """ 채널별 문안: (가능하면) 한 번에 생성 후, 검증 실패한 채널만 개별 호출 """
+    bodies: Dict[str, str] = {}
+    if use_multi_channel(req):
+        llm_channel.set("multi")
+        try:
+            async with sem:
+                text = await allm_complete_json(build_multi_post_prompt(req, keywords, quotes))
+            bodies = parse_multi_posts(text, req.channels)
+        except Exception:
+            bodies = {}
+
+    async def single(ch: str) -> str:
+        llm_channel.set(ch)
+        async with sem:
+            return await allm_complete(build_post_prompt(req, ch, keywords, quotes.get(ch)))
+
+    missing = [ch for ch in req.channels if ch not in bodies]
+    for ch, body in zip(missing, await asyncio.gather(*(single(ch) for ch in missing))):
+        bodies[ch] = body
+    return bodies
+
+def _slot_plan(req) -> Dict[str, Any]:
+    with SessionLocal() as db:
+        business = find_business(db, req.name, req.address)
+        return suggest_slots(db, req.category, req.channels, business.id if business else None)
+
+def use_calendar_topics(req) -> bool:
+    topics = getattr(req, "calendar_topics", None)
+    return LLM_CALENDAR_TOPICS if topics is None else topics
+
+def build_calendar_topic_prompt(req, rows: list[Dict[str, str]], keywords: list[str]) -> str:
+    slots = [f"{i}. {r['day']} {r['time']} / {r['channel']} / {r['topic']} / {r['goal']}"
+             for i, r in enumerate(rows, 1)]
+    return CALENDAR_TOPIC_PROMPT.format(
+        name=req.name, category=req.category, keywords=", ".join(keywords),
+        strengths=", ".join(req.strengths), slots="\n".join(slots),
+    )
+
+def parse_topics(text: str, n: int):
+    """ {"topics": [...]} 검증 → 슬롯 수만큼의 문자열 목록 (아니면 None) """
+    try:
+        topics = json.loads(re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())).get("topics")
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    if not isinstance(topics, list) or len(topics) != n or not all(isinstance(t, str) and t.strip() for t in topics):
+        return None
+    return [t.strip() for t in topics]
+
+async def build_calendar(req, keywords: list[str], sem) -> str:
+    """ 상위 슬롯으로 표를 바로 렌더링, (켜져 있으면) 주제 문구만 LLM 1회 — 실패하면 기본 문구 """
+    plan = await asyncio.to_thread(_slot_plan, req)
+    rows = calendar_rows(plan["slots"], keywords)
+    if rows and use_calendar_topics(req):
+        try:
+            async with sem:
+                text = await allm_complete_json(build_calendar_topic_prompt(req, rows, keywords))
+            for row, topic in zip(rows, parse_topics(text, len(rows)) or []):
+                row["content"] = topic
+        except Exception:
+            pass
+    return render_calendar(rows, plan["business_posts"], plan["category_posts"])
+
+async def generate_campaign(req, concurrency: int = LLM_CONCURRENCY) -> Dict[str, Any]:
+    fresh_completions.set(getattr(req, "fresh", False))
+    # 1) 리뷰 요약 (키워드 + 긍/부정 비율, 전체 리뷰 사용)
+    started = time.perf_counter()
+    analysis = await summarize_reviews(req)
+    top_keywords = analysis["keywords"]
+    with STAGE_LATENCY.time(stage="quote_retrieval"):
+        quotes = await asyncio.to_thread(retrieve_quotes, req, top_keywords)
+
+    # 2) 채널별 문안 + 3) 주간 캘린더(성과 데이터 기반 요일/시간)를 동시에 생성 (동시 요청 수 상한)
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def posts() -> Dict[str, str]:
+        with STAGE_LATENCY.time(stage="posts"):
+            return await generate_posts(req, top_keywords, quotes, sem)
+
+    async def calendar() -> str:
+        llm_channel.set("calendar")
+        with STAGE_LATENCY.time(stage="calendar"):
+            return await build_calendar(req, top_keywords, sem)
+
+    bodies, calendar_text = await asyncio.gather(posts(), calendar())
+    STAGE_LATENCY.observe(time.perf_counter() - started, stage="total")
 
     return {
-        "highlights": {"keywords": top_keywords, "strengths": req.strengths},
-        "posts": posts,
+        "highlights": build_highlights(req, analysis),
+        "posts": [{"channel": ch, "body": bodies[ch]} for ch in req.channels],
         "calendar": calendar_text
     }
+
+async def iter_campaign_events(req, stream_tokens: bool = False,
+                               concurrency: int = LLM_CONCURRENCY) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    캠페인 결과를 만들어지는 순서대로 (이벤트 이름, 데이터) 로 yield
+      highlights → post_delta(stream_tokens일 때) / post (채널별 완료 순) → calendar → done
+    한 채널이 실패해도 error 이벤트만 보내고 나머지는 계속 진행
+    """
+    fresh_completions.set(getattr(req, "fresh", False))
+    analysis = await summarize_reviews(req)
+    top_keywords = analysis["keywords"]
+    yield "highlights", build_highlights(req, analysis)
+    with STAGE_LATENCY.time(stage="quote_retrieval"):
+        quotes = await asyncio.to_thread(retrieve_quotes, req, top_keywords)
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def run_post(ch: str):
+        llm_channel.set(ch)
+        prompt = build_post_prompt(req, ch, top_keywords, quotes.get(ch))
+        try:
+            async with sem:
+                if stream_tokens:
+                    parts = []
+                    async for delta in astream_complete(prompt):
+                        parts.append(delta)
+                        await queue.put(("post_delta", {"channel": ch, "delta": delta}))
+                    body = "".join(parts).strip()
+                else:
+                    body = await allm_complete(prompt)
+            await queue.put(("post", {"channel": ch, "body": body}))
+        except Exception as e:
+            await queue.put(("error", {"stage": ch, "message": str(e)}))
+        finally:
+            await queue.put(finished)
+
+    async def run_calendar():
+        llm_channel.set("calendar")
+        try:
+            calendar_text = await build_calendar(req, top_keywords, sem)
+            await queue.put(("calendar", {"calendar": calendar_text}))
+        except Exception as e:
+            await queue.put(("error", {"stage": "calendar", "message": str(e)}))
+        finally:
+            await queue.put(finished)
+
+    async def run_posts_multi():
+        # 한 번에 생성 → 통과한 채널은 바로 post, 나머지는 채널별 호출로
+        llm_channel.set("multi")
+        bodies = {}
+        try:
+            async with sem:
+                text = await allm_complete_json(build_multi_post_prompt(req, top_keywords, quotes))
+            bodies = parse_multi_posts(text, req.channels)
+        except Exception:
+            pass
+        for ch, body in bodies.items():
+            await queue.put(("post", {"channel": ch, "body": body}))
+            await queue.put(finished)
+        await asyncio.gather(*(run_post(ch) for ch in req.channels if ch not in bodies))
+
+    if use_multi_channel(req) and not stream_tokens:
+        tasks = [asyncio.create_task(run_posts_multi())]
+    else:
+        tasks = [asyncio.create_task(run_post(ch)) for ch in req.channels]
+    tasks.append(asyncio.create_task(run_calendar()))
+    try:
+        remaining = len(req.channels) + 1   # 채널별 + 캘린더 완료 신호 수
+        while remaining:
+            item = await queue.get()
+            if item is finished:
+                remaining -= 1
+                continue
+            yield item
+        yield "done", {}
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 LLM 요청도 취소
+        for t in tasks:
+            t.cancel()
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Optional
+from app.services.metrics import REGISTRY, render_samples
+
+# LLM 응답 캐시 (SQLite)
+#   키: (모델, 메시지, temperature)의 해시 → 같은 프롬프트 재요청/재시도는 API 호출 없이 응답
+#   TTL이 지난 항목, 최대 개수/용량을 넘는 항목(오래 안 쓴 순)은 저장할 때 정리
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))   # 0이면 캐시 끔
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "50"))
+
+
+def llm_cache_key(model: str, messages: list, temperature: float, **options) -> str:
+    """ 출력에 영향을 주는 요청 값 전부 (response_format 등 options 포함, 없으면 기존 키와 같음) """
+    parts = [model, messages, temperature] + ([options] if options else [])
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: int = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0   # 진행 중인 같은 요청에 합류한 횟수 (llm.py에서 증가)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, model TEXT, text TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache(last_used)")
+        self._conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, text: str, model: str = None):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, model, text, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, text, len(text.encode("utf-8")), now, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            # 최근 사용 순으로 누적해서 개수/용량 한도를 넘는 항목 삭제
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, ROW_NUMBER() OVER w AS n, SUM(size) OVER w AS total FROM llm_cache"
+                "  WINDOW w AS (ORDER BY last_used DESC ROWS UNBOUNDED PRECEDING))"
+                " WHERE n > ? OR total > ?)",
+                (self.max_entries, self.max_bytes),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits,
+                "misses": self.misses, "coalesced": self.coalesced}
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMCache:
+    return LLMCache()
+
+
+@REGISTRY.collector
+def _cache_metrics():
+    stats = get_llm_cache().stats()
+    lookups = stats["hits"] + stats["misses"]
+    return (
+        render_samples("llm_cache_events_total", "counter", "LLM 캐시 조회 결과",
+                       [({"result": k}, stats[k]) for k in ("hits", "misses", "coalesced")])
+        + render_samples("llm_cache_hit_ratio", "gauge", "LLM 캐시 적중률 (프로세스 시작 이후)",
+                         [({}, stats["hits"] / lookups if lookups else 0.0)])
+        + render_samples("llm_cache_entries", "gauge", "LLM 캐시 항목 수", [({}, stats["entries"])])
+        + render_samples("llm_cache_bytes", "gauge", "LLM 캐시 크기(바이트)", [({}, stats["bytes"])])
+    )
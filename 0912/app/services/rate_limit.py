@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional, Callable, Awaitable
+import openai
+from app.services.metrics import REGISTRY, render_samples
+
+# OpenAI 호출 제어 (모델별)
+#   1) 토큰 버킷 2개: 분당 요청 수(RPM) / 분당 토큰 수(TPM, 프롬프트 길이로 추정 후 실제 사용량으로 보정)
+#   2) 적응형 동시 실행 수(AIMD): 성공하면 조금씩 늘리고, 429/지연 증가 시 절반으로
+#   3) 재시도: 429/5xx/연결 오류는 지수 백오프 + 지터, Retry-After 헤더가 있으면 그만큼 대기
+#
+# 여러 이벤트 루프(워커/테스트)에서 같이 쓰므로 asyncio 동기화 객체 대신
+# threading.Lock으로 상태만 보호하고, 버킷 대기는 asyncio.sleep, 동시 실행 슬롯 대기는
+# 온 순서대로 줄 세운 future를 그 future의 루프에서 깨움 (call_soon_threadsafe)
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("LLM_TPM", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", "0.5"))
+LLM_RETRY_MAX = float(os.getenv("LLM_RETRY_MAX", "30"))
+# 모델별 덮어쓰기: {"gpt-4o-mini": {"rpm": 5000, "tpm": 2000000, "max_concurrency": 32}}
+LLM_LIMITS = json.loads(os.getenv("LLM_LIMITS", "{}"))
+
+
+class TokenBucket:
+    """ 분당 rate개 보충, 모자라면 미리 예약(음수 허용)하고 그만큼 대기 → 먼저 온 순서대로 통과 """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """ amount만큼 가져가고, 기다려야 할 시간(초) 반환 """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, delta: float):
+        # 실제 사용량 보정 (추정보다 적게 쓰면 돌려받고, 많이 쓰면 더 차감)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+    async def acquire(self, amount: float = 1.0):
+        wait = self.reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD: 성공 시 limit += 1/limit (대략 limit번 성공마다 +1), 429/지연 시 limit *= 0.5
+    자리가 없으면 대기열(FIFO)에 서고, 슬롯이 비는 대로 앞에서부터 넘겨받음
+    """
+
+    def __init__(self, initial: int, minimum: int = LLM_MIN_CONCURRENCY, maximum: int = LLM_MAX_CONCURRENCY,
+                 latency_target: float = LLM_LATENCY_TARGET):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: deque = deque()   # (루프, future), 온 순서대로
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # 기다리는 쪽이 있으면 새로 온 요청은 뒤에 섬 (새치기 방지)
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # 슬롯을 넘겨받은 직후 취소됨 → 다음 대기자에게
+                    self.in_flight -= 1
+                    self._wake()
+            raise
+
+    def _wake(self):
+        # 락 안에서 호출: 빈 슬롯만큼 대기열 앞에서부터 넘겨줌 (in_flight는 넘겨줄 때 올림)
+        while self._waiters and self.in_flight < int(self.limit):
+            loop, fut = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_grant, fut)
+            except RuntimeError:
+                continue   # 루프가 이미 닫힘
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self, latency: float):
+        with self._lock:
+            if latency > self.latency_target:
+                self._decrease(0.5)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                self._wake()
+
+    def on_overload(self):
+        with self._lock:
+            self._decrease(0.5)
+
+    def _decrease(self, factor: float):
+        # 동시에 실패한 요청들이 연달아 줄이지 않도록 1초에 한 번만
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(self.minimum, self.limit * factor)
+            self._last_decrease = now
+
+
+def _grant(fut: asyncio.Future):
+    if not fut.done():
+        fut.set_result(None)
+
+
+def retry_after_seconds(error: Exception, cap: float = LLM_RETRY_MAX) -> Optional[float]:
+    """ Retry-After(-ms) 헤더 값 (잘못된 큰 값에 무한정 묶이지 않도록 cap초까지) """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            wait = float(headers["retry-after-ms"]) / 1000
+        elif headers.get("retry-after"):
+            wait = float(headers["retry-after"])
+        else:
+            return None
+    except ValueError:
+        return None   # HTTP 날짜 형식 등은 일반 백오프로
+    return min(max(wait, 0.0), cap)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def backoff_seconds(attempt: int, base: float = LLM_RETRY_BASE, cap: float = LLM_RETRY_MAX) -> float:
+    # full jitter: 0 ~ base * 2^attempt
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ModelLimiter:
+    def __init__(self, rpm: float = LLM_RPM, tpm: float = LLM_TPM, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 min_concurrency: int = LLM_MIN_CONCURRENCY, latency_target: float = LLM_LATENCY_TARGET):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = AdaptiveConcurrency(max(min_concurrency, max_concurrency // 2),
+                                               min_concurrency, max_concurrency, latency_target)
+        self.retries = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self, est_tokens: int):
+        """ 버킷 2개 + 동시 실행 슬롯을 잡고 실행, 끝나면 성공/실패 신호로 limit 조정 """
+        await self.requests.acquire(1)
+        await self.tokens.acquire(est_tokens)
+        await self.concurrency.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except openai.RateLimitError:
+            self.throttled += 1
+            self.concurrency.on_overload()
+            raise
+        else:
+            self.concurrency.on_success(time.monotonic() - started)
+        finally:
+            self.concurrency.release()
+
+    async def call(self, make_call: Callable[[], Awaitable[Any]], est_tokens: int,
+                   max_retries: int = LLM_MAX_RETRIES):
+        """ make_call()을 제한 안에서 실행, 일시적 오류는 재시도 """
+        for attempt in range(max_retries + 1):
+            try:
+                async with self.slot(est_tokens):
+                    resp = await make_call()
+                usage = getattr(resp, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    self.tokens.adjust(usage.total_tokens - est_tokens)
+                return resp
+            except Exception as e:
+                if attempt >= max_retries or not is_retryable(e):
+                    raise
+                await self._wait_before_retry(attempt, e)
+
+    @asynccontextmanager
+    async def stream(self, make_call: Callable[[], Awaitable[Any]], est_tokens: int,
+                     max_retries: int = LLM_MAX_RETRIES):
+        """
+        스트림 생성부터 다 읽을 때까지 슬롯 1개를 유지 (지연도 스트림 전체 시간으로 반영)
+        재시도는 생성 단계만, 토큰을 받기 시작한 뒤의 오류는 그대로 올림
+        """
+        for attempt in range(max_retries + 1):
+            opened = False
+            try:
+                async with self.slot(est_tokens):
+                    stream = await make_call()
+                    opened = True
+                    yield stream
+                return
+            except Exception as e:
+                if opened or attempt >= max_retries or not is_retryable(e):
+                    raise
+                await self._wait_before_retry(attempt, e)
+
+    async def _wait_before_retry(self, attempt: int, error: Exception):
+        self.retries += 1
+        wait = retry_after_seconds(error)
+        await asyncio.sleep(wait if wait is not None else backoff_seconds(attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+
+class RateLimiter:
+    """ 모델 이름별 ModelLimiter (LLM_LIMITS로 모델마다 다른 한도) """
+
+    def __init__(self, limits: Dict[str, Dict[str, Any]] = None):
+        self.limits = LLM_LIMITS if limits is None else limits
+        self._models: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model: str) -> ModelLimiter:
+        with self._lock:
+            if model not in self._models:
+                self._models[model] = ModelLimiter(**self.limits.get(model, {}))
+            return self._models[model]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = dict(self._models)
+        return {model: limiter.stats() for model, limiter in models.items()}
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter()
+
+
+@REGISTRY.collector
+def _limiter_metrics():
+    stats = get_rate_limiter().stats()
+    return (
+        render_samples("llm_concurrency_limit", "gauge", "모델별 적응형 동시 실행 한도",
+                       [({"model": m}, s["concurrency_limit"]) for m, s in stats.items()])
+        + render_samples("llm_limiter_in_flight", "gauge", "제한기 슬롯을 잡고 있는 호출 수",
+                         [({"model": m}, s["in_flight"]) for m, s in stats.items()])
+        + render_samples("llm_retries_total", "counter", "모델별 LLM 재시도 수",
+                         [({"model": m}, s["retries"]) for m, s in stats.items()])
+        + render_samples("llm_throttled_total", "counter", "모델별 429 응답 수",
+                         [({"model": m}, s["throttled"]) for m, s in stats.items()])
+    )
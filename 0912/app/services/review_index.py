@@ -0,0 +1,151 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import numpy as np
+import faiss
+from app.services.text import tokenize
+
+# 업장별 리뷰 벡터 인덱스 (FAISS, 디스크 저장)
+#   임베딩은 로컬 해싱 벡터(단어 + 한글 2-gram) → 외부 API 없이 오프라인 동작
+#   <REVIEW_INDEX_DIR>/<업장 키>.jsonl  : id → 리뷰 원문 (추가분만 이어 쓰기, 기준 데이터)
+#   <REVIEW_INDEX_DIR>/<업장 키>.faiss  : 벡터 스냅샷 (id = 리뷰 내용 해시)
+#   스냅샷은 파일 전체를 다시 쓰므로 새 벡터가 REVIEW_INDEX_SNAPSHOT_EVERY개 쌓였을 때/flush 때만 저장,
+#   열 때 스냅샷 이후 원문만 있는 리뷰는 다시 임베딩 (임베딩은 원문으로 정해지므로 결과 동일)
+REVIEW_INDEX_DIR = os.getenv("REVIEW_INDEX_DIR", "review_index")
+EMBED_DIM = int(os.getenv("REVIEW_EMBED_DIM", "1024"))
+REVIEW_INDEX_SNAPSHOT_EVERY = int(os.getenv("REVIEW_INDEX_SNAPSHOT_EVERY", "1000"))
+
+def embed(texts: List[str], dim: int = EMBED_DIM) -> np.ndarray:
+    # 해싱 트릭: crc32(토큰) → 차원/부호, 로그 TF, L2 정규화 (내적 = 코사인 유사도)
+    vecs = np.zeros((len(texts), dim), dtype="float32")
+    for row, text in enumerate(texts):
+        for tok in tokenize(text):
+            h = zlib.crc32(tok.encode("utf-8"))
+            vecs[row, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    np.copysign(np.log1p(np.abs(vecs)), vecs, out=vecs)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    np.divide(vecs, norms, out=vecs, where=norms > 0)
+    return vecs
+
+
+def review_id(text: str) -> int:
+    # 같은 리뷰는 같은 id → 중복 추가 방지 (faiss id는 int64)
+    digest = hashlib.sha1(" ".join(text.split()).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+def business_key(name: str, address: str = "") -> str:
+    return hashlib.sha1(f"{name.strip()}|{address.strip()}".encode("utf-8")).hexdigest()[:16]
+
+
+class ReviewIndex:
+    """ 업장 1곳의 리뷰 인덱스: 증분 추가(add) / 상위 k개 검색(search) """
+
+    def __init__(self, path_prefix: str, dim: int = EMBED_DIM, snapshot_every: int = REVIEW_INDEX_SNAPSHOT_EVERY):
+        self.dim = dim
+        self.snapshot_every = snapshot_every
+        self.index_path = f"{path_prefix}.faiss"
+        self.texts_path = f"{path_prefix}.jsonl"
+        self.texts: Dict[int, str] = {}
+        self.unsaved = 0   # 스냅샷에 아직 없는 벡터 수
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.texts_path):
+            with open(self.texts_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue   # 저장 중 잘린 마지막 줄
+                    self.texts[row["id"]] = row["text"]
+        if os.path.exists(self.index_path):
+            self.index = faiss.read_index(self.index_path)
+        else:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        indexed = set(faiss.vector_to_array(self.index.id_map).tolist())
+        missing = {rid: text for rid, text in self.texts.items() if rid not in indexed}
+        if missing:
+            self._add_vectors(missing)
+            self.unsaved = len(missing)
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def add(self, reviews: List[str]) -> int:
+        """ 처음 보는 리뷰만 추가하고 저장, 추가한 개수 반환 """
+        with self._lock:
+            new = {}
+            for text in reviews:
+                text = text.strip()
+                rid = review_id(text) if text else None
+                if rid is not None and rid not in self.texts and rid not in new:
+                    new[rid] = text
+            if not new:
+                return 0
+
+            # 원문을 먼저 이어 쓰고(여기까지 저장되면 다시 열 때 복구됨) 메모리 인덱스에 추가
+            with open(self.texts_path, "a", encoding="utf-8") as f:
+                for rid, text in new.items():
+                    f.write(json.dumps({"id": rid, "text": text}, ensure_ascii=False) + "\n")
+            self._add_vectors(new)
+            self.texts.update(new)
+            self.unsaved += len(new)
+            if self.unsaved >= self.snapshot_every:
+                self._write_snapshot()
+            return len(new)
+
+    def flush(self):
+        """ 스냅샷 이후 추가분이 있으면 인덱스 파일 저장 (종료/대량 업로드 후) """
+        with self._lock:
+            if self.unsaved:
+                self._write_snapshot()
+
+    def _add_vectors(self, new: Dict[int, str]):
+        ids = np.fromiter(new.keys(), dtype="int64", count=len(new))
+        self.index.add_with_ids(embed(list(new.values()), self.dim), ids)
+
+    def _write_snapshot(self):
+        # 임시 파일에 쓴 뒤 교체 (중간에 끊겨도 이전 파일 유지)
+        tmp_path = f"{self.index_path}.tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, self.index_path)
+        self.unsaved = 0
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[str, float]]:
+        with self._lock:
+            if not self.index.ntotal or k <= 0:
+                return []
+            scores, ids = self.index.search(embed([query], self.dim), min(k, self.index.ntotal))
+        return [(self.texts[int(i)], float(s)) for s, i in zip(scores[0], ids[0]) if i != -1]
+
+
+class ReviewIndexStore:
+    """ 업장 키별 ReviewIndex를 한 번만 열어 재사용 """
+
+    def __init__(self, root: str = REVIEW_INDEX_DIR, dim: int = EMBED_DIM):
+        self.root = root
+        self.dim = dim
+        self._indexes: Dict[str, ReviewIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> ReviewIndex:
+        with self._lock:
+            if key not in self._indexes:
+                os.makedirs(self.root, exist_ok=True)
+                self._indexes[key] = ReviewIndex(os.path.join(self.root, key), self.dim)
+            return self._indexes[key]
+
+    def flush(self):
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.flush()
+
+
+@lru_cache(maxsize=1)
+def get_index_store() -> ReviewIndexStore:
+    return ReviewIndexStore()
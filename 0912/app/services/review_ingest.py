@@ -0,0 +1,194 @@
+import io
+import os
+import csv
+import json
+import hashlib
+import datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.db import upsert_insert
+from app.models.entities import Business, Review, ReviewStats
+from app.services.reviews import get_analyzer, merge_counts
+from app.services.review_index import get_index_store, business_key
+
+# 리뷰 대량 업로드 (CSV / JSONL)
+#   파일을 줄 단위로 읽어 batch_size개씩: 내용 해시로 중복 제거 → INSERT ... ON CONFLICT DO NOTHING
+#   → 실제로 들어간 리뷰분만 집계에 더함
+#   메모리에는 배치 1개(+ 검색 인덱스에 넣을 대기분)만 올라감
+REVIEW_BATCH_SIZE = int(os.getenv("REVIEW_BATCH_SIZE", "1000"))
+# 검색 인덱스(FAISS)에는 배치 여러 개를 모아서 추가, 업로드가 끝나면 인덱스 파일 한 번 저장
+REVIEW_INDEX_FLUSH = int(os.getenv("REVIEW_INDEX_FLUSH", "10000"))
+
+FORMATS = ("csv", "jsonl")
+TEXT_FIELDS = ("review", "text", "body", "content", "리뷰", "내용")
+RATING_FIELDS = ("rating", "score", "stars", "별점", "평점")
+
+Row = Tuple[str, Optional[float]]
+
+
+def content_hash(text: str) -> str:
+    # 공백만 다른 리뷰는 같은 리뷰로
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def _rating(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _pick(names: List[str], candidates: Tuple[str, ...]) -> Optional[int]:
+    lowered = [n.strip().lower() for n in names]
+    for c in candidates:
+        if c in lowered:
+            return lowered.index(c)
+    return None
+
+
+def iter_csv(text: Iterable[str]) -> Iterator[Row]:
+    """ 헤더에 리뷰 열(review/text/리뷰…)이 있으면 그 열, 없으면 첫 열을 리뷰로 (헤더 없는 1열 파일 포함) """
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    text_col = _pick(header, TEXT_FIELDS)
+    rating_col = _pick(header, RATING_FIELDS)
+    if text_col is None:
+        text_col = 0
+        yield header[0] if header else "", None
+    for row in reader:
+        body = row[text_col] if len(row) > text_col else ""
+        rating = row[rating_col] if rating_col is not None and len(row) > rating_col else None
+        yield body, _rating(rating)
+
+
+def iter_jsonl(text: Iterable[str]) -> Iterator[Row]:
+    """ 줄마다 "리뷰 문자열" 또는 {"review": ..., "rating": ...} (깨진 줄은 빈 리뷰로 → skipped) """
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            yield "", None
+            continue
+        if isinstance(obj, str):
+            yield obj, None
+        elif isinstance(obj, dict):
+            body = next((obj[k] for k in TEXT_FIELDS if isinstance(obj.get(k), str)), "")
+            yield body, _rating(next((obj[k] for k in RATING_FIELDS if k in obj), None))
+        else:
+            yield "", None
+
+
+def iter_reviews(stream: BinaryIO, fmt: str) -> Iterator[Row]:
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    # utf-8-sig: 엑셀에서 저장한 CSV의 BOM 제거
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        yield from (iter_csv(text) if fmt == "csv" else iter_jsonl(text))
+    finally:
+        text.detach()   # 스트림은 호출한 쪽이 닫음
+
+
+def _add_counts(db: Session, business_id: int, counts: Dict[str, Any]):
+    # 리뷰 insert로 쓰기 잠금을 잡은 뒤 읽고 더함 (PostgreSQL 등은 FOR UPDATE로 행 잠금)
+    stats = db.scalars(
+        select(ReviewStats).where(ReviewStats.business_id == business_id).with_for_update()
+    ).first()
+    if stats is None:
+        stats = ReviewStats(business_id=business_id, total=0, positive=0, negative=0, neutral=0,
+                            keyword_counts={})
+        db.add(stats)
+    merged = merge_counts(stats.counts(), counts)
+    stats.total, stats.positive = merged["total"], merged["positive"]
+    stats.negative, stats.neutral = merged["negative"], merged["neutral"]
+    stats.keyword_counts = merged["keyword_counts"]
+
+
+def _ingest_batch(db: Session, business_id: int, batch: List[Row], source: Optional[str]) -> Tuple[List[str], int]:
+    """ 배치 1개 저장 → (새로 저장한 리뷰 원문, 빈 리뷰 수) """
+    unique: Dict[str, Row] = {}
+    skipped = 0
+    for body, rating in batch:
+        body = (body or "").strip()
+        if not body:
+            skipped += 1
+            continue
+        unique.setdefault(content_hash(body), (body, rating))
+    if not unique:
+        return [], skipped
+
+    # 이미 있는 리뷰는 DB가 건너뜀 (동시에 같은 파일을 올려도 UNIQUE 충돌 없이 한쪽만 저장)
+    now = datetime.datetime.utcnow()
+    inserted = set(db.scalars(
+        upsert_insert(db, Review)
+        .on_conflict_do_nothing(index_elements=["business_id", "content_hash"])
+        .returning(Review.content_hash),
+        [{"business_id": business_id, "content_hash": h, "body": body, "rating": rating,
+          "source": source, "created_at": now}
+         for h, (body, rating) in unique.items()],
+    ))
+    new = {h: row for h, row in unique.items() if h in inserted}
+    if new:
+        texts = [body for body, _ in new.values()]
+        analyzer = get_analyzer()
+        _add_counts(db, business_id, analyzer.aggregate(analyzer.match(texts), len(texts)))
+    db.commit()
+    return [body for body, _ in new.values()], skipped
+
+
+def ingest_reviews(db: Session, business: Business, stream: BinaryIO, fmt: str = "csv",
+                   batch_size: int = REVIEW_BATCH_SIZE, source: Optional[str] = None) -> Dict[str, int]:
+    """ 업로드 파일을 배치 단위로 저장, 받은/저장/중복/빈 리뷰 수 반환 (배치마다 커밋) """
+    result = {"received": 0, "inserted": 0, "duplicates": 0, "skipped": 0}
+    index = get_index_store().get(business_key(business.name, business.address))
+    pending: List[str] = []
+    rows = iter_reviews(stream, fmt)
+    while True:
+        batch = list(islice(rows, max(1, batch_size)))
+        if not batch:
+            break
+        inserted, skipped = _ingest_batch(db, business.id, batch, source)
+        result["received"] += len(batch)
+        result["inserted"] += len(inserted)
+        result["skipped"] += skipped
+        result["duplicates"] += len(batch) - len(inserted) - skipped
+        pending.extend(inserted)
+        if len(pending) >= REVIEW_INDEX_FLUSH:
+            index.add(pending)
+            pending = []
+    if pending:
+        index.add(pending)
+    index.flush()
+    return result
+
+
+def stored_review_counts(db: Session, name: str, address: str, extra_reviews: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    업로드로 쌓인 업장 집계 (행 1개 조회) + 요청에 직접 넣은 리뷰 중 아직 저장 안 된 것만 분석해서 합산
+    업로드된 리뷰가 없으면 None
+    """
+    stats = db.scalars(
+        select(ReviewStats).join(Business, Business.id == ReviewStats.business_id)
+        .where(Business.name == name, Business.address == address).limit(1)
+    ).first()
+    if stats is None:
+        return None
+    counts = stats.counts()
+    extra = {content_hash(t): t.strip() for t in extra_reviews if t and t.strip()}
+    if extra:
+        stored = set(db.scalars(
+            select(Review.content_hash).where(Review.business_id == stats.business_id,
+                                              Review.content_hash.in_(list(extra)))
+        ))
+        texts = [t for h, t in extra.items() if h not in stored]
+        if texts:
+            analyzer = get_analyzer()
+            counts = merge_counts(counts, analyzer.aggregate(analyzer.match(texts), len(texts)))
+    return counts
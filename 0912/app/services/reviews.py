@@ -1,11 +1,156 @@
-from collections import Counter
+import os
+import re
+import json
+from functools import lru_cache
+from typing import Dict, Any
+import pandas as pd
+
+# 측면(aspect)별 표현 사전
+#   neutral: 언급만 (극성 0) / positive: 긍정(+1) / negative: 부정(-1)
+# "_general"은 측면 없이 감성만 판단하는 표현
+# 긴 표현이 먼저 매칭되므로 "맛없", "불친절", "친절하지 않" 같은 부정형이 "맛", "친절"보다 우선
+DEFAULT_LEXICON: Dict[str, Dict[str, list]] = {
+    "맛": {
+        "neutral": ["맛", "풍미", "식감"],
+        "positive": ["맛있", "맛나", "존맛", "고소", "진하", "신선"],
+        "negative": ["맛없", "맛이 없", "싱겁", "느끼", "비리", "눅눅"],
+    },
+    "친절": {
+        "neutral": ["서비스", "응대", "직원", "사장님"],
+        "positive": ["친절", "상냥", "다정", "세심"],
+        "negative": ["불친절", "친절하지 않", "불쾌", "무례", "퉁명"],
+    },
+    "분위기": {
+        "neutral": ["분위기", "인테리어", "음악"],
+        "positive": ["아늑", "조용", "감성", "예쁘", "예뻐"],
+        "negative": ["시끄럽", "어수선", "좁아"],
+    },
+    "청결": {
+        "neutral": ["청결", "위생"],
+        "positive": ["깨끗", "깔끔"],
+        "negative": ["더럽", "지저분", "불결", "벌레"],
+    },
+    "가격": {
+        "neutral": ["가격", "가성비"],
+        "positive": ["저렴", "착한 가격", "가성비 좋", "가성비가 좋"],
+        "negative": ["비싸", "비쌈", "가성비 별로", "가성비가 별로"],
+    },
+    "양": {
+        "neutral": [],
+        "positive": ["푸짐", "넉넉", "양 많", "양이 많"],
+        "negative": ["양이 적", "양 적", "양이 너무 적"],
+    },
+    "속도": {
+        "neutral": ["대기", "웨이팅"],
+        "positive": ["빨리 나", "금방 나", "빠르"],
+        "negative": ["오래 걸", "느리", "늦게 나"],
+    },
+    "위치": {
+        "neutral": ["위치", "주차", "역에서"],
+        "positive": ["가까", "찾기 쉽", "주차 편"],
+        "negative": ["찾기 어렵", "주차 불편", "주차가 불편"],
+    },
+    "_general": {
+        "neutral": [],
+        "positive": ["좋아요", "좋았", "최고", "추천", "만족", "재방문", "또 올", "또 갈", "강추"],
+        "negative": ["별로", "실망", "최악", "비추", "다신 안", "다시는 안", "아쉬"],
+    },
+}
+
+POLARITY = {"neutral": 0, "positive": 1, "negative": -1}
+
+
+def load_lexicon(path: str = None) -> Dict[str, Dict[str, list]]:
+    # REVIEW_LEXICON_PATH(JSON, DEFAULT_LEXICON과 같은 구조)가 있으면 교체
+    path = path or os.getenv("REVIEW_LEXICON_PATH")
+    if not path:
+        return DEFAULT_LEXICON
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReviewAnalyzer:
+    """
+    사전의 모든 표현을 하나의 정규식(긴 표현 우선 alternation)으로 컴파일 → 리뷰당 1회 스캔
+    집계는 pandas로 일괄 처리 (리뷰별 측면 중복 제거 후 카운트, 극성 합으로 긍/부정 판정)
+    """
+
+    def __init__(self, lexicon: Dict[str, Dict[str, list]] = None):
+        lexicon = lexicon or DEFAULT_LEXICON
+        self.term_aspect: Dict[str, Any] = {}
+        self.term_polarity: Dict[str, int] = {}
+        for aspect, groups in lexicon.items():
+            for kind, terms in groups.items():
+                for term in terms:
+                    self.term_aspect[term] = None if aspect.startswith("_") else aspect
+                    self.term_polarity[term] = POLARITY[kind]
+        terms = sorted(self.term_aspect, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(t) for t in terms)) if terms else None
+
+    def match(self, reviews: list[str]) -> pd.DataFrame:
+        # 리뷰 번호(review) / 매칭된 표현(term) / 측면(aspect) / 극성(polarity)
+        if not reviews or self.pattern is None:
+            return pd.DataFrame({"review": [], "term": [], "aspect": [], "polarity": []})
+        found = pd.Series(reviews, dtype="object").fillna("").str.findall(self.pattern).explode().dropna()
+        df = pd.DataFrame({"review": found.index.to_numpy(), "term": found.to_numpy()})
+        df["aspect"] = df["term"].map(self.term_aspect)
+        df["polarity"] = df["term"].map(self.term_polarity).astype("int64")
+        return df
+
+    def aggregate(self, df: pd.DataFrame, total: int) -> Dict[str, Any]:
+        # 측면별 언급 리뷰 수 / 긍정·부정·중립 리뷰 수 (raw count — 증분 누적용)
+        aspects = df.dropna(subset=["aspect"]).drop_duplicates(["review", "aspect"])
+        keyword_counts = {k: int(v) for k, v in aspects["aspect"].value_counts().items()}
+        scores = df.groupby("review")["polarity"].sum()
+        positive = int((scores > 0).sum())
+        negative = int((scores < 0).sum())
+        return {
+            "total": int(total),
+            "positive": positive,
+            "negative": negative,
+            "neutral": int(total) - positive - negative,
+            "keyword_counts": keyword_counts,
+        }
+
+    def analyze(self, reviews: list[str], top_n: int = 5) -> Dict[str, Any]:
+        return summarize(self.aggregate(self.match(reviews), len(reviews)), top_n)
+
+
+def summarize(counts: Dict[str, Any], top_n: int = 5) -> Dict[str, Any]:
+    # 집계값 → 리포트 (Top N 키워드, 긍/부정 비율)
+    total = counts["total"]
+    ranked = sorted(counts["keyword_counts"].items(), key=lambda kv: (-kv[1], kv[0]))
+    ratio = lambda n: round(n / total, 3) if total else 0.0
+    return {
+        "review_count": total,
+        "keywords": [k for k, _ in ranked[:top_n]],
+        "keyword_counts": dict(ranked),
+        "sentiment": {
+            "positive": ratio(counts["positive"]),
+            "negative": ratio(counts["negative"]),
+            "neutral": ratio(counts["neutral"]),
+        },
+    }
+
+
+def merge_counts(base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+    # 집계값끼리 더하기 (aggregate 결과는 raw count라 그대로 합산 가능)
+    keyword_counts = dict(base["keyword_counts"])
+    for k, v in extra["keyword_counts"].items():
+        keyword_counts[k] = keyword_counts.get(k, 0) + v
+    merged = {k: base[k] + extra[k] for k in ("total", "positive", "negative", "neutral")}
+    merged["keyword_counts"] = keyword_counts
+    return merged
+
+
+@lru_cache(maxsize=1)
+def get_analyzer() -> ReviewAnalyzer:
+    return ReviewAnalyzer(load_lexicon())
+
+
+def analyze_reviews(reviews: list[str], top_n: int = 5) -> Dict[str, Any]:
+    return get_analyzer().analyze(reviews, top_n)
+
 
 def extract_keywords(reviews: list[str], top_n: int = 5):
-    keywords = []
-    for r in reviews:
-        if "맛" in r: keywords.append("맛")
-        if "친절" in r: keywords.append("친절")
-        if "분위기" in r: keywords.append("분위기")
-        if "청결" in r: keywords.append("청결")
-    counter = Counter(keywords)
-    return [k for k, _ in counter.most_common(top_n)]
+    return analyze_reviews(reviews, top_n)["keywords"]
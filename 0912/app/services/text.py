@@ -0,0 +1,23 @@
+import re
+import math
+from typing import List
+
+# 텍스트 공통 유틸 (토큰 수 추정 / 검색용 토큰화)
+_WORD = re.compile(r"\w+", re.UNICODE)
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def estimate_tokens(text: str) -> int:
+    """ 대략적인 토큰 수: 영문 약 4자/토큰, 한글 등 비ASCII 약 1.5자/토큰 """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def tokenize(text: str) -> List[str]:
+    # 단어 + 한글 단어는 글자 2-gram도 추가 ("맛있어요" / "맛있고" 가 서로 걸리도록)
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        tokens.append(word)
+        if _HANGUL.search(word) and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
@@ -0,0 +1,213 @@
+"""
+OpenAI 호환 로컬 스텁 서버 (부하 테스트/오프라인 테스트용)
+
+- POST /v1/chat/completions: 일반 응답 / stream=true면 SSE 청크, response_format=json_object면 채널별 JSON
+- 지연: STUB_LATENCY_MS(중앙값) + STUB_LATENCY_DIST(fixed|uniform|lognormal), lognormal 퍼짐은 STUB_LATENCY_SIGMA
+- 오류 주입: STUB_ERROR_RATE(500), STUB_RATE_LIMIT_RATE(429 + retry-after-ms)
+- 스트리밍: 응답을 STUB_STREAM_CHUNKS개로 나눠 STUB_CHUNK_DELAY_MS 간격으로 전송
+- 실행:  python -m app.stub_openai --port 8001
+         OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app.main:app
+- 실행 중 설정 변경/통계: POST /stub/config, GET /stub/stats
+"""
+import os
+import re
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from typing import Dict, Optional
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from app.services.text import estimate_tokens
+
+FILLER = "매일 아침 정성껏 준비한 메뉴로 여러분을 기다립니다. "
+
+
+class StubConfig(BaseModel):
+    latency_ms: float = float(os.getenv("STUB_LATENCY_MS", "200"))
+    latency_dist: str = os.getenv("STUB_LATENCY_DIST", "lognormal")
+    latency_sigma: float = float(os.getenv("STUB_LATENCY_SIGMA", "0.5"))
+    error_rate: float = float(os.getenv("STUB_ERROR_RATE", "0"))
+    rate_limit_rate: float = float(os.getenv("STUB_RATE_LIMIT_RATE", "0"))
+    retry_after_ms: int = int(os.getenv("STUB_RETRY_AFTER_MS", "50"))
+    completion_chars: int = int(os.getenv("STUB_COMPLETION_CHARS", "300"))
+    stream_chunks: int = int(os.getenv("STUB_STREAM_CHUNKS", "20"))
+    chunk_delay_ms: float = float(os.getenv("STUB_CHUNK_DELAY_MS", "10"))
+    seed: Optional[int] = None
+
+
+class StubState:
+    def __init__(self, config: StubConfig):
+        self.configure(config)
+
+    def configure(self, config: StubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.stats = {"requests": 0, "streamed": 0, "errors_500": 0, "errors_429": 0,
+                      "in_flight": 0, "peak_in_flight": 0}
+
+    def latency(self) -> float:
+        """ 첫 응답까지 지연(초): 중앙값 latency_ms 기준 분포 """
+        base = self.config.latency_ms / 1000
+        if self.config.latency_dist == "uniform":
+            return self.rng.uniform(0, 2 * base)
+        if self.config.latency_dist == "lognormal":
+            return base * math.exp(self.rng.gauss(0, self.config.latency_sigma))
+        return base
+
+
+def completion_text(messages: list, json_mode: bool, chars: int) -> str:
+    """ 프롬프트 해시로 정해지는 문안 (같은 입력 → 같은 출력) """
+    prompt = messages[-1]["content"] if messages else ""
+    tag = uuid.uuid5(uuid.NAMESPACE_OID, prompt).hex[:8]
+    body = f"[스텁 {tag}] " + (FILLER * (chars // len(FILLER) + 1))[:chars]
+    if not json_mode:
+        return body
+    m = re.search(r"^\[채널\]\s*(.+)$", prompt, re.M)
+    channels = [c.strip() for c in m.group(1).split(",")] if m else []
+    if not channels:
+        return json.dumps({"text": body}, ensure_ascii=False)
+    return json.dumps({"posts": {ch: f"{body} #{ch}" for ch in channels}}, ensure_ascii=False)
+
+
+def _error(status: int, message: str, kind: str, headers: Dict[str, str] = None) -> JSONResponse:
+    return JSONResponse({"error": {"message": message, "type": kind, "code": kind}},
+                        status_code=status, headers=headers)
+
+
+def create_app(config: StubConfig = None) -> FastAPI:
+    stub = StubState(config or StubConfig())
+    app = FastAPI(title="OpenAI stub")
+    app.state.stub = stub
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        cfg, stats = stub.config, stub.stats
+        stats["requests"] += 1
+        if stub.rng.random() < cfg.rate_limit_rate:
+            stats["errors_429"] += 1
+            return _error(429, "Rate limit reached (stub)", "rate_limit_exceeded",
+                          {"retry-after-ms": str(cfg.retry_after_ms)})
+
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(stub.latency())
+            if stub.rng.random() < cfg.error_rate:
+                stats["errors_500"] += 1
+                return _error(500, "Internal error (stub)", "server_error")
+        finally:
+            stats["in_flight"] -= 1
+
+        messages = body.get("messages") or []
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        text = completion_text(messages, json_mode, cfg.completion_chars)
+        model = body.get("model", "stub")
+        completion_id = "chatcmpl-" + uuid.uuid4().hex
+        created = int(time.time())
+        usage = {"prompt_tokens": sum(estimate_tokens(m.get("content") or "") for m in messages),
+                 "completion_tokens": estimate_tokens(text)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        stats["streamed"] += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+        size = max(1, math.ceil(len(text) / max(1, cfg.stream_chunks)))
+
+        def chunk(choices, **extra) -> str:
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": model, "choices": choices, **extra}
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            for i in range(0, len(text), size):
+                if i and cfg.chunk_delay_ms:
+                    await asyncio.sleep(cfg.chunk_delay_ms / 1000)
+                delta = {"content": text[i:i + size]}
+                if i == 0:
+                    delta["role"] = "assistant"
+                yield chunk([{"index": 0, "delta": delta, "finish_reason": None}])
+            yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield chunk([], usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stub/stats")
+    async def stub_stats():
+        return stub.stats
+
+    @app.post("/stub/config")
+    async def stub_configure(config: StubConfig):
+        """ 설정 교체 + 통계 초기화 """
+        stub.configure(config)
+        return stub.config
+
+    return app
+
+
+class _StubClient:
+    """ with(동기 테스트) / async with(이벤트 루프 안, bench) 둘 다 지원 """
+
+    def __init__(self, stub_app: FastAPI):
+        self.stub_app = stub_app
+
+    def _swap(self):
+        from app.services import llm
+        self.previous = llm.aclient
+        self.http = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.stub_app), base_url="http://stub")
+        llm.configure_client(base_url="http://stub/v1", api_key="sk-stub", http_client=self.http)
+        return self.stub_app.state.stub
+
+    def _restore(self):
+        from app.services import llm
+        llm.aclient = self.previous
+
+    def __enter__(self):
+        return self._swap()
+
+    def __exit__(self, *exc):
+        self._restore()
+        asyncio.run(self.http.aclose())
+
+    async def __aenter__(self):
+        return self._swap()
+
+    async def __aexit__(self, *exc):
+        self._restore()
+        await self.http.aclose()
+
+
+def use_stub(stub_app: FastAPI) -> _StubClient:
+    """ app.services.llm 클라이언트를 이 스텁 앱(ASGI, 네트워크 없이)으로 잠시 교체, 끝나면 http 클라이언트 닫음 """
+    return _StubClient(stub_app)
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description="OpenAI 호환 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
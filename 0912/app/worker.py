@@ -0,0 +1,87 @@
+"""
+캠페인 생성 작업 워커
+
+- API 프로세스 안에서: JOB_WORKERS(기본 2)개 워커가 lifespan 동안 실행 (0이면 API는 제출만)
+- 별도 프로세스로:   python -m app.worker --concurrency 8
+  (워커 수를 웹 워커 수와 따로 늘릴 수 있음, 같은 JOB_DB_PATH를 공유)
+"""
+import os
+import asyncio
+import argparse
+from typing import Dict, Any, Optional
+from starlette.concurrency import run_in_threadpool
+from app.db import SessionLocal
+from app.services.jobs import WorkerPool, get_job_queue
+from app.services.llm import generate_campaign
+from app.services.campaigns import save_campaign
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+
+def _save(req, posts) -> int:
+    with SessionLocal() as db:
+        return save_campaign(db, req, posts)
+
+
+async def run_campaign_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from app.routers.generate import GenerateRequest
+    req = GenerateRequest(**payload)
+    plan = await generate_campaign(req)
+    plan["business_id"] = await run_in_threadpool(_save, req, plan["posts"])
+    return plan
+
+
+HANDLERS = {"campaign": run_campaign_job}
+
+_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    return _pool
+
+
+async def start_workers(concurrency: int = JOB_WORKERS) -> Optional[WorkerPool]:
+    global _pool
+    if concurrency <= 0:
+        return None
+    _pool = WorkerPool(get_job_queue(), HANDLERS, concurrency)
+    await _pool.start()
+    return _pool
+
+
+async def stop_workers():
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+async def _serve(concurrency: int):
+    await start_workers(concurrency)
+    print(f"워커 {concurrency}개 실행 중 (Ctrl+C로 종료)")
+    try:
+        while True:
+            await asyncio.sleep(30)
+            print(get_job_queue().stats())
+    finally:
+        await stop_workers()
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+    # API(app.main)와 따로 실행될 때도 새 DB에 테이블이 있도록
+    from app.db import Base, engine
+    from app.models import entities  # noqa: F401  (테이블 등록)
+    Base.metadata.create_all(bind=engine)
+    parser = argparse.ArgumentParser(description="캠페인 생성 작업 워커")
+    parser.add_argument("--concurrency", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
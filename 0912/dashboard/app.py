@@ -1,6 +1,23 @@
 import streamlit as st
 import requests, os, json
 
+API_URL = os.getenv("API_URL","http://localhost:8000")
+
+def iter_sse(resp):
+    # text/event-stream → (event, data) 순서대로
+    event, data = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
 st.title("소상공인 마케팅 에이전트")
 with st.form("gen"):
     name = st.text_input("상호명")
@@ -8,7 +25,9 @@ with st.form("gen"):
     address = st.text_input("주소")
     strengths = st.text_area("강점(콤마 구분)", "원두 직배전, 조용한 분위기, 친절")
     reviews = st.text_area("후기 몇 개 붙여넣기", "맛있어요!\n사장님이 친절해요.")
+    review_file = st.file_uploader("후기 파일 (CSV/JSONL, 대량) — 한 번 올리면 이후 캠페인에서 계속 사용", type=["csv", "jsonl"])
     channels = st.multiselect("채널", ["instagram","naver_blog","naver_place"], default=["instagram","naver_blog"])
+    streaming = st.toggle("실시간으로 보기 (스트리밍)", value=True)
     submitted = st.form_submit_button("생성")
 
 if submitted:
@@ -19,6 +38,45 @@ if submitted:
         "channels": channels,
         "reviews": [r for r in reviews.split("\n") if r.strip()]
     }
-    r = requests.post(os.getenv("API_URL","http://localhost:8000") + "/generate/campaign", json=payload)
+    if review_file is not None:
+        # 업장 등록(또는 갱신) 후 파일을 그대로 전송 → 서버에서 중복 제거/집계
+        biz = requests.post(API_URL + "/businesses", json={k: payload[k] for k in ("name", "category", "address", "strengths", "tone")})
+        biz.raise_for_status()
+        fmt = review_file.name.rsplit(".", 1)[-1].lower()
+        r = requests.post(API_URL + f"/businesses/{biz.json()['id']}/reviews", params={"format": fmt}, data=review_file)
+        r.raise_for_status()
+        st.caption(f"후기 업로드: 새로 저장 {r.json()['inserted']}건 / 중복 {r.json()['duplicates']}건")
     st.subheader("결과")
-    st.json(r.json())
+    if not streaming:
+        r = requests.post(API_URL + "/generate/campaign", json=payload)
+        st.json(r.json())
+    else:
+        # 만들어지는 대로 표시: 하이라이트 → 채널별 문안(토큰 단위) → 캘린더
+        highlights_box = st.empty()
+        highlights_box.caption("⏳ 리뷰 분석 중...")
+        post_boxes = {}
+        for ch in channels:
+            st.markdown(f"**📣 {ch}**")
+            post_boxes[ch] = st.empty()
+            post_boxes[ch].caption("⏳ 작성 중...")
+        st.markdown("**📅 콘텐츠 캘린더**")
+        calendar_box = st.empty()
+        calendar_box.caption("⏳ 작성 중...")
+
+        drafts = {ch: "" for ch in channels}
+        with requests.post(API_URL + "/generate/campaign/stream", params={"tokens": "true"},
+                           json=payload, stream=True, timeout=(5, 300)) as r:
+            r.raise_for_status()
+            for event, data in iter_sse(r):
+                if event == "highlights":
+                    highlights_box.json(data)
+                elif event == "post_delta":
+                    drafts[data["channel"]] += data["delta"]
+                    post_boxes[data["channel"]].markdown(drafts[data["channel"]] + "▌")
+                elif event == "post":
+                    post_boxes[data["channel"]].markdown(data["body"])
+                elif event == "calendar":
+                    calendar_box.markdown(data["calendar"])
+                elif event == "error":
+                    target = post_boxes.get(data["stage"], calendar_box)
+                    target.error(f"생성 실패: {data['message']}")
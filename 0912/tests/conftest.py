@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+# OpenAI 클라이언트는 import 시점에 키가 필요 → 테스트용 더미 키
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+# 리뷰 인덱스는 테스트마다 임시 폴더에
+os.environ.setdefault("REVIEW_INDEX_DIR", tempfile.mkdtemp(prefix="review_index_"))
+
+# 테스트용 SQLite DB (작업 폴더의 marketing.db를 건드리지 않도록)
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="marketing_db_"), "test.db"))
+
+# LLM 응답 캐시도 임시 파일로
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="llm_cache_"), "llm_cache.db"))
+
+# 작업 큐도 임시 파일로
+os.environ.setdefault("JOB_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="jobs_"), "jobs.db"))
+
+import pytest
+
+
+@pytest.fixture
+def stub_llm():
+    """ LLM 호출을 로컬 스텁 서버(ASGI)로 → 네트워크 없이 전체 경로 실행 """
+    from app.stub_openai import StubConfig, create_app, use_stub
+    with use_stub(create_app(StubConfig(latency_ms=0, chunk_delay_ms=0, seed=0))) as stub:
+        yield stub
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    """ 앱 시작(app.main) 때처럼 테이블 생성 → app.main을 import하지 않는 테스트도 같은 스키마로 """
+    from app.db import Base, engine
+    from app.models import entities  # noqa: F401  (테이블 등록)
+    Base.metadata.create_all(bind=engine)
@@ -0,0 +1,83 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db import SessionLocal, engine
+from app.main import app
+from app.routers.generate import GenerateRequest
+from app.services.campaigns import save_campaign
+
+client = TestClient(app)
+
+
+def make_req(name, **kw):
+    data = {"name": name, "category": "카페", "address": "서울시 마포구", "strengths": ["조용함"]}
+    data.update(kw)
+    return GenerateRequest(**data)
+
+
+def count_selects(fn):
+    statements = []
+
+    def before(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+    return result, len(statements)
+
+
+def test_campaign_posts_are_saved_and_paginated():
+    req = make_req("페이지 카페")
+    with SessionLocal() as db:
+        for i in range(3):
+            business_id = save_campaign(db, req, [{"channel": "instagram", "body": f"인스타 {i}"},
+                                                  {"channel": "naver_blog", "body": f"블로그 {i}"}])
+        # 같은 (상호명, 주소)는 같은 업장으로 저장
+        assert save_campaign(db, req, []) == business_id
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/businesses/{business_id}/posts", params=params).json()
+        seen += [p["body"] for p in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 6 and len(set(seen)) == 6
+    assert seen[:2] == ["블로그 2", "인스타 2"]
+
+    page = client.get(f"/businesses/{business_id}/posts", params={"channel": "instagram"}).json()
+    assert [p["body"] for p in page["items"]] == ["인스타 2", "인스타 1", "인스타 0"]
+    assert client.get(f"/businesses/{business_id}/posts", params={"cursor": "bad"}).status_code == 400
+
+
+def test_list_businesses_eager_loads_posts_without_n_plus_one():
+    with SessionLocal() as db:
+        for i in range(5):
+            save_campaign(db, make_req(f"목록 카페 {i}"), [{"channel": "instagram", "body": "본문"}])
+
+    res, selects = count_selects(lambda: client.get("/businesses", params={"limit": 100, "include_posts": "true"}))
+    assert res.status_code == 200
+    data = res.json()
+    assert data["total"] >= 5
+    assert all("posts" in b for b in data["items"])
+    # count + 업장 목록 + 게시물 IN 쿼리 (업장 수와 무관)
+    assert selects <= 3
+
+    summary = client.get("/businesses", params={"limit": 2, "offset": 1}).json()
+    assert len(summary["items"]) == 2 and "posts" not in summary["items"][0]
+
+
+def test_partial_coordinates_are_rejected_and_location_kept():
+    res = client.post("/businesses", json={"name": "위치 카페", "category": "카페", "address": "서울시 중구",
+                                           "lat": 37.56, "lon": 126.98})
+    business_id = res.json()["id"]
+    res = client.post("/businesses", json={"name": "위치 카페", "category": "카페", "address": "서울시 중구",
+                                           "lat": 37.57})
+    assert res.status_code == 422
+    res = client.post("/businesses", json={"name": "위치 카페", "category": "카페", "address": "서울시 중구"})
+    assert (res.json()["id"], res.json()["lat"], res.json()["lon"]) == (business_id, 37.56, 126.98)
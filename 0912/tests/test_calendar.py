@@ -0,0 +1,93 @@
+import asyncio
+import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.main import app
+from app.models.entities import SlotStats
+from app.routers.generate import GenerateRequest
+from app.services import llm
+
+client = TestClient(app)
+
+
+def create_business(name, category="카페"):
+    res = client.post("/businesses", json={"name": name, "category": category, "address": "서울시 종로구"})
+    return res.json()["id"]
+
+
+def test_cold_start_uses_category_defaults():
+    business_id = create_business("새 카페", category="디저트 카페")
+    plan = client.get(f"/businesses/{business_id}/slots", params={"channels": ["instagram", "naver_blog"]}).json()
+    assert plan["business_posts"] == 0
+    assert [(s["day"], s["hour"]) for s in plan["slots"]] == [("화", 11), ("목", 15), ("토", 10), ("일", 13)]
+    assert {s["channel"] for s in plan["slots"]} == {"instagram", "naver_blog"}   # 채널 고르게
+
+
+def test_engagement_log_moves_slots_for_business_and_category():
+    business_id = create_business("성과 카페", category="북카페")
+    wednesday_night = datetime.datetime(2024, 5, 1, 20, 5)   # 수요일 20시
+    events = [{"channel": "naver_blog", "posted_at": wednesday_night.isoformat(), "reach": 900, "saves": 40}] * 5
+    events += [{"channel": "naver_blog", "weekday": 0, "hour": 9, "reach": 10, "saves": 0}] * 5
+    res = client.post(f"/businesses/{business_id}/engagements", json=events)
+    assert res.json() == {"recorded": 10}
+
+    slots = client.get(f"/businesses/{business_id}/slots", params={"channels": ["naver_blog"]}).json()
+    assert slots["business_posts"] == 10 and slots["category_posts"] == 10
+    best = max(slots["slots"], key=lambda s: s["score"])
+    assert (best["day"], best["hour"]) == ("수", 20)
+
+    # 같은 업종의 기록 없는 업장도 업종 집계를 따라감
+    other_id = create_business("옆집 북카페", category="북카페")
+    other = client.get(f"/businesses/{other_id}/slots", params={"channels": ["naver_blog"]}).json()
+    assert other["business_posts"] == 0 and ("수", 20) in [(s["day"], s["hour"]) for s in other["slots"]]
+
+    # 증분 집계: 다시 기록하면 합계만 늘어남
+    client.post(f"/businesses/{business_id}/engagements", json=events[:1])
+    again = client.get(f"/businesses/{business_id}/slots", params={"channels": ["naver_blog"]}).json()
+    assert again["business_posts"] == 11
+
+
+def test_utc_posted_at_is_bucketed_in_service_timezone():
+    business_id = create_business("시간대 카페", category="브런치 카페")
+    # 2024-05-01 11:00Z = 한국 시간 수요일 20시
+    events = [{"channel": "instagram", "posted_at": "2024-05-01T11:00:00Z", "reach": 500, "saves": 20}] * 5
+    client.post(f"/businesses/{business_id}/engagements", json=events)
+
+    with SessionLocal() as db:
+        cells = db.execute(select(SlotStats.weekday, SlotStats.hour, SlotStats.posts)
+                           .where(SlotStats.scope == "business", SlotStats.scope_key == str(business_id))).all()
+    assert cells == [(2, 20, 5)]
+
+
+def test_engagement_requires_slot():
+    business_id = create_business("검증 카페")
+    res = client.post(f"/businesses/{business_id}/engagements", json=[{"channel": "instagram", "reach": 1}])
+    assert res.status_code == 422
+
+
+def test_calendar_needs_no_llm_call_unless_topics_enabled(monkeypatch):
+    calls = []
+
+    async def fake_complete(prompt):
+        calls.append(prompt)
+        return "본문"
+
+    async def fake_complete_json(prompt):
+        calls.append(prompt)
+        return '{"topics": ["봄 신메뉴 딸기라떼 첫선", "단골 후기 모음", "새벽 로스팅 현장", "주말 2+1"]}'
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    monkeypatch.setattr(llm, "allm_complete_json", fake_complete_json)
+    req = GenerateRequest(name="캘린더 카페", category="카페", address="서울시 종로구",
+                          channels=["instagram"], reviews=["커피가 맛있어요"])
+    plan = asyncio.run(llm.generate_campaign(req))
+    assert len(calls) == 1   # 문안 1회, 캘린더는 호출 없음
+    assert plan["calendar"].count("\n| ") == 4   # 슬롯 4개
+
+    calls.clear()
+    plan = asyncio.run(llm.generate_campaign(req.model_copy(update={"calendar_topics": True})))
+    assert len(calls) == 2
+    assert "봄 신메뉴 딸기라떼 첫선" in plan["calendar"] and "주말 2+1" in plan["calendar"]
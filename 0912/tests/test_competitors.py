@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.db import SessionLocal
+from app.main import app
+from app.models.entities import Business
+from app.services.competitors import get_competitor_index
+from app.services.geo import GridIndex, geohash_encode, haversine_m
+
+client = TestClient(app)
+
+
+def test_geohash_and_distance():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    # 서울시청 → 강남역 약 8.9km
+    d = haversine_m(37.5663, 126.9779, np.array([37.4979]), np.array([127.0276]))[0]
+    assert 8_500 < d < 9_300
+
+
+def test_grid_index_matches_brute_force():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    lats = 37.45 + rng.random(n) * 0.2
+    lons = 126.85 + rng.random(n) * 0.3
+    grid = GridIndex(range(n), lats, lons)
+
+    for lat, lon in [(37.55, 127.0), (37.46, 126.86), (37.64, 127.14)]:
+        dist = haversine_m(lat, lon, lats, lons)
+        expected = set(np.nonzero(dist <= 1000)[0].tolist())
+        assert {i for i, _ in grid.within(lat, lon, 1000)} == expected
+        assert [i for i, _ in grid.nearest(lat, lon, 5)] == np.argsort(dist)[:5].tolist()
+
+    started = time.perf_counter()
+    for _ in range(100):
+        grid.within(37.55, 127.0, 1000)
+    assert (time.perf_counter() - started) / 100 < 0.01
+
+
+def test_competitor_api_and_report():
+    with SessionLocal() as db:
+        ours = Business(name="카페 하루", category="카페", address="서울시 노원구",
+                        strengths=["원두 직배전", "조용한 분위기"], lat=37.6543, lon=127.0568)
+        near = Business(name="카페 이웃", category="카페", address="서울시 노원구",
+                        strengths=["조용한 분위기", "빠른 서비스"], lat=37.6580, lon=127.0590)
+        other = Business(name="분식 이웃", category="분식", address="서울시 노원구",
+                         strengths=["저렴한 가격"], lat=37.6550, lon=127.0570)
+        far = Business(name="카페 강남", category="카페", address="서울시 강남구",
+                       strengths=["넓은 좌석"], lat=37.4979, lon=127.0276)
+        db.add_all([ours, near, other, far])
+        db.commit()
+        ours_id, near_id, other_id = ours.id, near.id, other.id
+        assert ours.geohash.startswith("wydq")
+    get_competitor_index().invalidate()
+
+    res = client.get(f"/competitors/{ours_id}")
+    assert res.status_code == 200
+    assert [c["id"] for c in res.json()["competitors"]] == [near_id]
+
+    res = client.get(f"/competitors/{ours_id}", params={"same_category": "false"})
+    assert [c["id"] for c in res.json()["competitors"]] == [other_id, near_id]
+
+    report = client.get(f"/competitors/{ours_id}/report").json()
+    assert report["common_strengths"] == ["조용한 분위기"]
+    assert report["our_differentiators"] == ["원두 직배전"]
+    assert report["competitor_only"] == ["빠른 서비스"]
+
+    res = client.get("/competitors/nearby", params={"lat": 37.50, "lon": 127.03, "k": 1})
+    assert res.json()["businesses"][0]["name"] == "카페 강남"
+
+    assert client.get("/competitors/999999").status_code == 404
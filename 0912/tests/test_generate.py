@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -8,7 +9,7 @@ def test_health_check():
     assert res.status_code == 200
     assert res.json()["status"] == "ok"
 
-def test_generate_campaign():
+def test_generate_campaign(stub_llm):
     payload = {
         "name": "카페 하루",
         "category": "카페",
@@ -22,3 +23,43 @@ def test_generate_campaign():
     assert res.status_code == 200
     data = res.json()
     assert "posts" in data
+    assert stub_llm.stats["requests"] >= 1
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_generate_campaign_stream(monkeypatch):
+    from app.services import llm
+
+    async def fake_complete(prompt):
+        return "본문"
+
+    async def fake_stream(prompt):
+        for piece in ["안녕", "하세요"]:
+            yield piece
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    monkeypatch.setattr(llm, "astream_complete", fake_stream)
+    payload = {
+        "name": "카페 하루",
+        "category": "카페",
+        "address": "서울시 노원구",
+        "channels": ["instagram", "naver_blog"],
+        "reviews": ["커피가 맛있어요"]
+    }
+    res = client.post("/generate/campaign/stream?tokens=true", json=payload)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(res.text)
+    names = [e for e, _ in events]
+    assert names[0] == "highlights" and names[-1] == "done"
+    posts = {d["channel"]: d["body"] for e, d in events if e == "post"}
+    assert posts == {"instagram": "안녕하세요", "naver_blog": "안녕하세요"}
+    assert names.count("post_delta") == 4
+    calendars = [d["calendar"] for e, d in events if e == "calendar"]
+    assert len(calendars) == 1 and calendars[0].startswith("| 요일 |")
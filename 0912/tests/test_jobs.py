@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import llm
+from app.services.jobs import JobQueue, WorkerPool
+
+
+def test_claim_round_robins_between_tenants(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), tenant_max_running=10)
+    for i in range(4):
+        queue.submit("noop", {"i": i}, tenant="big")
+    for i in range(2):
+        queue.submit("noop", {"i": i}, tenant="small")
+
+    order = [queue.claim()["tenant"] for _ in range(6)]
+    assert order[:4] == ["big", "small", "big", "small"]
+    assert queue.claim() is None
+
+
+def test_tenant_running_cap(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), tenant_max_running=1)
+    queue.submit("noop", {}, tenant="a")
+    queue.submit("noop", {}, tenant="a")
+    first = queue.claim()
+    assert queue.claim() is None
+    queue.complete(first["id"], first["lease_owner"], {"ok": True})
+    assert queue.claim() is not None
+
+
+def test_retry_with_backoff_then_failed(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.submit("noop", {}, max_attempts=2)
+
+    job = queue.claim()
+    assert queue.fail(job["id"], job["lease_owner"], "boom") == "queued"
+    assert queue.claim() is None                      # 백오프 동안은 가져가지 않음
+    queue._conn.execute("UPDATE jobs SET available_at = 0 WHERE id = ?", (job_id,))
+    job = queue.claim()
+    assert queue.fail(job["id"], job["lease_owner"], "boom again") == "failed"
+
+    job = queue.get(job_id)
+    assert job["attempts"] == 2 and job["error"] == "boom again"
+    assert queue.stats()["failed"] == 1
+
+
+def test_stale_lease_owner_cannot_finish_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0)
+    job_id = queue.submit("noop", {})
+    stale = queue.claim()
+    time.sleep(0.01)
+    assert queue.recover() == 1                       # lease 만료 → 백오프 후 다른 워커가 가져감
+    queue._conn.execute("UPDATE jobs SET available_at = 0 WHERE id = ?", (job_id,))
+    current = queue.claim()
+
+    assert not queue.complete(job_id, stale["lease_owner"], {"from": "stale"})
+    assert queue.fail(job_id, stale["lease_owner"], "late") is None
+    assert queue.get(job_id)["status"] == "running"
+    assert queue.complete(job_id, current["lease_owner"], {"from": "current"})
+    assert queue.get(job_id)["result"] == {"from": "current"}
+    assert queue.fail("없는작업", "x", "boom") is None
+
+
+def test_expired_lease_counts_as_attempt_until_failed(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0)
+    job_id = queue.submit("poison", {}, max_attempts=3)
+    for attempt in range(1, 4):
+        queue._conn.execute("UPDATE jobs SET available_at = 0 WHERE id = ?", (job_id,))
+        assert queue.claim()["attempts"] == attempt   # 워커가 처리 중에 죽음 → lease 만료
+        time.sleep(0.01)
+        assert queue.recover() == 1
+        job = queue.get(job_id)
+        if attempt < 3:
+            assert job["status"] == "queued" and job["available_at"] > time.time()   # 백오프
+    assert job["status"] == "failed" and job["finished_at"] is not None
+    queue._conn.execute("UPDATE jobs SET available_at = 0 WHERE id = ?", (job_id,))
+    assert queue.claim() is None
+
+
+def test_worker_renews_lease_while_handler_runs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0.15)
+    job_id = queue.submit("slow", {})
+
+    async def handler(payload):
+        await asyncio.sleep(0.4)
+        assert queue.recover() == 0                   # lease가 연장되어 회수되지 않음
+        return {"ok": True}
+
+    asyncio.run(WorkerPool(queue, {"slow": handler}).run_once())
+    assert queue.get(job_id)["status"] == "done"
+
+
+def test_worker_pool_processes_jobs_concurrently(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), tenant_max_running=10)
+    ids = [queue.submit("sleep", {"i": i}) for i in range(6)]
+
+    async def handler(payload):
+        await asyncio.sleep(0.1)
+        return {"double": payload["i"] * 2}
+
+    async def run():
+        pool = WorkerPool(queue, {"sleep": handler}, concurrency=3, poll_seconds=0.05)
+        await pool.start()
+        started = time.perf_counter()
+        while queue.stats()["done"] < 6 and time.perf_counter() - started < 5:
+            await asyncio.sleep(0.02)
+        await pool.stop()
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert [queue.get(i)["result"]["double"] for i in ids] == [0, 2, 4, 6, 8, 10]
+    assert elapsed < 0.5   # 순차면 0.6초 이상
+
+
+def test_job_api_end_to_end(monkeypatch):
+    async def fake_complete(prompt):
+        return "본문"
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    payload = {"name": "작업 카페", "category": "카페", "address": "서울시 중구", "channels": ["instagram"]}
+
+    with TestClient(app) as client:
+        res = client.post("/jobs/campaign", json=payload, headers={"X-Tenant-Id": "shop-1"})
+        assert res.status_code == 202
+        job_id = res.json()["job_id"]
+
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            job = client.get(f"/jobs/{job_id}").json()
+            if job["status"] == "done":
+                break
+            time.sleep(0.05)
+        assert job["status"] == "done" and job["tenant"] == "shop-1"
+        assert job["result"]["posts"] == [{"channel": "instagram", "body": "본문"}]
+
+        events = client.get(f"/jobs/{job_id}/events").text
+        assert "event: result" in events
+
+        stats = client.get("/jobs/stats").json()
+        assert stats["done"] >= 1
+        assert client.get("/jobs/unknown").status_code == 404
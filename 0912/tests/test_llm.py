@@ -0,0 +1,117 @@
+import asyncio
+
+from app.routers.generate import GenerateRequest
+from app.services import llm
+
+
+def make_req(**kw):
+    data = {
+        "name": "카페 하루",
+        "category": "카페",
+        "address": "서울시 노원구",
+        "strengths": ["원두 직배전"],
+        "channels": ["instagram", "naver_blog", "naver_place"],
+        "reviews": ["커피가 맛있어요", "사장님이 친절해요"],
+    }
+    data.update(kw)
+    return GenerateRequest(**data)
+
+
+def test_generate_campaign_runs_channels_concurrently(monkeypatch):
+    events = []
+
+    async def fake_complete(prompt):
+        channel = prompt.split("용 마케팅")[0][-20:]
+        events.append(("start", channel))
+        await asyncio.sleep(0.05)
+        events.append(("end", channel))
+        return channel
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    req = make_req(multi_channel=False)
+    plan = asyncio.run(llm.generate_campaign(req))
+
+    # 세 채널 호출이 모두 시작된 뒤에야 첫 호출이 끝남 (순차라면 start/end가 번갈아 나옴)
+    assert [kind for kind, _ in events] == ["start"] * 3 + ["end"] * 3
+    assert [p["channel"] for p in plan["posts"]] == req.channels
+    assert all(p["body"].endswith(p["channel"]) for p in plan["posts"])
+    # 캘린더는 LLM 없이 슬롯 데이터로 렌더링
+    assert plan["calendar"].startswith("| 요일 |")
+
+
+def test_generate_campaign_respects_concurrency_cap(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_complete(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return "ok"
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    asyncio.run(llm.generate_campaign(make_req(multi_channel=False), concurrency=2))
+    assert peak == 2
+
+
+def test_post_prompt_quotes_top_k_reviews(monkeypatch):
+    prompts = []
+
+    async def fake_complete(prompt):
+        prompts.append(prompt)
+        return "ok"
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    monkeypatch.setattr(llm, "REVIEW_QUOTES_K", 2)
+    reviews = [f"{i}번째 방문, 커피가 맛있어요" for i in range(50)] + ["주차가 편하고 역에서 가까워요"]
+    asyncio.run(llm.generate_campaign(make_req(name="후기 많은 카페", channels=["naver_place"], reviews=reviews)))
+
+    post_prompt = next(p for p in prompts if "naver_place용" in p)
+    assert '"주차가 편하고 역에서 가까워요"' in post_prompt
+    assert post_prompt.count("커피가 맛있어요") <= 1
+
+
+def test_multi_channel_single_call_with_per_channel_fallback(monkeypatch):
+    single_prompts, multi_prompts = [], []
+
+    async def fake_json(prompt):
+        multi_prompts.append(prompt)
+        return '```json\n{"posts": {"instagram": "인스타 문안", "naver_blog": "블로그 문안", "naver_place": ""}}\n```'
+
+    async def fake_complete(prompt):
+        single_prompts.append(prompt)
+        return "개별 문안"
+
+    monkeypatch.setattr(llm, "allm_complete_json", fake_json)
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    plan = asyncio.run(llm.generate_campaign(make_req(multi_channel=True)))
+
+    assert len(multi_prompts) == 1
+    assert all(ch in multi_prompts[0] for ch in ["instagram", "naver_blog", "naver_place"])
+    # 빈 문안(naver_place)만 개별 호출 (캘린더는 LLM 호출 없음)
+    assert len(single_prompts) == 1 and "naver_place용" in single_prompts[0]
+    assert {p["channel"]: p["body"] for p in plan["posts"]} == {
+        "instagram": "인스타 문안", "naver_blog": "블로그 문안", "naver_place": "개별 문안"}
+    assert [p["channel"] for p in plan["posts"]] == ["instagram", "naver_blog", "naver_place"]
+
+
+def test_multi_channel_invalid_json_falls_back_to_all_channels(monkeypatch):
+    async def fake_json(prompt):
+        return "죄송하지만 JSON으로는 어렵습니다"
+
+    async def fake_complete(prompt):
+        return "개별"
+
+    monkeypatch.setattr(llm, "allm_complete_json", fake_json)
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+
+    async def collect():
+        return [e async for e in llm.iter_campaign_events(make_req(multi_channel=True))]
+
+    events = asyncio.run(collect())
+    posts = {d["channel"]: d["body"] for e, d in events if e == "post"}
+    assert posts == {"instagram": "개별", "naver_blog": "개별", "naver_place": "개별"}
+    assert events[-1][0] == "done"
+    assert llm.parse_multi_posts('{"posts": {"a": 1, "b": "ok"}}', ["a", "b", "c"]) == {"b": "ok"}
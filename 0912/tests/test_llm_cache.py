@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import llm
+from app.services.llm_cache import LLMCache, llm_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm, "get_llm_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    async def fake_create(messages):
+        calls.append(messages[-1]["content"])
+        await asyncio.sleep(0.05)
+        return f"응답 {len(calls)}"
+
+    monkeypatch.setattr(llm, "_acreate", fake_create)
+    return calls
+
+
+def test_identical_concurrent_requests_share_one_call(cache, upstream):
+    async def run():
+        return await asyncio.gather(*(llm.allm_complete("같은 프롬프트") for _ in range(5)))
+
+    assert asyncio.run(run()) == ["응답 1"] * 5
+    assert len(upstream) == 1
+    assert cache.coalesced == 4
+
+    started = time.perf_counter()
+    assert asyncio.run(llm.allm_complete("같은 프롬프트")) == "응답 1"
+    assert time.perf_counter() - started < 0.05
+    assert len(upstream) == 1
+
+
+def test_cancelled_first_caller_does_not_cancel_waiters(cache, upstream):
+    async def run():
+        first = asyncio.create_task(llm.allm_complete("같은 프롬프트"))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(llm.allm_complete("같은 프롬프트")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return results
+
+    assert asyncio.run(run()) == ["응답 1"] * 2
+    assert len(upstream) == 1
+    assert asyncio.run(llm.allm_complete("같은 프롬프트")) == "응답 1"   # 결과도 캐시됨
+
+
+def test_json_mode_and_text_calls_do_not_share_cache(cache, monkeypatch):
+    async def fake_create(messages, **extra):
+        return "{}" if extra.get("response_format") else "텍스트"
+
+    monkeypatch.setattr(llm, "_acreate", fake_create)
+
+    async def run():
+        return await asyncio.gather(llm.allm_complete("같은 프롬프트"), llm.allm_complete_json("같은 프롬프트"))
+
+    assert asyncio.run(run()) == ["텍스트", "{}"]
+    assert asyncio.run(llm.allm_complete_json("같은 프롬프트")) == "{}"
+
+
+def test_fresh_bypasses_cache_and_updates_it(cache, upstream):
+    asyncio.run(llm.allm_complete("프롬프트"))
+
+    async def fresh():
+        llm.fresh_completions.set(True)
+        return await llm.allm_complete("프롬프트")
+
+    assert asyncio.run(fresh()) == "응답 2"
+    assert asyncio.run(llm.allm_complete("프롬프트")) == "응답 2"
+    assert len(upstream) == 2
+
+
+def test_failed_call_is_not_cached(cache, monkeypatch):
+    async def failing(messages):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(llm, "_acreate", failing)
+
+    async def run():
+        return await asyncio.gather(*(llm.allm_complete("p") for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_key_and_eviction(tmp_path):
+    messages = [{"role": "user", "content": "안녕"}]
+    assert llm_cache_key("m", messages, 0.7) != llm_cache_key("m", messages, 0.2)
+    assert llm_cache_key("m", messages, 0.7) != llm_cache_key("m", messages, 0.7, response_format={"type": "json_object"})
+
+    cache = LLMCache(str(tmp_path / "c.db"), max_entries=3, max_bytes=10_000)
+    for i in range(5):
+        cache.put(f"k{i}", "x" * 10)
+    assert cache.stats()["entries"] == 3
+    assert cache.get("k0") is None and cache.get("k4") == "x" * 10
+
+    small = LLMCache(str(tmp_path / "s.db"), max_bytes=25)
+    for i in range(5):
+        small.put(f"k{i}", "y" * 10)
+    assert small.stats()["bytes"] <= 25
+
+    expired = LLMCache(str(tmp_path / "e.db"), ttl_seconds=60)
+    expired.put("k", "v")
+    expired._conn.execute("UPDATE llm_cache SET created_at = created_at - 120")
+    assert expired.get("k") is None
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.generate import GenerateRequest
+from app.services import llm
+from app.services.metrics import HTTP_REQUESTS, LLM_LATENCY, LLM_TOKENS, STAGE_LATENCY, Histogram, Registry
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("demo_seconds", "예시", ("stage",), buckets=(0.1, 1))
+    hist.observe(0.05, stage="a")
+    hist.observe(0.5, stage="a")
+    hist.observe(3, stage="a")
+    registry = Registry()
+    registry.register(hist)
+    text = registry.render()
+
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    assert 'demo_seconds_sum{stage="a"} 3.55' in text
+
+
+def test_http_metrics_use_route_template():
+    before = HTTP_REQUESTS.value(method="GET", route="/jobs/{job_id}", status="404")
+    client.get("/jobs/없는작업1")
+    client.get("/jobs/없는작업2")
+    assert HTTP_REQUESTS.value(method="GET", route="/jobs/{job_id}", status="404") == before + 2
+
+    text = client.get("/metrics").text
+    assert "/jobs/없는작업1" not in text   # 경로 값별로 라벨이 늘지 않음
+    assert 'http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}"}' in text
+    assert "llm_cache_hit_ratio" in text
+    assert 'jobs{status="queued"}' in text
+
+
+def test_llm_call_records_latency_tokens_and_stages(monkeypatch):
+    usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30, total_tokens=150)
+    resp = SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content=" 문안 "))])
+
+    async def fake_create(**kw):
+        return resp
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create)))
+    monkeypatch.setattr(llm, "aclient", fake_client)
+
+    async def run():
+        llm.llm_channel.set("instagram")
+        return await llm._acreate([{"role": "user", "content": "안녕"}])
+
+    tokens_before = LLM_TOKENS.value(model=llm.MODEL, channel="instagram", kind="prompt")
+    calls_before = LLM_LATENCY.count(model=llm.MODEL, channel="instagram", outcome="ok")
+    assert asyncio.run(run()) == "문안"
+    assert LLM_TOKENS.value(model=llm.MODEL, channel="instagram", kind="prompt") == tokens_before + 120
+    assert LLM_LATENCY.count(model=llm.MODEL, channel="instagram", outcome="ok") == calls_before + 1
+
+    async def fake_complete(prompt):
+        return "ok"
+
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    stages = ("review_analysis", "quote_retrieval", "posts", "calendar", "total")
+    before = {s: STAGE_LATENCY.count(stage=s) for s in stages}
+    req = GenerateRequest(name="카페 하루", category="카페", address="서울시 노원구", strengths=["원두 직배전"],
+                          channels=["instagram"], reviews=["커피가 맛있어요"], multi_channel=False)
+    asyncio.run(llm.generate_campaign(req))
+    assert all(STAGE_LATENCY.count(stage=s) == before[s] + 1 for s in stages)
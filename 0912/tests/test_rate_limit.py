@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from app.services.rate_limit import AdaptiveConcurrency, ModelLimiter, RateLimiter, TokenBucket, retry_after_seconds
+
+
+def rate_limit_error(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(per_minute=600, capacity=2)   # 초당 10개
+
+    async def run():
+        started = time.perf_counter()
+        for _ in range(5):
+            await bucket.acquire(1)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert 0.25 <= elapsed < 0.6   # 2개는 즉시, 나머지 3개는 0.1초 간격
+
+
+def test_aimd_increases_on_success_and_halves_on_429():
+    ctl = AdaptiveConcurrency(initial=8, minimum=1, maximum=16, latency_target=10)
+    for _ in range(8):
+        ctl.on_success(0.1)
+    assert 8.9 < ctl.limit < 9.1
+    ctl.on_overload()
+    assert 4.4 < ctl.limit < 4.6
+    ctl.on_overload()   # 1초 안의 연속 실패는 한 번만 반영
+    assert 4.4 < ctl.limit < 4.6
+    ctl.on_success(20)  # 지연이 목표보다 길어도 감소(1초 간격 제한)
+    assert 4.4 < ctl.limit < 4.6
+    ctl._last_decrease -= 1
+    ctl.on_success(20)
+    assert 2.2 < ctl.limit < 2.3
+
+
+def test_concurrency_waiters_are_served_in_order():
+    ctl = AdaptiveConcurrency(initial=1, minimum=1, maximum=1)
+    order = []
+
+    async def worker(i):
+        await ctl.acquire()
+        order.append(i)
+        await asyncio.sleep(0)
+        ctl.release()
+
+    async def run():
+        await ctl.acquire()
+        tasks = [asyncio.create_task(worker(i)) for i in range(5)]
+        await asyncio.sleep(0)
+        tasks[2].cancel()   # 기다리다 취소돼도 슬롯이 새지 않음
+        ctl.release()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(run())
+    assert order == [0, 1, 3, 4]
+    assert ctl.in_flight == 0
+
+
+def test_retry_honors_retry_after_and_backs_off_concurrency():
+    limiter = ModelLimiter(rpm=6000, tpm=1_000_000, max_concurrency=8)
+    calls = []
+
+    async def make_call():
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            raise rate_limit_error({"retry-after-ms": "200"})
+        return "ok"
+
+    assert asyncio.run(limiter.call(make_call, est_tokens=100)) == "ok"
+    assert calls[1] - calls[0] >= 0.19
+    assert limiter.retries == 1 and limiter.throttled == 1
+    assert limiter.concurrency.limit < 4
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_stream_holds_one_slot_until_drained_and_retries_only_creation():
+    limiter = ModelLimiter(rpm=6000, tpm=1_000_000, max_concurrency=2, min_concurrency=2)
+    creates = 0
+
+    async def chunks():
+        for piece in ("a", "b"):
+            await asyncio.sleep(0.01)
+            assert limiter.concurrency.in_flight == 1   # 읽는 동안에도 같은 슬롯 유지
+            yield piece
+
+    async def make_call():
+        nonlocal creates
+        creates += 1
+        if creates == 1:
+            raise rate_limit_error({"retry-after-ms": "10"})
+        return chunks()
+
+    async def run():
+        async with limiter.stream(make_call, est_tokens=10) as stream:
+            return [piece async for piece in stream]
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert creates == 2 and limiter.retries == 1
+    assert limiter.concurrency.in_flight == 0
+
+    async def broken():
+        yield "a"
+        raise rate_limit_error()
+
+    async def read_broken():
+        async with limiter.stream(lambda: asyncio.sleep(0, broken()), est_tokens=10) as stream:
+            return [piece async for piece in stream]
+
+    with pytest.raises(openai.RateLimitError):   # 토큰을 받기 시작한 뒤에는 재시도하지 않음
+        asyncio.run(read_broken())
+    assert limiter.retries == 1 and limiter.concurrency.in_flight == 0
+
+
+def test_non_retryable_errors_raise_immediately():
+    limiter = ModelLimiter(rpm=6000, tpm=1_000_000)
+
+    async def make_call():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.call(make_call, est_tokens=10))
+    assert limiter.retries == 0
+
+
+def test_concurrency_cap_holds_under_burst():
+    limiter = ModelLimiter(rpm=60000, tpm=10_000_000, max_concurrency=6, min_concurrency=1)
+    peak = in_flight = 0
+
+    async def make_call():
+        nonlocal peak, in_flight
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return "ok"
+
+    async def run():
+        await asyncio.gather(*(limiter.call(make_call, 10) for _ in range(30)))
+
+    asyncio.run(run())
+    assert peak <= int(limiter.concurrency.maximum)
+    assert peak >= 3
+
+
+def test_per_model_limits_and_retry_after_parsing():
+    limiter = RateLimiter({"small": {"rpm": 10, "max_concurrency": 2}})
+    assert limiter.for_model("small").concurrency.maximum == 2
+    assert limiter.for_model("small") is limiter.for_model("small")
+    assert retry_after_seconds(rate_limit_error({"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(rate_limit_error()) is None
+    assert retry_after_seconds(rate_limit_error({"retry-after": "86400"}), cap=30) == 30   # 잘못된 큰 값은 상한까지
@@ -0,0 +1,53 @@
+from app.services.review_index import ReviewIndex, ReviewIndexStore
+
+
+REVIEWS = [
+    "커피가 정말 맛있고 원두 향이 좋아요",
+    "주차가 편하고 역에서 가까워요",
+    "사장님이 친절하고 매장이 깨끗해요",
+    "인테리어가 예쁘고 분위기가 아늑해요",
+]
+
+
+def test_search_returns_relevant_reviews(tmp_path):
+    index = ReviewIndex(str(tmp_path / "cafe"))
+    assert index.add(REVIEWS) == 4
+
+    top = index.search("주차 위치 가까운", k=2)
+    assert len(top) == 2
+    assert top[0][0] == "주차가 편하고 역에서 가까워요"
+    assert index.search("분위기 인테리어", k=1)[0][0] == "인테리어가 예쁘고 분위기가 아늑해요"
+
+
+def test_incremental_add_persists_and_dedupes(tmp_path):
+    prefix = str(tmp_path / "cafe")
+    index = ReviewIndex(prefix)
+    index.add(REVIEWS[:2])
+    assert index.add(REVIEWS[:3]) == 1   # 이미 있는 2개는 건너뜀
+
+    reopened = ReviewIndex(prefix)
+    assert len(reopened) == 3
+    assert reopened.add([" 커피가 정말 맛있고  원두 향이 좋아요 "]) == 0
+    assert reopened.search("친절 청결", k=1)[0][0] == "사장님이 친절하고 매장이 깨끗해요"
+
+
+def test_store_reuses_index_per_business(tmp_path):
+    store = ReviewIndexStore(str(tmp_path))
+    assert store.get("a") is store.get("a")
+    assert store.get("a") is not store.get("b")
+    assert store.get("b").search("아무거나") == []
+
+
+def test_snapshot_is_written_only_every_n_vectors(tmp_path):
+    prefix = str(tmp_path / "cafe")
+    index = ReviewIndex(prefix, snapshot_every=3)
+    index.add(REVIEWS[:2])
+    assert not (tmp_path / "cafe.faiss").exists()     # 원문만 이어 쓰고 인덱스 파일은 아직
+    assert index.add(REVIEWS[:2]) == 0 and index.unsaved == 2
+
+    reopened = ReviewIndex(prefix)                     # 스냅샷 이후 분은 원문으로 다시 만듦
+    assert len(reopened) == 2 and reopened.unsaved == 2
+
+    index.add(REVIEWS[2:])
+    assert (tmp_path / "cafe.faiss").exists() and index.unsaved == 0
+    assert len(ReviewIndex(prefix)) == 4 and ReviewIndex(prefix).unsaved == 0
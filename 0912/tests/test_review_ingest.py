@@ -0,0 +1,96 @@
+import asyncio
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from app.db import SessionLocal
+from app.main import app
+from app.models.entities import Business
+from app.routers.generate import GenerateRequest
+from app.services import llm
+from app.services.review_ingest import ingest_reviews
+from app.services.reviews import analyze_reviews
+
+client = TestClient(app)
+
+REVIEWS = ["커피가 맛있어요", "사장님이 친절해요", "자리가 좁아요", "가격이 비싸요 그래도 재방문", "조용하고 아늑해요"]
+
+
+def create_business(name):
+    res = client.post("/businesses", json={"name": name, "category": "카페", "address": "서울시 성동구"})
+    assert res.status_code == 200
+    return res.json()["id"]
+
+
+def test_csv_upload_dedupes_and_accumulates_stats():
+    business_id = create_business("업로드 카페")
+    first = "review,rating\n" + "\n".join(f'"{r}",5' for r in REVIEWS[:3] + ["커피가  맛있어요", ""]) + "\n"
+    res = client.post(f"/businesses/{business_id}/reviews", content=first.encode("utf-8"),
+                      headers={"Content-Type": "text/csv"})
+    assert res.json() == {"received": 5, "inserted": 3, "duplicates": 1, "skipped": 1}
+
+    # 두 번째 업로드: 이미 있는 2개 + 새 리뷰 2개
+    second = "\n".join(json.dumps({"text": r}, ensure_ascii=False) for r in REVIEWS[1:]) + "\n"
+    res = client.post(f"/businesses/{business_id}/reviews?format=jsonl", content=second.encode("utf-8"))
+    assert res.json() == {"received": 4, "inserted": 2, "duplicates": 2, "skipped": 0}
+
+    stats = client.get(f"/businesses/{business_id}/reviews/stats").json()
+    assert stats == analyze_reviews(REVIEWS)
+
+
+def test_small_batches_match_full_analysis():
+    business_id = create_business("배치 카페")
+    lines = [json.dumps(r, ensure_ascii=False) for r in REVIEWS * 2] + ["{깨진 줄"]
+    with SessionLocal() as db:
+        business = db.get(Business, business_id)
+        result = ingest_reviews(db, business, io.BytesIO("\n".join(lines).encode("utf-8")), "jsonl", batch_size=2)
+    assert result == {"received": 11, "inserted": 5, "duplicates": 5, "skipped": 1}
+    assert client.get(f"/businesses/{business_id}/reviews/stats").json() == analyze_reviews(REVIEWS)
+
+
+def test_streamed_and_concurrent_uploads_store_each_review_once():
+    business_id = create_business("동시 업로드 카페")
+    lines = [json.dumps({"review": r}, ensure_ascii=False) + "\n" for r in REVIEWS]
+
+    def upload():
+        # 청크 여러 개로 나눠 보냄 (줄 중간에서 끊기는 청크 포함)
+        chunks = (line.encode("utf-8")[i:i + 7] for line in lines for i in range(0, len(line.encode("utf-8")), 7))
+        res = client.post(f"/businesses/{business_id}/reviews?format=jsonl", content=chunks)
+        assert res.status_code == 200
+        return res.json()
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: upload(), range(4)))
+    assert sum(r["inserted"] for r in results) == len(REVIEWS)
+    assert sum(r["duplicates"] for r in results) == 3 * len(REVIEWS)
+    assert client.get(f"/businesses/{business_id}/reviews/stats").json() == analyze_reviews(REVIEWS)
+
+
+def test_upload_rejects_unknown_format():
+    business_id = create_business("형식 카페")
+    res = client.post(f"/businesses/{business_id}/reviews", content=b"abc", headers={"Content-Type": "text/plain"})
+    assert res.status_code == 400
+    assert client.post("/businesses/999999/reviews?format=csv", content=b"review\n").status_code == 404
+
+
+def test_campaign_uses_precomputed_stats(monkeypatch):
+    business_id = create_business("집계 카페")
+    body = "\n".join(REVIEWS[:4]).encode("utf-8")
+    client.post(f"/businesses/{business_id}/reviews?format=csv", content=b"review\n" + body)
+
+    def no_raw_analysis(reviews, top_n=5):
+        raise AssertionError("저장된 집계가 있으면 원문을 다시 분석하지 않아야 함")
+
+    async def fake_complete(prompt):
+        return "ok"
+
+    monkeypatch.setattr(llm, "analyze_reviews", no_raw_analysis)
+    monkeypatch.setattr(llm, "allm_complete", fake_complete)
+    # 요청 리뷰 중 이미 업로드된 것은 빼고, 새 것만 더함
+    req = GenerateRequest(name="집계 카페", category="카페", address="서울시 성동구",
+                          channels=["instagram"], reviews=[REVIEWS[0], REVIEWS[4]])
+    plan = asyncio.run(llm.generate_campaign(req))
+    assert plan["highlights"]["review_count"] == 5
+    assert plan["highlights"]["sentiment"] == analyze_reviews(REVIEWS)["sentiment"]
@@ -0,0 +1,46 @@
+import json
+
+from app.services.reviews import ReviewAnalyzer, analyze_reviews
+
+
+def test_keywords_ranked_by_review_count():
+    reviews = [
+        "커피가 맛있어요",
+        "맛도 좋고 사장님이 친절해요",
+        "매장이 깨끗하고 맛있어요",
+        "고양이가 있어요",
+    ]
+    result = analyze_reviews(reviews)
+    assert result["review_count"] == 4
+    assert result["keywords"][0] == "맛"
+    assert result["keyword_counts"]["맛"] == 3
+    assert set(result["keywords"]) == {"맛", "친절", "청결"}
+
+
+def test_negation_prefers_longer_terms():
+    result = analyze_reviews(["음식이 맛없고 직원이 불친절했어요"])
+    assert result["sentiment"]["negative"] == 1.0
+    assert set(result["keywords"]) == {"맛", "친절"}
+
+
+def test_sentiment_ratios():
+    reviews = ["맛있어요", "별로예요", "주차는 가능해요", "최고! 재방문 의사 있어요"]
+    sentiment = analyze_reviews(reviews)["sentiment"]
+    assert sentiment == {"positive": 0.5, "negative": 0.25, "neutral": 0.25}
+
+
+def test_empty_reviews():
+    result = analyze_reviews([])
+    assert result["keywords"] == []
+    assert result["sentiment"] == {"positive": 0.0, "negative": 0.0, "neutral": 0.0}
+
+
+def test_custom_lexicon(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({"원두": {"neutral": ["원두"], "positive": ["향이 좋"], "negative": []}}),
+                    encoding="utf-8")
+    from app.services import reviews
+    analyzer = ReviewAnalyzer(reviews.load_lexicon(str(path)))
+    result = analyzer.analyze(["원두 향이 좋아요", "맛있어요"])
+    assert result["keywords"] == ["원두"]
+    assert result["sentiment"]["positive"] == 0.5
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import httpx
+
+from app.bench import compare, percentile, run_level
+from app.main import app
+from app.services import llm
+from app.services.metrics import LLM_TOKENS
+from app.services.rate_limit import get_rate_limiter
+from app.stub_openai import StubConfig, create_app, use_stub
+
+
+def test_streaming_chunks_and_usage(stub_llm):
+    stub_llm.configure(StubConfig(latency_ms=0, chunk_delay_ms=0, stream_chunks=5, seed=0))
+    before = LLM_TOKENS.value(model=llm.MODEL, channel="-", kind="completion")
+
+    async def run():
+        token = llm.fresh_completions.set(True)
+        try:
+            return [piece async for piece in llm.astream_complete("스트리밍 테스트")]
+        finally:
+            llm.fresh_completions.reset(token)
+
+    pieces = asyncio.run(run())
+    assert len(pieces) == 5
+    assert "".join(pieces).startswith("[스텁 ")
+    assert stub_llm.stats["streamed"] == 1
+    assert LLM_TOKENS.value(model=llm.MODEL, channel="-", kind="completion") > before
+
+
+def test_json_mode_returns_requested_channels(stub_llm):
+    prompt = llm.MULTI_POST_PROMPT.format(
+        name="카페", category="카페", channels="instagram, naver_blog", tone="친근", address="서울",
+        strengths="조용함", keywords="커피", channel_quotes="")
+    text = asyncio.run(llm.allm_complete_json(prompt))
+    assert set(llm.parse_multi_posts(text, ["instagram", "naver_blog"])) == {"instagram", "naver_blog"}
+
+
+def test_injected_429s_are_retried(stub_llm):
+    stub_llm.configure(StubConfig(latency_ms=0, rate_limit_rate=0.5, retry_after_ms=1, seed=3))
+    retries_before = get_rate_limiter().for_model(llm.MODEL).retries
+
+    async def run():
+        llm.fresh_completions.set(True)
+        return await asyncio.gather(*(llm.allm_complete(f"요청 {i}") for i in range(6)))
+
+    assert all(text.startswith("[스텁 ") for text in asyncio.run(run()))
+    assert stub_llm.stats["errors_429"] > 0
+    assert get_rate_limiter().for_model(llm.MODEL).retries - retries_before == stub_llm.stats["errors_429"]
+
+
+def test_bench_level_reports_percentiles(stub_llm):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            return await run_level(http, concurrency=2, total=4)
+
+    result = asyncio.run(run())
+    assert result["errors"] == 0 and result["requests"] == 4
+    assert result["throughput"] > 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    json.dumps(result)
+
+
+def test_percentile_and_regression_compare():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+    base = [{"concurrency": 4, "errors": 0, "throughput": 10.0, "p95_ms": 100.0}]
+    assert compare([{"concurrency": 4, "errors": 0, "throughput": 9.5, "p95_ms": 110.0}], base, 0.2) == []
+    assert len(compare([{"concurrency": 4, "errors": 1, "throughput": 5.0, "p95_ms": 200.0}], base, 0.2)) == 3
+
+
+def test_use_stub_restores_client_and_closes_http_pool():
+    original = llm.aclient
+
+    async def run():
+        async with use_stub(create_app(StubConfig(latency_ms=0))):
+            return llm.aclient
+
+    swapped = asyncio.run(run())
+    assert swapped is not original and llm.aclient is original
+    assert swapped._client.is_closed
+
+    with use_stub(create_app(StubConfig(latency_ms=0))):
+        swapped = llm.aclient
+    assert llm.aclient is original and swapped._client.is_closed